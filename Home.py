@@ -1,5 +1,10 @@
 import streamlit as st
-import pandas as pd
+import time
+from datetime import datetime
+from utils.ingest import read_sources_title_days, summarize_titles
+from utils.titles import group_titles
+from utils.snapshot import load_pending, read_manifest, restore_snapshot, SnapshotError
+from utils.utils import snapshot_session
 
 st.set_page_config(page_title="Home", page_icon="🏠", layout="centered", initial_sidebar_state="collapsed")
 
@@ -13,10 +18,9 @@ You will be guided through a series of steps that support the interactive discov
 
 #### 🔒 Data Privacy
 - This is a **local Streamlit app**: none of your data is sent to any external server other than for GPT-4.1 completions.
-- Your data is used only within this session and is **not stored or collected** beyond your current use.
 - From the Tockler data you will upload, we will filter out all titles that occur on only one day, and then focus on the 500 most frequently occurring titles for a call to GPT-4.1. 
 - Calls to GPT-4.1 are made securely and **not used for training** by OpenAI.
-- Please complete all steps **in one sitting** and download your data before closing the app or refreshing the page.
+- Your data is **not collected** by anyone, but it is **stored on the machine running this app**, in its `.exoar` folder: your work after every confirmation (under your resume code, without your API key), GPT-4.1 responses, and the object types, activities, objects and title labels you confirm, so you can resume after a refresh and later sessions need fewer GPT-4.1 requests. Delete `.exoar/snapshots/<resume code>` to remove one session, or the whole `.exoar` folder to remove everything.
 
 #### 🧪 Evaluation Participants
 If you are taking part in the research evaluation led by *Iris Beerepoot, Vinicius Stein Dani,* and *Xixi Lu*,  
@@ -59,43 +63,115 @@ if st.session_state.get("user_type_confirmed"):
     if api_key:
         st.session_state["api_key"] = api_key.strip()
 
+    # --- Resume a session saved after an earlier confirmation ---
+    if "step3_summary_df" not in st.session_state:
+        resume_code = st.text_input(
+            "♻️ Resume code of a saved session (optional)",
+            help="Shown on this page once your upload is saved. Each session has its own code."
+        )
+        manifest = None
+        if resume_code:
+            try:
+                manifest = read_manifest(resume_code)
+                if manifest is None:
+                    st.warning("⚠️ No saved session has this resume code.")
+            except SnapshotError as e:
+                st.warning(f"⚠️ {e} Please start again below.")
+        if manifest:
+            st.info(f"💾 The work of '{manifest.get('profession', '')}' under this code was saved on {datetime.fromtimestamp(manifest['saved_at']):%Y-%m-%d %H:%M} (last saved at {manifest['step']}).")
+            if st.button("♻️ Resume Saved Session"):
+                start = time.perf_counter()
+                try:
+                    restore_snapshot(st.session_state, resume_code)
+                    # The other saved keys are read when the step that uses them is opened
+                    load_pending(st.session_state, ["step3_summary_df"])
+                    st.success(f"✅ Session restored in {(time.perf_counter() - start) * 1000:.0f} ms. Enter your API key to continue.")
+                except SnapshotError as e:
+                    st.warning(f"⚠️ {e} Please start again below.")
+
     # --- File Upload ---
-    uploaded_file = st.file_uploader("📁 Upload your Tockler data", type="csv")
-    if uploaded_file:
+    uploaded_files = st.file_uploader(
+        "📁 Upload your Tockler data",
+        type=["csv", "zip"],
+        accept_multiple_files=True,
+        help="One or more exports, e.g. from several computers or months, or a zip of them. "
+             "ActivityWatch and ManicTime CSV exports are read as well."
+    )
+    group_variants = st.checkbox(
+        "🧩 Group near-identical titles (e.g. unread counters, app suffixes, unsaved markers)",
+        value=True,
+        help="Variants of the same window are summarized together and sent to GPT-4.1 once."
+    )
+    remove_duplicates = st.checkbox(
+        "🧹 Drop rows repeated in several exports",
+        value=True,
+        help="When exports overlap in time, e.g. two monthly exports covering the same week, their shared rows are counted once. "
+             "A single export is read as it is."
+    )
+    trim_overlaps = st.checkbox(
+        "✂️ Count time recorded twice only once",
+        value=False,
+        help="Time already covered by another row, of any title (e.g. tracked on two computers at once), "
+             "is cut from the later row. This changes the Duration and Frequency of overlapping titles."
+    )
+    if uploaded_files:
         try:
-            df = pd.read_csv(uploaded_file, sep=";")
-            if df.empty:
+            # Exports are read in parallel, and only again when the files or the options change
+            upload_key = (tuple(f.file_id for f in uploaded_files), remove_duplicates, trim_overlaps)
+            if st.session_state.get("upload_key") != upload_key:
+                st.session_state["upload_title_days"] = read_sources_title_days(
+                    uploaded_files, dedupe=remove_duplicates, overlaps=trim_overlaps
+                )
+                st.session_state["upload_key"] = upload_key
+            title_days, report = st.session_state["upload_title_days"]
+            if len(report["files"]) > 1 or report["duplicates"] or report["overlaps"]:
+                trackers = ", ".join(sorted({f["adapter"] for f in report["files"]}))
+                message = f"📚 Read {report['rows']:,} rows from {len(report['files'])} exports ({trackers})"
+                if report["duplicates"]:
+                    message += f"; dropped {report['duplicates']:,} repeated rows"
+                if trim_overlaps:
+                    message += f"; trimmed {report['overlaps']:,} overlapping rows"
+                st.info(message + ".")
+            if title_days.empty:
                 st.error("❌ Uploaded file is empty.")
             else:
-                # Drop 'Type' column if it exists
-                if 'Type' in df.columns:
-                    df = df.drop(columns=['Type'])
-
-                df['Begin'] = pd.to_datetime(df['Begin'])
-                df['End'] = pd.to_datetime(df['End'])
-                df['Date'] = df['Begin'].dt.date
-                df['Duration'] = (df['End'] - df['Begin']).dt.total_seconds()
-
-                # Filter titles that appear on 3 or more unique days
-                days_per_title = df.groupby('Title')['Date'].nunique().reset_index(name='UniqueDays')
-                df = df.merge(days_per_title, on='Title')
-                df = df[df['UniqueDays'] >= 2]
-
-                summary_df = (
-                    df.groupby('Title', as_index=False)
-                    .agg(Duration=('Duration', 'sum'), Frequency=('Title', 'count'))
-                    .sort_values(by='Duration', ascending=False)
-                    .head(500)
-                )
+                title_stats = summarize_titles(title_days)
+                title_groups = {}
+                if group_variants:
+                    groups = group_titles(title_stats)
+                    title_groups = {member: rep for member, rep in groups.items() if member != rep}
+                    distinct_titles = len(title_stats)
+                    title_stats = summarize_titles(title_days, groups=groups)
+                    st.info(f"🧩 Grouped {distinct_titles} distinct titles into {len(title_stats)} title groups.")
+
+                # Keep every title, longest first, for full-corpus enrichment in Step 4
+                all_titles = title_stats['Title']
+
+                # Filter titles that appear on 2 or more unique days
+                title_stats = title_stats[title_stats['UniqueDays'] >= 2]
+
+                summary_df = title_stats[['Title', 'Duration', 'Frequency']].head(500).reset_index(drop=True)
 
                 # Save summary and metadata
                 st.session_state["step3_summary_df"] = summary_df
-                st.session_state["step3_total_rows"] = len(df)
+                st.session_state["step3_total_rows"] = int(title_stats['Frequency'].sum())
+                st.session_state["step4_all_titles"] = all_titles.tolist()
+                st.session_state["title_groups"] = title_groups
+                if st.session_state.get("snapshot_upload") != upload_key:
+                    # The upload is summarized again on every rerun, but only needs saving once
+                    st.session_state["snapshot_upload"] = upload_key
+                    snapshot_session("Home")
 
                 st.success("✅ File processed successfully!")
         except Exception as e:
             st.error(f"❌ Failed to process file: {e}")
 
+    if st.session_state.get("snapshot_id"):
+        st.info(
+            f"💾 Your work is saved after every confirmation under the resume code **{st.session_state['snapshot_id']}**. "
+            "Note it down: entering it on this page continues your session after a refresh."
+        )
+
     # --- Validation ---
     all_ready = (
         st.session_state.get("api_key") and
@@ -0,0 +1,258 @@
+"""
+A local stand-in for the OpenAI chat completions API, for benchmarks and for
+clicking through the app without an API key or cost.
+
+Usage (from the repository root):
+    python -m benchmarks.fake_openai --port 8765 --latency 0.5 --error-rate 0.05
+    OPENAI_BASE_URL=http://127.0.0.1:8765/v1 streamlit run Home.py
+
+Responses are canned JSON shaped like what each step asks for: object types
+or activities (Steps 1-2), objects (Step 3) or title labels (Step 4). With a
+json_schema response_format they come wrapped as {"items": [...]}, like
+OpenAI's structured outputs.
+"""
+import argparse
+import json
+import random
+import re
+import sys
+import threading
+import time
+from collections import deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+DEFAULT_LATENCY = 0.05
+DEFAULT_JITTER = 0.0
+DEFAULT_ERROR_RATE = 0.0
+DEFAULT_DROP_RATE = 0.0
+STREAM_CHUNK_CHARS = 40
+CHARS_PER_TOKEN = 4
+WORD = re.compile(r"[A-Za-z][A-Za-z0-9]{3,}")
+
+
+def _json_field(text, label):
+    # Prompts carry their inputs as "Label: [json]" lines
+    match = re.search(rf"^{re.escape(label)}: (.*)$", text, re.MULTILINE)
+    if not match:
+        return []
+    try:
+        return json.loads(match.group(1))
+    except json.JSONDecodeError:
+        return []
+
+
+def canned_response(messages):
+    """A plausible JSON answer for the step that produced these messages."""
+    user = messages[-1]["content"] if messages else ""
+    if "Window Titles:" in user:
+        # Step 3: one object per distinct capitalized code or name in the titles
+        object_types = _json_field(user, "Object Types") or ["object"]
+        names = {}
+        for title in _json_field(user, "Window Titles"):
+            for word in WORD.findall(title):
+                if word.isupper():
+                    names.setdefault(word, object_types[len(names) % len(object_types)])
+        return [{"object": name, "object_type": object_type} for name, object_type in names.items()]
+    if "Titles:" in user:
+        # Step 4: label titles that mention a known object with the first activity
+        activities = _json_field(user, "Activities")
+        objects = [o["object"] for o in _json_field(user, "Objects and Types") if isinstance(o, dict)]
+        labels = []
+        for title in _json_field(user, "Titles"):
+            found = [o for o in objects if o in title]
+            labels.append({
+                "title": title,
+                "activities": activities[:1] if found else [],
+                "objects": found
+            })
+        return labels
+    # Steps 1 and 2: a short list of names
+    return ["courses", "students", "colleagues", "papers", "meetings"]
+
+
+class FakeOpenAIServer:
+    """
+    Threaded HTTP server answering POST /v1/chat/completions. Use as a context
+    manager; base_url can be passed to openai.OpenAI or set as OPENAI_BASE_URL.
+    A share of requests (error_rate) fails with 429 and a Retry-After header,
+    and with requests_per_minute set, requests over that limit do too.
+    Streamed responses spread the latency over the chunks; a share of them
+    (drop_rate) is cut off halfway, like a dropped connection.
+    """
+
+    def __init__(self, host="127.0.0.1", port=0, latency=DEFAULT_LATENCY, jitter=DEFAULT_JITTER,
+                 error_rate=DEFAULT_ERROR_RATE, drop_rate=DEFAULT_DROP_RATE, requests_per_minute=None, seed=0):
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.drop_rate = drop_rate
+        self.requests_per_minute = requests_per_minute
+        self._recent = deque()  # start times of the requests accepted in the last minute
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self.stats = {"requests": 0, "errors": 0, "rate_limited": 0, "dropped": 0, "prompt_tokens": 0, "completion_tokens": 0}
+        self._server = ThreadingHTTPServer((host, port), self._handler())
+        self._server.daemon_threads = True
+        self._thread = None
+
+    @property
+    def base_url(self):
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}/v1"
+
+    def _handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, *args):
+                pass
+
+            def do_POST(self):
+                body = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b"{}")
+                status, payload, headers, delay = server.respond(self.path, body)
+                if status == 200 and body.get("stream"):
+                    # Streamed answers start after a fifth of the latency; the rest is spent between chunks
+                    time.sleep(delay / 5)
+                    self.stream(payload, headers, delay * 4 / 5)
+                    return
+                time.sleep(delay)
+                data = json.dumps(payload).encode("utf-8")
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                for name, value in headers.items():
+                    self.send_header(name, value)
+                self.end_headers()
+                self.wfile.write(data)
+
+            def stream(self, completion, headers, duration):
+                # Server-sent events in the chat.completion.chunk format, closed early when dropped
+                self.send_response(200)
+                self.send_header("Content-Type", "text/event-stream")
+                self.send_header("Connection", "close")
+                for name, value in headers.items():
+                    self.send_header(name, value)
+                self.end_headers()
+                content = completion["choices"][0]["message"]["content"]
+                pieces = [content[i:i + STREAM_CHUNK_CHARS] for i in range(0, len(content), STREAM_CHUNK_CHARS)]
+                chunk_delay = duration / max(1, len(pieces))
+                with server._lock:
+                    drop = server._random.random() < server.drop_rate
+                    if drop:
+                        server.stats["dropped"] += 1
+                base = {"id": completion["id"], "object": "chat.completion.chunk", "created": completion["created"], "model": completion["model"]}
+                for n, piece in enumerate(pieces):
+                    if drop and n >= len(pieces) // 2:
+                        self.close_connection = True
+                        return
+                    chunk = {**base, "choices": [{"index": 0, "delta": {"content": piece}, "finish_reason": None}]}
+                    self.wfile.write(f"data: {json.dumps(chunk)}\n\n".encode("utf-8"))
+                    self.wfile.flush()
+                    time.sleep(chunk_delay)
+                done = {**base, "choices": [{"index": 0, "delta": {}, "finish_reason": "stop"}]}
+                usage = {**base, "choices": [], "usage": completion["usage"]}
+                for event in (done, usage):
+                    self.wfile.write(f"data: {json.dumps(event)}\n\n".encode("utf-8"))
+                self.wfile.write(b"data: [DONE]\n\n")
+                self.wfile.flush()
+
+        return Handler
+
+    def respond(self, path, body):
+        with self._lock:
+            delay = self.latency + self._random.uniform(0, self.jitter)
+            fail = self._random.random() < self.error_rate
+            self.stats["requests"] += 1
+
+        if not path.rstrip("/").endswith("/chat/completions"):
+            return 404, {"error": {"message": f"Unknown path {path}", "type": "invalid_request_error"}}, {}, 0
+        if fail:
+            with self._lock:
+                self.stats["errors"] += 1
+            error = {"message": "Rate limit reached (injected by the benchmark server)", "type": "rate_limit_error"}
+            return 429, {"error": error}, {"Retry-After": "0"}, delay
+
+        headers = {}
+        if self.requests_per_minute:
+            # Enforce a provider-style requests-per-minute limit over a sliding window
+            with self._lock:
+                now = time.monotonic()
+                while self._recent and now - self._recent[0] >= 60:
+                    self._recent.popleft()
+                headers["x-ratelimit-limit-requests"] = str(self.requests_per_minute)
+                if len(self._recent) >= self.requests_per_minute:
+                    self.stats["rate_limited"] += 1
+                    headers["Retry-After"] = f"{60 - (now - self._recent[0]):.3f}"
+                    error = {"message": "Rate limit reached for requests", "type": "rate_limit_error"}
+                    return 429, {"error": error}, headers, 0
+                self._recent.append(now)
+
+        messages = body.get("messages", [])
+        if (body.get("response_format") or {}).get("type") == "json_schema":
+            content = json.dumps({"items": canned_response(messages)})  # structured outputs: the schema's wrapper, no fence
+        else:
+            content = "```json\n" + json.dumps(canned_response(messages)) + "\n```"
+        prompt_tokens = sum(len(m.get("content") or "") for m in messages) // CHARS_PER_TOKEN
+        completion_tokens = len(content) // CHARS_PER_TOKEN
+        with self._lock:
+            self.stats["prompt_tokens"] += prompt_tokens
+            self.stats["completion_tokens"] += completion_tokens
+        return 200, {
+            "id": f"chatcmpl-fake-{self.stats['requests']}",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": body.get("model", "gpt-4.1"),
+            "choices": [{
+                "index": 0,
+                "message": {"role": "assistant", "content": content},
+                "finish_reason": "stop"
+            }],
+            "usage": {
+                "prompt_tokens": prompt_tokens,
+                "completion_tokens": completion_tokens,
+                "total_tokens": prompt_tokens + completion_tokens
+            }
+        }, headers, delay
+
+    def start(self):
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+
+# --- CLI ---
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Serve a fake OpenAI chat completions API on localhost.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency", type=float, default=DEFAULT_LATENCY, help="Seconds per request (default: 0.05)")
+    parser.add_argument("--jitter", type=float, default=DEFAULT_JITTER, help="Extra random seconds per request (default: 0)")
+    parser.add_argument("--error-rate", type=float, default=DEFAULT_ERROR_RATE, help="Share of requests answered with 429 (default: 0)")
+    parser.add_argument("--drop-rate", type=float, default=DEFAULT_DROP_RATE, help="Share of streams cut off halfway (default: 0)")
+    parser.add_argument("--rpm", type=int, help="Requests per minute before answering 429 with Retry-After (default: unlimited)")
+    args = parser.parse_args(argv)
+
+    server = FakeOpenAIServer(
+        args.host, args.port, args.latency, args.jitter, args.error_rate, args.drop_rate, args.rpm
+    ).start()
+    print(f"Fake OpenAI API listening on {server.base_url} (set OPENAI_BASE_URL to use it)")
+    try:
+        while True:
+            time.sleep(1)
+    except KeyboardInterrupt:
+        server.stop()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,379 @@
+"""
+Benchmark the ingestion, LLM and OCEL conversion pipelines on synthetic data.
+
+Usage (from the repository root):
+    python -m benchmarks.run --sizes small medium -o benchmark_report.json
+    python -m benchmarks.run --sizes small --baseline benchmark_report.json --max-slowdown 1.25
+
+Every scenario runs in a fresh Python process with its own .exoar folder (so
+the LLM cache, checkpoints and label store start cold) against a local fake
+OpenAI server. The report is JSON with one entry per scenario and size:
+wall time, throughput, peak resident memory and the LLM requests served.
+"""
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+
+from benchmarks.fake_openai import FakeOpenAIServer, DEFAULT_LATENCY, DEFAULT_JITTER, DEFAULT_ERROR_RATE
+from benchmarks.synthetic import write_tockler_csv, make_objects, COURSES
+
+REPORT_VERSION = 1
+SIZES = {
+    "small": {"rows": 10_000, "titles": 500, "days": 20},
+    "medium": {"rows": 200_000, "titles": 5_000, "days": 60},
+    "large": {"rows": 2_000_000, "titles": 50_000, "days": 180},
+}
+SCENARIOS = ["ingest", "ingest_multi", "step3", "resolve", "step4", "step4_local", "ocel"]
+PROFESSION = "Academic staff"
+OBJECT_TYPES = ["courses", "students", "colleagues"]
+ACTIVITIES = ["grade exams", "prepare lectures", "supervise theses"]
+APP_TIMEOUT = 3600
+# The app's entry page, independent of the directory the benchmarks are started from
+HOME_PAGE = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "Home.py")
+
+
+# --- Shared preparation (mirrors the processing on the Home page) ---
+def ingest(csv_path):
+    from utils.ingest import read_title_days, summarize_titles
+    from utils.titles import group_titles
+
+    title_days = read_title_days(csv_path, sep=";")
+    title_stats = summarize_titles(title_days)
+    groups = group_titles(title_stats)
+    title_groups = {member: rep for member, rep in groups.items() if member != rep}
+    title_stats = summarize_titles(title_days, groups=groups)
+    all_titles = title_stats["Title"].tolist()
+    title_stats = title_stats[title_stats["UniqueDays"] >= 2]
+    return {
+        "step3_summary_df": title_stats[["Title", "Duration", "Frequency"]].head(500).reset_index(drop=True),
+        "step3_total_rows": int(title_stats["Frequency"].sum()),
+        "step4_all_titles": all_titles,
+        "title_groups": title_groups,
+    }
+
+
+def benchmark_objects():
+    return [{"object": course, "object_type": "courses"} for course in COURSES]
+
+
+def open_page(page, session):
+    from streamlit.testing.v1 import AppTest
+
+    at = AppTest.from_file(HOME_PAGE, default_timeout=APP_TIMEOUT)
+    at.run()
+    at.switch_page(page)
+    for key, value in session.items():
+        at.session_state[key] = value
+    at.run()
+    return at
+
+
+def click(at, label_prefix):
+    button = next(b for b in at.button if b.label.startswith(label_prefix))
+    button.click().run()
+    if at.exception:
+        raise RuntimeError(at.exception[0].message)
+    return at
+
+
+def base_session(csv_path):
+    import pandas as pd
+
+    return {
+        **ingest(csv_path),
+        "profession": PROFESSION,
+        "api_key": "sk-benchmark",
+        "confirmed_object_types": OBJECT_TYPES,
+        "confirmed_activities": ACTIVITIES,
+        "step3_objects_df": pd.DataFrame(benchmark_objects(), columns=["object", "object_type"]),
+    }
+
+
+# --- Scenarios (run inside the child process) ---
+def scenario_ingest(csv_path, size):
+    start = time.perf_counter()
+    session = ingest(csv_path)
+    seconds = time.perf_counter() - start
+    return {"seconds": seconds, "items": size["rows"], "unit": "rows/s", "titles_out": len(session["step4_all_titles"])}
+
+
+def scenario_ingest_multi(csv_path, size, workdir, parts=8):
+    # The same export split into one file per few days (like several machines or months), read in parallel
+    import pandas as pd
+    from utils.ingest import read_sources_title_days
+
+    df = pd.read_csv(csv_path, sep=";")
+    day = pd.to_datetime(df["Begin"]).dt.normalize()
+    paths = []
+    for i, (_, part) in enumerate(df.groupby(day.rank(method="dense").astype(int) % parts)):
+        paths.append(os.path.join(workdir, f"export_{i}.csv"))
+        part.to_csv(paths[-1], sep=";", index=False)
+    del df
+
+    start = time.perf_counter()
+    title_days, _ = read_sources_title_days(paths, dedupe=False)
+    merged = time.perf_counter() - start
+    _, report = read_sources_title_days(paths)
+    seconds = time.perf_counter() - start
+    return {
+        "seconds": seconds,
+        "items": 2 * size["rows"],
+        "unit": "rows/s",
+        "stages": {"merge": merged, "merge_dedupe": seconds - merged},
+        "files": len(paths),
+        "workers": min(len(paths), os.cpu_count() or 1),
+        "title_days_out": len(title_days)
+    }
+
+
+def scenario_step3(csv_path, size):
+    session = base_session(csv_path)
+    at = open_page("pages/Step 3 - Identify objects.py", session)
+    at.radio(key="step3_title_source").set_value("All titles, including those filtered out on the Home page").run()
+    start = time.perf_counter()
+    click(at, "🧠 Generate Objects with GPT")
+    seconds = time.perf_counter() - start
+    if "step3_gpt_objects" not in at.session_state:
+        raise RuntimeError("Step 3 did not produce objects")
+    return {
+        "seconds": seconds,
+        "items": len(session["step4_all_titles"]),
+        "unit": "titles/s",
+        "objects_out": len(at.session_state["step3_gpt_objects"])
+    }
+
+
+def scenario_resolve(csv_path, size):
+    # Entity resolution over one object per distinct title, a third of them spelled twice
+    from utils.resolution import resolve_objects
+
+    objects = make_objects(size["titles"])
+    start = time.perf_counter()
+    resolved, clusters = resolve_objects(objects)
+    seconds = time.perf_counter() - start
+    return {"seconds": seconds, "items": len(objects), "unit": "objects/s", "objects_out": len(resolved), "merged": len(clusters)}
+
+
+def scenario_step4(csv_path, size):
+    session = base_session(csv_path)
+    at = open_page("pages/Step 4 - Enrich events.py", session)
+    at.radio(key="step4_mode_label").set_value("All titles, including those filtered out on the Home page").run()
+    start = time.perf_counter()
+    click(at, "🔍 Generate Title Enrichments with GPT")
+    seconds = time.perf_counter() - start
+    if "step4_gpt_enrichment" not in at.session_state:
+        raise RuntimeError("Step 4 did not produce enrichments")
+    return {
+        "seconds": seconds,
+        "items": len(session["step4_all_titles"]),
+        "unit": "titles/s",
+        "labelled_out": len(at.session_state["step4_gpt_enrichment"])
+    }
+
+
+def scenario_step4_local(csv_path, size):
+    # GPT on the summarized titles, then the local labeller (and GPT for uncertain titles) on the rest
+    session = base_session(csv_path)
+    at = open_page("pages/Step 4 - Enrich events.py", session)
+    at.radio(key="step4_mode_label").set_value("All summarized titles").run()
+    start = time.perf_counter()
+    click(at, "🔍 Generate Title Enrichments with GPT")
+    gpt_seconds = time.perf_counter() - start
+    click(at, "🤖 Label")
+    seconds = time.perf_counter() - start
+    return {
+        "seconds": seconds,
+        "items": len(session["step4_all_titles"]),
+        "unit": "titles/s",
+        "stages": {"gpt_summary": gpt_seconds, "label_remaining": seconds - gpt_seconds},
+        "local_out": len(at.session_state["step4_local_enrichment"]) if "step4_local_enrichment" in at.session_state else 0
+    }
+
+
+def scenario_ocel(csv_path, size, workdir):
+    from benchmarks.fake_openai import canned_response
+    from ocel.exoar2ocel import load_tockler_csv, build_tables, episodes
+    from ocel.writers import write_ocel_json, write_ocel_sqlite
+
+    titles = ingest(csv_path)["step4_all_titles"]
+    prompt = f"Objects and Types: {json.dumps(benchmark_objects())}\nActivities: {json.dumps(ACTIVITIES)}\nTitles: {json.dumps(titles)}\n"
+    labels = [item for item in canned_response([{"role": "user", "content": prompt}]) if item["objects"]]
+    results = {
+        "step3": {"confirmed_objects": benchmark_objects()},
+        "step4": {"gpt_suggestions": labels}
+    }
+
+    stages = {}
+    start = time.perf_counter()
+    df_csv = load_tockler_csv(csv_path)
+    stages["load_csv"] = time.perf_counter() - start
+    df_episodes = episodes(df_csv, results)
+    stages["sessionize"] = time.perf_counter() - start - sum(stages.values())
+    events, objects, relations = build_tables(df_episodes, results)
+    stages["build_tables"] = time.perf_counter() - start - sum(stages.values())
+    write_ocel_json(os.path.join(workdir, "ocel.json"), events, objects, relations, indent=2)
+    stages["write_json"] = time.perf_counter() - start - sum(stages.values())
+    write_ocel_sqlite(os.path.join(workdir, "ocel.sqlite"), events, objects, relations)
+    stages["write_sqlite"] = time.perf_counter() - start - sum(stages.values())
+    return {
+        "seconds": time.perf_counter() - start,
+        "items": size["rows"],
+        "unit": "rows/s",
+        "stages": stages,
+        "episodes": len(df_episodes),
+        "events_out": len(events)
+    }
+
+
+def rss_mb():
+    # Peak resident set size of this process so far (ru_maxrss is KiB on Linux, bytes on macOS)
+    try:
+        import resource
+    except ImportError:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return round(peak / (1024 * 1024 if sys.platform == "darwin" else 1024), 1)
+
+
+def run_child(scenario, csv_path, size, workdir):
+    import pandas  # noqa: F401  (imported up front so the baseline covers library memory)
+    import streamlit  # noqa: F401
+
+    baseline = rss_mb()
+    if scenario in ("ocel", "ingest_multi"):
+        result = globals()[f"scenario_{scenario}"](csv_path, size, workdir)
+    else:
+        result = globals()[f"scenario_{scenario}"](csv_path, size)
+    result["baseline_rss_mb"] = baseline
+    result["peak_rss_mb"] = rss_mb()
+    print(json.dumps(result))
+    return 0
+
+
+# --- Orchestration ---
+def run_scenario(scenario, size_name, csv_path, server, workdir):
+    data_dir = tempfile.mkdtemp(prefix=f"{scenario}_", dir=workdir)
+    env = {
+        **os.environ,
+        "EXOAR_DATA_DIR": data_dir,
+        "OPENAI_BASE_URL": server.base_url,
+        "PYTHONPATH": os.pathsep.join(filter(None, [os.getcwd(), os.environ.get("PYTHONPATH")]))
+    }
+    before = dict(server.stats)
+    size = SIZES[size_name]
+    command = [
+        sys.executable, "-m", "benchmarks.run", "--child", scenario,
+        "--csv", csv_path, "--size-spec", json.dumps(size), "--workdir", data_dir
+    ]
+    completed = subprocess.run(command, env=env, capture_output=True, text=True)
+    entry = {"scenario": scenario, "size": size_name, **size}
+    if completed.returncode != 0:
+        last_line = (completed.stderr.strip().splitlines() or ["unknown error"])[-1]
+        entry.update(ok=False, error=last_line)
+        return entry
+
+    result = json.loads(completed.stdout.strip().splitlines()[-1])
+    seconds = result.pop("seconds")
+    items = result.pop("items")
+    entry.update(
+        ok=True,
+        seconds=round(seconds, 4),
+        throughput=round(items / seconds, 1) if seconds else None,
+        unit=result.pop("unit"),
+        llm={key: server.stats[key] - before[key] for key in before},
+        **result
+    )
+    if "stages" in entry:
+        entry["stages"] = {name: round(value, 4) for name, value in entry["stages"].items()}
+    return entry
+
+
+def git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "HEAD"], capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(report, baseline, max_slowdown):
+    """Print the change in wall time per scenario and return the entries slower than max_slowdown."""
+    previous = {(e["scenario"], e["size"]): e for e in baseline.get("results", []) if e.get("ok")}
+    regressions = []
+    for entry in report["results"]:
+        old = previous.get((entry["scenario"], entry["size"]))
+        if not (entry.get("ok") and old):
+            continue
+        ratio = entry["seconds"] / old["seconds"] if old["seconds"] else float("inf")
+        print(f"{entry['scenario']:>12} {entry['size']:>6}: {old['seconds']:.3f}s -> {entry['seconds']:.3f}s ({ratio:.2f}x)")
+        if max_slowdown and ratio > max_slowdown:
+            regressions.append(entry)
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark ingestion, Steps 3-4 and the OCEL conversion on synthetic data.")
+    parser.add_argument("--sizes", nargs="+", choices=list(SIZES), default=["small"], help="Data sizes (default: small)")
+    parser.add_argument("--scenarios", nargs="+", choices=SCENARIOS, default=SCENARIOS, help="Scenarios (default: all)")
+    parser.add_argument("-o", "--output", default="benchmark_report.json", help="Report path (default: benchmark_report.json)")
+    parser.add_argument("--latency", type=float, default=DEFAULT_LATENCY, help="Fake API seconds per request (default: 0.05)")
+    parser.add_argument("--jitter", type=float, default=DEFAULT_JITTER, help="Fake API extra random seconds (default: 0)")
+    parser.add_argument("--error-rate", type=float, default=DEFAULT_ERROR_RATE, help="Share of fake API requests failing with 429")
+    parser.add_argument("--rpm", type=int, help="Fake API requests-per-minute limit (default: unlimited)")
+    parser.add_argument("--baseline", help="Earlier report to compare wall times against")
+    parser.add_argument("--max-slowdown", type=float, help="Exit with status 1 when a scenario is this many times slower than the baseline")
+    parser.add_argument("--child", choices=SCENARIOS, help=argparse.SUPPRESS)
+    parser.add_argument("--csv", help=argparse.SUPPRESS)
+    parser.add_argument("--size-spec", help=argparse.SUPPRESS)
+    parser.add_argument("--workdir", help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.child:
+        return run_child(args.child, args.csv, json.loads(args.size_spec), args.workdir)
+
+    report = {
+        "version": REPORT_VERSION,
+        "created": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "git_commit": git_commit(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "fake_api": {"latency": args.latency, "jitter": args.jitter, "error_rate": args.error_rate, "rpm": args.rpm},
+        "results": []
+    }
+    with tempfile.TemporaryDirectory(prefix="exoar_bench_") as workdir, \
+            FakeOpenAIServer(latency=args.latency, jitter=args.jitter, error_rate=args.error_rate,
+                             requests_per_minute=args.rpm) as server:
+        for size_name in args.sizes:
+            size = SIZES[size_name]
+            csv_path = write_tockler_csv(os.path.join(workdir, f"tockler_{size_name}.csv"), **size)
+            for scenario in args.scenarios:
+                entry = run_scenario(scenario, size_name, csv_path, server, workdir)
+                report["results"].append(entry)
+                if entry["ok"]:
+                    print(f"{scenario:>12} {size_name:>6}: {entry['seconds']:.3f}s, "
+                          f"{entry['throughput']:,} {entry['unit']}, peak {entry['peak_rss_mb']} MB")
+                else:
+                    print(f"{scenario:>12} {size_name:>6}: FAILED ({entry['error']})")
+
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+    print(f"Benchmark report saved to '{args.output}'")
+
+    status = 0 if all(entry["ok"] for entry in report["results"]) else 1
+    if args.baseline:
+        with open(args.baseline, "r", encoding="utf-8") as f:
+            regressions = compare(report, json.load(f), args.max_slowdown)
+        if regressions:
+            print(f"{len(regressions)} scenarios are more than {args.max_slowdown}x slower than the baseline")
+            status = 1
+    return status
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,152 @@
+"""
+Synthetic Tockler exports for benchmarking.
+
+Usage (from the repository root):
+    python -m benchmarks.synthetic tockler-synthetic.csv --rows 200000 --titles 5000 --days 60
+"""
+import argparse
+import sys
+
+import numpy as np
+import pandas as pd
+
+TOCKLER_EXPORT_COLUMNS = ["App", "Type", "Title", "Begin", "End"]
+DEFAULT_START = "2025-01-06 08:00:00"
+WORKDAY_SECONDS = 9 * 3600
+
+# --- Title vocabulary ---
+APPS = ["Google Chrome", "Microsoft Edge", "Outlook", "Word", "Excel", "PowerPoint", "Microsoft Teams", "Visual Studio Code"]
+COURSES = ["INFOBPM", "INFOMPM", "INFODB", "BUSAN", "THESIS", "INFOSEN", "DATAVIS", "PROCMIN"]
+PEOPLE = ["Jansen", "de Vries", "Bakker", "Visser", "Smit", "Meijer", "de Boer", "Mulder", "Bos", "Vos"]
+TEMPLATES = [
+    "Grading exam {n} {course} - Remindo",
+    "{course} lecture {n} slides.pptx",
+    "Re: {course} assignment {n} question from {person}",
+    "Thesis draft {person} v{n}.docx",
+    "Inbox ({n}) - {person}@uu.nl - Outlook",
+    "{course} - Blackboard - week {n}",
+    "Meeting with {person} about {course}",
+    "Review paper {n} - EasyChair",
+    "Budget {course} {n}.xlsx",
+    "YouTube - process mining tutorial {n}",
+]
+# Variants of one window that title grouping should fold together
+DECORATIONS = ["{title}", "({k}) {title}", "{title} - {app}", "* {title}", "{title} - {app} - Work"]
+
+
+def make_titles(count, seed=0):
+    """count distinct window titles drawn from a small professional vocabulary, with app and counter variants."""
+    rng = np.random.default_rng(seed)
+    titles = []
+    seen = set()
+    while len(titles) < count:
+        base = rng.choice(TEMPLATES).format(
+            n=int(rng.integers(1, max(count // 20, 10))),
+            course=rng.choice(COURSES),
+            person=rng.choice(PEOPLE)
+        )
+        title = rng.choice(DECORATIONS).format(title=base, k=int(rng.integers(1, 20)), app=rng.choice(APPS))
+        if title not in seen:
+            seen.add(title)
+            titles.append(title)
+    return titles
+
+
+def generate_tockler(rows, titles, days, seed=0, start=DEFAULT_START):
+    """
+    A Tockler-like DataFrame with the given number of rows, distinct titles
+    and working days. Title popularity follows a Zipf-like distribution and
+    consecutive rows on the same day are back to back, as in real exports.
+    """
+    rng = np.random.default_rng(seed)
+    vocabulary = np.array(make_titles(titles, seed=seed), dtype=object)
+    weights = 1.0 / np.arange(1, titles + 1)
+    picks = rng.choice(titles, size=rows, p=weights / weights.sum())
+    # Every title appears at least once, so the distinct count is exact
+    picks[rng.permutation(rows)[:min(rows, titles)]] = np.arange(min(rows, titles))
+
+    day = np.sort(rng.integers(0, days, size=rows))
+    durations = rng.integers(1, 300, size=rows)
+    # Seconds since the start of each day: running sum of durations within the day, wrapped into a workday
+    first_of_day = np.r_[True, day[1:] != day[:-1]]
+    cumulative = np.cumsum(durations)
+    day_start = np.maximum.accumulate(np.where(first_of_day, cumulative - durations, 0))
+    offset = (cumulative - durations - day_start) % WORKDAY_SECONDS
+
+    begin = pd.Timestamp(start) + pd.to_timedelta(day, unit="D") + pd.to_timedelta(offset, unit="s")
+    end = begin + pd.to_timedelta(durations, unit="s")
+    return pd.DataFrame({
+        "App": "benchmark",
+        "Type": "app",
+        "Title": vocabulary[picks],
+        "Begin": begin.strftime("%Y-%m-%d %H:%M:%S"),
+        "End": end.strftime("%Y-%m-%d %H:%M:%S")
+    }, columns=TOCKLER_EXPORT_COLUMNS)
+
+
+# --- Step 3 objects with duplicate spellings (for entity resolution) ---
+SYLLABLES = ["ba", "ker", "jan", "sen", "vis", "ser", "mei", "jer", "bo", "er", "mul", "der", "smit", "vos", "de", "ri"]
+FIRST_NAMES = ["Anna", "Bram", "Daan", "Eva", "Femke", "Joris", "Lotte", "Mila", "Noah", "Sanne", "Thijs", "Vera"]
+
+
+def _code(i):
+    letters = ""
+    while True:
+        letters = chr(ord("A") + i % 26) + letters
+        i //= 26
+        if not i:
+            return "INFO" + letters
+
+
+def make_objects(count, seed=0):
+    """
+    count Step 3 objects: people, courses and conferences, where every third
+    entity is also listed under another spelling ("Bakker, A. (Anna)"
+    and "Anna Bakker", "INFOBPM" and "Course (INFOBPM)", with and without a year).
+    """
+    rng = np.random.default_rng(seed)
+    objects = []
+    i = 0
+    while len(objects) < count:
+        kind = i % 3
+        if kind == 0:
+            last = "".join(rng.choice(SYLLABLES, size=3)).capitalize() + str(i)
+            first = FIRST_NAMES[i % len(FIRST_NAMES)]
+            names = [f"{last}, {first[0]}. ({first})", f"{first} {last}"]
+            object_type = "colleagues"
+        elif kind == 1:
+            code = _code(i)
+            names = [f"{code.title()} course {i} ({code})", code]
+            object_type = "courses"
+        else:
+            name = f"Workshop on {' '.join(rng.choice(SYLLABLES, size=2))} {i}"
+            names = [f"{name} 2025", name]
+            object_type = "conferences"
+        duplicated = (i // 3) % 3 == 0
+        objects.extend({"object": name, "object_type": object_type} for name in names[:2 if duplicated else 1])
+        i += 1
+    return objects[:count]
+
+
+def write_tockler_csv(path, rows, titles, days, seed=0):
+    generate_tockler(rows, titles, days, seed=seed).to_csv(path, sep=";", index=False)
+    return path
+
+
+# --- CLI ---
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Write a synthetic Tockler export (';'-separated CSV).")
+    parser.add_argument("output", help="Output CSV path")
+    parser.add_argument("--rows", type=int, default=10_000, help="Number of rows (default: 10000)")
+    parser.add_argument("--titles", type=int, default=500, help="Number of distinct titles (default: 500)")
+    parser.add_argument("--days", type=int, default=20, help="Number of days covered (default: 20)")
+    parser.add_argument("--seed", type=int, default=0, help="Random seed (default: 0)")
+    args = parser.parse_args(argv)
+
+    write_tockler_csv(args.output, args.rows, args.titles, args.days, seed=args.seed)
+    print(f"Synthetic Tockler export with {args.rows} rows and {args.titles} titles saved to '{args.output}'")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
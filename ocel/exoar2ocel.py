@@ -0,0 +1,252 @@
+"""
+Convert a Tockler export plus the Step 5 results JSON into an OCEL 2.0 log.
+
+Usage (from the repository root):
+    python -m ocel.exoar2ocel tockler-export.csv results.json -o ocel_log.json
+    python -m ocel.exoar2ocel tockler-export.csv results.json --merge-by label --max-gap 120
+    python -m ocel.exoar2ocel laptop.csv desktop.csv exports.zip results.json -o ocel_log.sqlite
+
+Consecutive rows of the same window are merged into episodes first (see
+ocel.sessionize); pass --raw-rows for one event per export row.
+"""
+import argparse
+import json
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+
+from ocel.sessionize import sessionize, label_keys, DEFAULT_MAX_GAP_SECONDS, MERGE_BY
+from ocel.writers import EVENT_ATTRIBUTES, event_types, object_types, event_records, object_records, write_ocel_json, write_ocel_sqlite
+from utils.export import read_export
+from utils.ingest import read_intervals
+from utils.matcher import ObjectMatcher
+from utils.sources import detect_adapter, read_head, sniff_header
+from utils.objects import split_aliases
+
+UNKNOWN_EVENT_TYPE = "Unknown"
+UNKNOWN_OBJECT_TYPE = "unknown"
+QUALIFIER = "name"
+SQLITE_EXTENSIONS = (".sqlite", ".sqlite3", ".db")
+TIME_FORMAT = "%Y-%m-%d %H:%M:%S"
+
+
+# --- Inputs ---
+def load_tockler_csv(path, sep=";"):
+    return pd.read_csv(path, sep=sep, usecols=lambda c: c in ("Title", "Begin", "End"))
+
+
+def load_sources(paths, dedupe=True, overlaps=False):
+    """
+    One Tockler-like Title/Begin/End table from one or more exports (files,
+    directories or zip archives, of any tracker with an adapter in
+    utils.sources), following the same rules as the Home page: a single
+    Tockler CSV is read as it is; several are merged in time order, without
+    rows repeated in several exports unless dedupe is False. overlaps=True
+    also trims time recorded twice.
+    """
+    if len(paths) == 1 and os.path.isfile(paths[0]) and not paths[0].lower().endswith(".zip") and not overlaps:
+        sep, columns = sniff_header(read_head(paths[0]))
+        if detect_adapter(columns).name == "Tockler":
+            return load_tockler_csv(paths[0], sep=sep)
+    intervals, _ = read_intervals(paths, dedupe=dedupe, overlaps=overlaps)
+    intervals = intervals.sort_values("Begin", kind="stable", ignore_index=True)
+    return pd.DataFrame({
+        "Title": intervals["Title"],
+        "Begin": intervals["Begin"].dt.strftime(TIME_FORMAT),
+        "End": intervals["End"].dt.strftime(TIME_FORMAT)
+    })
+
+
+def load_results(path):
+    # Any Step 5 download: indented or compact JSON, NDJSON, or either gzipped
+    return read_export(path)
+
+
+# --- Lookup indexes ---
+def object_type_index(confirmed_objects):
+    # First entry wins, like the original linear scan over confirmed_objects
+    index = {}
+    for entry in confirmed_objects:
+        index.setdefault(entry["object"], entry["object_type"])
+    return index
+
+
+def alias_index(confirmed_objects):
+    # Other spellings merged in Step 3 -> their canonical object name
+    index = {}
+    for entry in confirmed_objects:
+        for alias in split_aliases(entry.get("aliases")):
+            index.setdefault(alias, entry["object"])
+    return index
+
+
+def name_patterns(confirmed_objects):
+    # Every name and alias to match in titles, with the confirmed object each belongs to, in list order
+    patterns, owners = [], []
+    for i, entry in enumerate(confirmed_objects):
+        for name in [entry["object"]] + split_aliases(entry.get("aliases")):
+            patterns.append(name)
+            owners.append(i)
+    return patterns, owners
+
+
+def title_index(results):
+    # Reviewed titles override the GPT and locally labelled suggestions for the same title
+    step4 = results.get("step4", {})
+    index = {}
+    suggestions = step4.get("gpt_suggestions", []) + step4.get("local_suggestions", [])
+    for entry in suggestions + step4.get("reviewed_sample", []):
+        index[entry["title"]] = (entry.get("activities", []), entry.get("objects", []))
+    return index
+
+
+# --- Episodes ---
+def episodes(df_csv, results, max_gap=DEFAULT_MAX_GAP_SECONDS, merge_by="title"):
+    """Merge consecutive rows with the same title, or with merge_by="label" the same labels, into episodes."""
+    keys = label_keys(title_index(results)) if merge_by == "label" else None
+    return sessionize(df_csv, max_gap, keys)
+
+
+# --- Event, object and relationship tables ---
+def build_tables(df_csv, results):
+    """
+    Return (events, objects, relations) DataFrames in OCEL order.
+
+    events:    id, type, time, plus start, end and duration when df_csv holds
+               episodes (see ocel.sessionize) instead of raw rows
+    objects:   id, type, name, time (of first occurrence)
+    relations: event_id, object_id, qualifier (grouped in event order)
+
+    Aliases of confirmed objects (see utils.resolution) are matched in titles
+    and mapped onto their canonical object, so each object appears once.
+    """
+    confirmed_objects = results.get("step3", {}).get("confirmed_objects", [])
+    types_by_object = object_type_index(confirmed_objects)
+    labels = title_index(results)
+
+    rows = pd.DataFrame({"row": np.arange(len(df_csv)), "Title": df_csv["Title"].values, "time": df_csv["Begin"].values})
+    attributes = []
+    if "duration" in df_csv:
+        rows = rows.assign(start=df_csv["Begin"].values, end=df_csv["End"].values, duration=df_csv["duration"].values)
+        attributes = list(EVENT_ATTRIBUTES)
+
+    # Labelled titles: one event per activity, related to every labelled object
+    known = pd.DataFrame(
+        [(title, activities, objects) for title, (activities, objects) in labels.items()],
+        columns=["Title", "activities", "objects"]
+    )
+    labelled = rows.merge(known, on="Title", how="inner").sort_values("row", kind="stable")
+    processed_titles = set(labelled["Title"])
+    labelled_events = (
+        labelled.explode("activities")
+        .dropna(subset=["activities"])
+        .rename(columns={"activities": "type"})
+        .reset_index(drop=True)
+    )
+    labelled_events["event"] = np.arange(len(labelled_events))
+    labelled_rel = (
+        labelled_events[["event", "objects", "time"]]
+        .explode("objects")
+        .dropna(subset=["objects"])
+        .rename(columns={"objects": "name"})
+    )
+    aliases = alias_index(confirmed_objects)
+    if aliases:
+        labelled_rel["name"] = labelled_rel["name"].map(aliases).fillna(labelled_rel["name"])
+    labelled_rel["type"] = labelled_rel["name"].map(types_by_object).fillna(UNKNOWN_OBJECT_TYPE)
+
+    # Remaining titles: one "Unknown" event for the first confirmed object found in the title
+    row_titles = rows["Title"].where(rows["Title"].notnull(), "").astype(str)
+    unprocessed = rows[~row_titles.isin(processed_titles)].assign(Title=row_titles)
+    patterns, owners = name_patterns(confirmed_objects)
+    matcher = ObjectMatcher(patterns)
+    # Patterns are grouped by owner in list order, so the earliest pattern belongs to the first object found
+    first_pattern = {title: matcher.first_match(title) for title in unprocessed["Title"].unique()}
+    first_object = {title: None if i is None else owners[i] for title, i in first_pattern.items()}
+    unknown_events = unprocessed.assign(match=unprocessed["Title"].map(first_object)).dropna(subset=["match"])
+    match = unknown_events["match"].astype(int).to_numpy()
+    unknown_events = unknown_events.assign(
+        type=UNKNOWN_EVENT_TYPE,
+        event=np.arange(len(labelled_events), len(labelled_events) + len(unknown_events)),
+        name=[confirmed_objects[i]["object"] for i in match],
+        object_type=[confirmed_objects[i]["object_type"] for i in match]
+    )
+    unknown_rel = unknown_events[["event", "name", "time", "object_type"]].rename(columns={"object_type": "type"})
+
+    event_columns = ["event", "type", "time"] + attributes
+    events = pd.concat([labelled_events[event_columns], unknown_events[event_columns]], ignore_index=True)
+    events["id"] = "e" + (events["event"] + 1).astype(str)
+
+    relations = pd.concat([labelled_rel, unknown_rel], ignore_index=True)
+    objects = relations.drop_duplicates("name").reset_index(drop=True)[["name", "type", "time"]]
+    objects["id"] = "o" + pd.Series(np.arange(1, len(objects) + 1), dtype=str)
+    object_ids = dict(zip(objects["name"], objects["id"]))
+
+    relations = pd.DataFrame({
+        "event_id": "e" + (relations["event"] + 1).astype(str),
+        "object_id": relations["name"].map(object_ids),
+        "qualifier": QUALIFIER
+    })
+    return events[["id", "type", "time"] + attributes], objects[["id", "type", "name", "time"]], relations
+
+
+# --- OCEL 2.0 JSON ---
+def build_ocel(df_csv, results, max_gap=DEFAULT_MAX_GAP_SECONDS, merge_by="title"):
+    # max_gap=None keeps one event per export row
+    if max_gap is not None:
+        df_csv = episodes(df_csv, results, max_gap, merge_by)
+    events, objects, relations = build_tables(df_csv, results)
+    return {
+        "eventTypes": event_types(events),
+        "objectTypes": object_types(objects),
+        "events": list(event_records(events, relations)),
+        "objects": list(object_records(objects))
+    }
+
+
+def write_ocel(ocel, path):
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(ocel, f, indent=2)
+
+
+# --- CLI ---
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Convert a Tockler export and Step 5 results into an OCEL 2.0 log.")
+    parser.add_argument("csv", nargs="+", help="Tockler export (';'-separated CSV), or several exports, directories or zip archives")
+    parser.add_argument("results", help="Results downloaded in Step 5 (JSON, NDJSON or gzipped JSON)")
+    parser.add_argument("-o", "--output", default="ocel_log.json", help="Output path (default: ocel_log.json)")
+    parser.add_argument("--format", choices=["json", "sqlite"], help="Output format (default: from the output extension)")
+    parser.add_argument("--compact", action="store_true", help="Write JSON without indentation")
+    parser.add_argument("--gzip", action="store_true", help="Gzip the JSON output (implied by a .gz extension)")
+    parser.add_argument("--max-gap", type=float, default=DEFAULT_MAX_GAP_SECONDS,
+                        help=f"Idle seconds allowed between rows of one episode (default: {DEFAULT_MAX_GAP_SECONDS})")
+    parser.add_argument("--merge-by", choices=MERGE_BY, default="title", help="Merge rows with the same title or the same labels (default: title)")
+    parser.add_argument("--raw-rows", action="store_true", help="One event per export row instead of per episode")
+    parser.add_argument("--keep-duplicates", action="store_true", help="Keep rows repeated in several exports")
+    parser.add_argument("--trim-overlaps", action="store_true", help="Count time recorded twice (e.g. on two computers) once")
+    args = parser.parse_args(argv)
+
+    output_format = args.format or ("sqlite" if args.output.lower().endswith(SQLITE_EXTENSIONS) else "json")
+    df_csv = load_sources(args.csv, dedupe=not args.keep_duplicates, overlaps=args.trim_overlaps)
+    results = load_results(args.results)
+    rows = len(df_csv)
+    if not args.raw_rows:
+        df_csv = episodes(df_csv, results, args.max_gap, args.merge_by)
+        print(f"Merged {rows} rows into {len(df_csv)} episodes")
+    events, objects, relations = build_tables(df_csv, results)
+    if output_format == "sqlite":
+        write_ocel_sqlite(args.output, events, objects, relations)
+    else:
+        write_ocel_json(
+            args.output, events, objects, relations,
+            indent=None if args.compact else 2,
+            compress=args.gzip or args.output.lower().endswith(".gz")
+        )
+    print(f"OCEL 2.0 log with {len(events)} events and {len(objects)} objects saved to '{args.output}'")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,61 @@
+"""
+Merge consecutive Tockler rows into episodes before building OCEL events.
+
+Tockler writes many short, back-to-back rows while the same window stays in
+focus. An episode is a run of consecutive rows with the same title (or the
+same label) where each row starts at most max_gap seconds after the previous
+one ended. Each episode becomes one row with Title and Begin (of its first
+row), End (of its last row) and duration (the summed seconds of its rows), so
+it can be passed to ocel.exoar2ocel.build_tables in place of the raw export.
+"""
+import json
+
+import numpy as np
+import pandas as pd
+
+DEFAULT_MAX_GAP_SECONDS = 60
+MERGE_BY = ("title", "label")
+
+
+def label_keys(labels):
+    """Titles keyed by their label, for merging differently titled rows that were labelled alike."""
+    return {
+        title: json.dumps([sorted(activities), sorted(objects)])
+        for title, (activities, objects) in labels.items()
+        if activities
+    }
+
+
+def sessionize(df_csv, max_gap=DEFAULT_MAX_GAP_SECONDS, keys=None):
+    """
+    Return one row per episode, in time order: Title, Begin, End, duration
+    and rows (the number of export rows merged). keys optionally maps titles
+    to the value rows are merged on; titles missing from it merge on
+    themselves. Done as one sort and shifted comparisons, without a loop.
+    """
+    begin = pd.to_datetime(df_csv["Begin"])
+    end = pd.to_datetime(df_csv["End"])
+    frame = pd.DataFrame({
+        "Title": df_csv["Title"].values,
+        "Begin": df_csv["Begin"].values,
+        "End": df_csv["End"].values,
+        "begin": begin.values,
+        "end": end.values
+    }).sort_values("begin", kind="stable", na_position="last", ignore_index=True)
+
+    title = frame["Title"].where(frame["Title"].notnull(), "").astype(str)
+    key = title if keys is None else title.map(keys).fillna(title)
+    gap = (frame["begin"] - frame["end"].shift()).dt.total_seconds()
+    # A row starts a new episode when its key changes or it does not follow the previous row closely (or has no times)
+    starts = (key != key.shift()) | ~(gap <= max_gap)
+
+    firsts = np.flatnonzero(starts.to_numpy())
+    bounds = np.r_[firsts, len(frame)]
+    durations = (frame["end"] - frame["begin"]).dt.total_seconds().fillna(0.0).clip(lower=0.0).to_numpy()
+    return pd.DataFrame({
+        "Title": frame["Title"].to_numpy()[firsts],
+        "Begin": frame["Begin"].to_numpy()[firsts],
+        "End": frame["End"].to_numpy()[bounds[1:] - 1],
+        "duration": np.add.reduceat(durations, firsts) if len(firsts) else durations,
+        "rows": np.diff(bounds)
+    })
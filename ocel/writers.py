@@ -0,0 +1,189 @@
+"""
+OCEL 2.0 output: in-memory records, a streaming JSON writer and a SQLite export.
+
+All writers take the (events, objects, relations) tables produced by
+ocel.exoar2ocel.build_tables and never materialise the full log as dicts.
+"""
+import gzip
+import itertools
+import json
+import os
+import re
+import sqlite3
+
+import numpy as np
+
+NAME_ATTRIBUTE = "name"
+# Episode attributes (see ocel.sessionize) written for events that carry them, with their OCEL 2.0 types
+EVENT_ATTRIBUTES = {"start": "time", "end": "time", "duration": "float"}
+SQLITE_BATCH_SIZE = 50_000
+SQLITE_TYPES = {"time": "TIMESTAMP", "float": "REAL", "integer": "INTEGER", "string": "TEXT"}
+# Per-type tables are named event_<suffix> and object_<suffix>; these suffixes would clash with fixed schema
+# tables (event_object, object_object)
+RESERVED_SUFFIXES = {"object"}
+
+
+# --- Records ---
+def _event_attributes(events):
+    return [name for name in EVENT_ATTRIBUTES if name in events.columns]
+
+
+def event_types(events):
+    attributes = [{"name": name, "type": EVENT_ATTRIBUTES[name]} for name in _event_attributes(events)]
+    return [{"name": etype, "attributes": attributes} for etype in sorted(events["type"].unique())]
+
+
+def object_types(objects):
+    return [
+        {"name": otype, "attributes": [{"name": NAME_ATTRIBUTE, "type": "string"}]}
+        for otype in objects["type"].drop_duplicates()
+    ]
+
+
+def event_records(events, relations):
+    # Relations are ordered like events, so each event's relationships are one contiguous slice
+    counts = events["id"].map(relations.groupby("event_id", sort=False).size()).fillna(0).astype(int).to_numpy()
+    ends = np.cumsum(counts)
+    object_ids = relations["object_id"].tolist()
+    qualifiers = relations["qualifier"].tolist()
+    names = _event_attributes(events)
+    values = zip(*(events[name].tolist() for name in names)) if names else itertools.repeat(())
+    for event_id, etype, time, end, count, row in zip(events["id"], events["type"], events["time"], ends, counts, values):
+        yield {
+            "id": event_id,
+            "type": etype,
+            "time": time,
+            "attributes": [{"name": name, "value": value} for name, value in zip(names, row)],
+            "relationships": [
+                {"objectId": object_ids[i], "qualifier": qualifiers[i]}
+                for i in range(end - count, end)
+            ]
+        }
+
+
+def object_records(objects):
+    for object_id, otype, name, time in zip(objects["id"], objects["type"], objects["name"], objects["time"]):
+        yield {
+            "id": object_id,
+            "type": otype,
+            "attributes": [{"name": NAME_ATTRIBUTE, "time": time, "value": name}]
+        }
+
+
+# --- Streaming JSON ---
+def _write_array(f, key, records, indent, last):
+    if indent is None:
+        f.write(json.dumps(key) + ":[")
+        for i, record in enumerate(records):
+            if i:
+                f.write(",")
+            f.write(json.dumps(record, separators=(",", ":")))
+        f.write("]" if last else "],")
+        return
+
+    # Same layout as json.dump(..., indent=indent) for a top-level dict of arrays
+    pad = " " * indent
+    f.write(f"{pad}{json.dumps(key)}: [")
+    empty = True
+    for record in records:
+        f.write("\n" if empty else ",\n")
+        empty = False
+        body = json.dumps(record, indent=indent)
+        f.write("\n".join(pad * 2 + line for line in body.split("\n")))
+    f.write("]" if empty else f"\n{pad}]")
+    f.write("\n" if last else ",\n")
+
+
+def write_ocel_json(path, events, objects, relations, indent=None, compress=False):
+    """Stream the log to disk record by record; indent=None writes compact JSON."""
+    opener = gzip.open if compress else open
+    with opener(path, "wt", encoding="utf-8") as f:
+        f.write("{" if indent is None else "{\n")
+        _write_array(f, "eventTypes", event_types(events), indent, last=False)
+        _write_array(f, "objectTypes", object_types(objects), indent, last=False)
+        _write_array(f, "events", event_records(events, relations), indent, last=False)
+        _write_array(f, "objects", object_records(objects), indent, last=True)
+        f.write("}")
+
+
+# --- OCEL 2.0 SQLite ---
+def _type_maps(types):
+    # Per-type table suffixes: alphanumeric, unique and not a fixed table's, as in the OCEL 2.0 relational format
+    maps = {}
+    used = set(RESERVED_SUFFIXES)
+    for otype in types:
+        base = re.sub(r"[^0-9A-Za-z]", "", str(otype)) or "type"
+        name = base
+        suffix = 2
+        while name.lower() in used:
+            name = f"{base}{suffix}"
+            suffix += 1
+        used.add(name.lower())
+        maps[otype] = name
+    return maps
+
+
+def _insert_batches(conn, sql, rows):
+    batch = []
+    for row in rows:
+        batch.append(row)
+        if len(batch) >= SQLITE_BATCH_SIZE:
+            conn.executemany(sql, batch)
+            batch = []
+    if batch:
+        conn.executemany(sql, batch)
+
+
+def write_ocel_sqlite(path, events, objects, relations):
+    """Write the log as an OCEL 2.0 SQLite database using bulk inserts in one transaction."""
+    event_maps = _type_maps(sorted(events["type"].unique()))
+    object_maps = _type_maps(objects["type"].drop_duplicates())
+
+    # Start from an empty file so per-type tables from an earlier run do not linger
+    if os.path.exists(path):
+        os.remove(path)
+    conn = sqlite3.connect(path)
+    try:
+        conn.execute("PRAGMA journal_mode=OFF")
+        conn.execute("PRAGMA synchronous=OFF")
+        with conn:
+            conn.execute('CREATE TABLE "event" (ocel_id TEXT PRIMARY KEY, ocel_type TEXT)')
+            conn.execute('CREATE TABLE "object" (ocel_id TEXT PRIMARY KEY, ocel_type TEXT)')
+            conn.execute('CREATE TABLE "event_object" (ocel_event_id TEXT, ocel_object_id TEXT, ocel_qualifier TEXT, '
+                         'PRIMARY KEY (ocel_event_id, ocel_object_id, ocel_qualifier))')
+            conn.execute('CREATE TABLE "object_object" (ocel_source_id TEXT, ocel_target_id TEXT, ocel_qualifier TEXT, '
+                         'PRIMARY KEY (ocel_source_id, ocel_target_id, ocel_qualifier))')
+            conn.execute('CREATE TABLE "event_map_type" (ocel_type TEXT PRIMARY KEY, ocel_type_map TEXT)')
+            conn.execute('CREATE TABLE "object_map_type" (ocel_type TEXT PRIMARY KEY, ocel_type_map TEXT)')
+            conn.executemany('INSERT INTO "event_map_type" VALUES (?, ?)', event_maps.items())
+            conn.executemany('INSERT INTO "object_map_type" VALUES (?, ?)', object_maps.items())
+
+            attributes = _event_attributes(events)
+            columns = "".join(f', "{name}" {SQLITE_TYPES[EVENT_ATTRIBUTES[name]]}' for name in attributes)
+            for etype, suffix in event_maps.items():
+                conn.execute(f'CREATE TABLE "event_{suffix}" (ocel_id TEXT PRIMARY KEY, ocel_time TIMESTAMP{columns})')
+            for otype, suffix in object_maps.items():
+                conn.execute(f'CREATE TABLE "object_{suffix}" (ocel_id TEXT, ocel_time TIMESTAMP, '
+                             f'ocel_changed_field TEXT, "{NAME_ATTRIBUTE}" TEXT)')
+
+            _insert_batches(conn, 'INSERT INTO "event" VALUES (?, ?)', zip(events["id"], events["type"]))
+            placeholders = ", ".join("?" * (2 + len(attributes)))
+            for etype, group in events.groupby("type", sort=False):
+                _insert_batches(
+                    conn, f'INSERT INTO "event_{event_maps[etype]}" VALUES ({placeholders})',
+                    zip(group["id"], group["time"].astype(str), *(group[name].tolist() for name in attributes))
+                )
+
+            _insert_batches(conn, 'INSERT INTO "object" VALUES (?, ?)', zip(objects["id"], objects["type"]))
+            for otype, group in objects.groupby("type", sort=False):
+                _insert_batches(
+                    conn, f'INSERT INTO "object_{object_maps[otype]}" VALUES (?, ?, NULL, ?)',
+                    zip(group["id"], group["time"].astype(str), group["name"])
+                )
+
+            _insert_batches(
+                conn, 'INSERT OR IGNORE INTO "event_object" VALUES (?, ?, ?)',
+                zip(relations["event_id"], relations["object_id"], relations["qualifier"])
+            )
+    finally:
+        conn.close()
@@ -1,10 +1,16 @@
 import streamlit as st
-import openai
-import json
+from datetime import datetime
+from utils.llm import chat_completion, discard_completion
+from utils.responses import parse_json_array, string_list_format
+from utils.utils import get_llm_metrics, show_llm_metrics, snapshot_session, restore_saved
+from utils.label_store import get_label_store, OBJECT_TYPES
 
 # --- Page Setup ---
 st.set_page_config(page_title="Step 1: Identify Object Types", layout="centered", initial_sidebar_state="collapsed")
 
+# --- Saved session: keys this page uses, read on first use after resuming ---
+restore_saved("source", "original_object_types", "confirmed_object_types", "added_object_types", "removed_object_types")
+
 # --- Validate required inputs from Home page ---
 if "api_key" not in st.session_state or "profession" not in st.session_state:
     st.warning("⚠️ Please enter your API key and profession on the Home page before continuing.")
@@ -26,9 +32,7 @@ predefined_object_types = [
 ]
 
 # --- GPT Call ---
-@st.cache_data(show_spinner="🔄 Generating object types from GPT...")
 def generate_object_types_from_gpt(profession, api_key):
-    client = openai.OpenAI(api_key=api_key)
     system_prompt = """
 You are an assistant specialized in semantic object recognition. Your task is to identify high-level object types based on a user’s profession. Object types represent general categories, human and non-human, and are used in object-centric event logs to group related entities.
 
@@ -60,20 +64,17 @@ Output:
 
     user_prompt = f"Profession: \"{profession}\""
 
+    messages = [
+        {"role": "system", "content": system_prompt},
+        {"role": "user", "content": user_prompt}
+    ]
+
+    response_format = string_list_format("object_types")
     try:
-        response = client.chat.completions.create(
-            model="gpt-4.1",
-            messages=[
-                {"role": "system", "content": system_prompt},
-                {"role": "user", "content": user_prompt}
-            ],
-            temperature=0.7
-        )
-        output = response.choices[0].message.content
-        if output.startswith("```json"):
-            output = output.strip("` ").replace("json", "").strip()
-        return json.loads(output)
-    except json.JSONDecodeError as e:
+        output = chat_completion(api_key, messages, metrics=get_llm_metrics(), step="step1", response_format=response_format)
+        return [item for item in parse_json_array(output) if isinstance(item, str)]
+    except ValueError as e:
+        discard_completion(messages, response_format=response_format)
         st.error(f"❌ Failed to parse GPT response. Error: {e}")
         st.code(output)
         return None
@@ -87,6 +88,19 @@ This first step focuses on identifying relevant object types, i.e., general cate
 
 user_type = st.session_state.get("user_type", "")
 
+# --- Reuse object types confirmed in an earlier session ---
+saved = get_label_store().load_profile(st.session_state.get("profession"), OBJECT_TYPES)
+if saved:
+    saved_types, saved_at = saved
+    st.info(f"💾 You confirmed {len(saved_types)} object types for this profession on {datetime.fromtimestamp(saved_at):%Y-%m-%d %H:%M}.")
+    if st.button("♻️ Use My Saved Object Types"):
+        st.session_state['original_object_types'] = list(saved_types)
+        st.session_state['confirmed_object_types'] = list(saved_types)
+        st.session_state['added_object_types'] = []
+        st.session_state['removed_object_types'] = []
+        st.session_state['source'] = "saved"
+        st.success("🎯 Saved object types loaded!")
+
 if user_type == "Yes":
     st.markdown("You are using a predefined list of object types tailored for academic staff. " \
         "Please review them and reflect on whether are likely to appear in your work."
@@ -119,6 +133,8 @@ if user_type == "Yes":
         st.session_state['added_object_types'] = list(final_set - original_set)
         st.session_state['removed_object_types'] = list(original_set - final_set)
         st.session_state['source'] = "predefined"
+        get_label_store().save_profile(st.session_state.get("profession"), OBJECT_TYPES, list(final_set))
+        snapshot_session("Step 1")
         st.success("🎯 Object types confirmed from predefined list!")
         st.balloons()
 
@@ -137,7 +153,8 @@ else:
         elif not profession_input.strip():
             st.error("⚠️ Please enter a valid profession.")
         else:
-            gpt_types = generate_object_types_from_gpt(profession_input.strip(), api_key)
+            with st.spinner("🔄 Generating object types from GPT..."):
+                gpt_types = generate_object_types_from_gpt(profession_input.strip(), api_key)
             if gpt_types:
                 st.session_state['gpt_object_types'] = gpt_types.copy()
                 st.session_state['gpt_selected'] = gpt_types.copy()
@@ -170,9 +187,13 @@ else:
             st.session_state['added_object_types'] = list(final_set - original_set)
             st.session_state['removed_object_types'] = list(original_set - final_set)
             st.session_state['original_object_types'] = list(original_set)
+            get_label_store().save_profile(st.session_state.get("profession"), OBJECT_TYPES, list(final_set))
+            snapshot_session("Step 1")
             st.success("🎯 Object types confirmed from GPT!")
             st.balloons()
 
+show_llm_metrics("step1")
+
 cols = st.columns([1, 6, 1])
 
 with cols[0]:
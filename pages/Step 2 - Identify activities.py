@@ -1,10 +1,21 @@
 import streamlit as st
-import openai
 import json
+from datetime import datetime
+from utils.llm import chat_completion, discard_completion
+from utils.responses import parse_json_array, string_list_format
+from utils.utils import get_llm_metrics, show_llm_metrics, snapshot_session, restore_saved
+from utils.label_store import get_label_store, ACTIVITIES
+from utils.export import mark_changed
 
 # --- Page Setup ---
 st.set_page_config(page_title="Step 2: Identify Activities", layout="centered", initial_sidebar_state="collapsed")
 
+# --- Saved session: keys this page uses, read on first use after resuming ---
+restore_saved(
+    "source", "confirmed_object_types", "activity_source", "original_activities", "confirmed_activities",
+    "added_activities", "removed_activities", "step2_data"
+)
+
 # --- Custom CSS to shrink multiselect pills ---
 st.markdown("""
     <style>
@@ -52,14 +63,11 @@ predefined_activities = [
 ]
 
 # --- GPT Call to Generate Activities ---
-@st.cache_data(show_spinner="🔄 Generating activities from GPT...")
 def generate_activities_from_gpt(profession, object_types, api_key):
     if not object_types:
         st.error("❌ No object types provided. Please complete Step 1 first.")
         return None
 
-    client = openai.OpenAI(api_key=api_key)
-
     system_prompt = """
 You are an assistant specialized in semantic activity recognition. Your task is to identify high-level work activities based on a user's profession and relevant object types. 
 Activities describe meaningful steps a user performs and often reflect actions in business processes.
@@ -88,22 +96,17 @@ Output:
 
     user_prompt = f"Profession: {profession}\nObject Types: {json.dumps(object_types)}"
 
+    messages = [
+        {"role": "system", "content": system_prompt},
+        {"role": "user", "content": user_prompt}
+    ]
+
+    response_format = string_list_format("activities")
     try:
-        response = client.chat.completions.create(
-            model="gpt-4.1",
-            messages=[
-                {"role": "system", "content": system_prompt},
-                {"role": "user", "content": user_prompt}
-            ],
-            temperature=0.7
-        )
-        output = response.choices[0].message.content.strip()
-        if output.startswith("```"):
-            output = output.split("```", 1)[1].strip()
-        if output.startswith("json"):
-            output = output[4:].strip()
-        return json.loads(output)
-    except json.JSONDecodeError as e:
+        output = chat_completion(api_key, messages, metrics=get_llm_metrics(), step="step2", response_format=response_format)
+        return [item for item in parse_json_array(output) if isinstance(item, str)]
+    except ValueError as e:
+        discard_completion(messages, response_format=response_format)
         st.error(f"❌ Failed to parse GPT output: {e}")
         st.code(output)
         return None
@@ -117,6 +120,28 @@ In this second step, we shift our focus to recognizing relevant activities, i.e.
 
 user_type = st.session_state.get("user_type", "")
 
+# --- Reuse activities confirmed in an earlier session ---
+saved = get_label_store().load_profile(st.session_state.get("profession"), ACTIVITIES)
+if saved:
+    saved_activities, saved_at = saved
+    st.info(f"💾 You confirmed {len(saved_activities)} activities for this profession on {datetime.fromtimestamp(saved_at):%Y-%m-%d %H:%M}.")
+    if st.button("♻️ Use My Saved Activities"):
+        st.session_state['confirmed_activities'] = list(saved_activities)
+        st.session_state['original_activities'] = list(saved_activities)
+        st.session_state['added_activities'] = []
+        st.session_state['removed_activities'] = []
+        st.session_state['activity_source'] = "saved"
+        st.session_state['step2_data'] = {
+            "profession": st.session_state.get("profession"),
+            "source": "saved",
+            "original_activities": st.session_state['original_activities'],
+            "confirmed_activities": st.session_state['confirmed_activities'],
+            "added_activities": [],
+            "removed_activities": []
+        }
+        mark_changed(st.session_state, "step2_data")
+        st.success("🎯 Saved activities loaded!")
+
 if user_type == "Yes":
     st.markdown("You are using a predefined list of activities tailored for academic staff. " \
         "Please review them and reflect on whether are likely to appear in your work."
@@ -152,6 +177,9 @@ if user_type == "Yes":
             "added_activities": st.session_state['added_activities'],
             "removed_activities": st.session_state['removed_activities']
         }
+        mark_changed(st.session_state, "step2_data")
+        get_label_store().save_profile(st.session_state.get("profession"), ACTIVITIES, selected)
+        snapshot_session("Step 2")
         st.success("🎯 Activities confirmed from predefined list!")
         st.balloons()
 else:
@@ -168,7 +196,8 @@ else:
     st.info(f"🧱 Using object types: {', '.join(object_types)}")
 
     if st.button("🔍 Generate Activities with GPT"):
-        activities = generate_activities_from_gpt(profession, object_types, api_key)
+        with st.spinner("🔄 Generating activities from GPT..."):
+            activities = generate_activities_from_gpt(profession, object_types, api_key)
         if activities:
             st.session_state['gpt_activities'] = activities.copy()
             st.session_state['gpt_activities_selected'] = activities.copy()
@@ -203,9 +232,14 @@ else:
                 "added_activities": st.session_state['added_activities'],
                 "removed_activities": st.session_state['removed_activities']
             }
+            mark_changed(st.session_state, "step2_data")
+            get_label_store().save_profile(st.session_state.get("profession"), ACTIVITIES, selected)
+            snapshot_session("Step 2")
             st.success("🎯 Activities confirmed from GPT-generated list!")
             st.balloons()
 
+show_llm_metrics("step2")
+
 cols = st.columns([1, 6, 1])
 
 with cols[0]:
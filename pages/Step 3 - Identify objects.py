@@ -1,11 +1,27 @@
 import streamlit as st
 import pandas as pd
-import openai
 import json
+import queue
+from utils.llm import stream_json_array
+from utils.json_stream import PartialJSONArray
+from utils.responses import object_list_format, valid_objects
+from utils.utils import get_llm_metrics, show_llm_metrics, snapshot_session, restore_saved
+from utils.enrichment import make_batches, run_batches_concurrently, DEFAULT_MAX_CONCURRENCY
+from utils.objects import merge_object_lists, extract_local_objects, join_aliases, object_records, DEFAULT_TITLES_PER_CHUNK
+from utils.resolution import resolve_objects
+from utils.candidates import CandidateIndex
+from utils.label_store import get_label_store, OBJECTS, STEP3_SCOPE
+from utils.export import mark_changed
 
 # --- Page Setup ---
 st.set_page_config(page_title="Step 3: Identify Objects", layout="centered", initial_sidebar_state="collapsed")
 
+# --- Saved session: keys this page uses, read on first use after resuming ---
+restore_saved(
+    "confirmed_object_types", "confirmed_activities", "step3_summary_df", "step3_total_rows", "step4_all_titles",
+    "step3_analyzed_titles", "step3_gpt_objects", "step3_edited_objects", "step3_objects_df", "step3_data"
+)
+
 st.title("Step 3: Identify Objects")
 
 st.markdown("""
@@ -23,25 +39,11 @@ if "step3_summary_df" not in st.session_state or "step3_total_rows" not in st.se
 summary_df = st.session_state["step3_summary_df"]
 total_rows = st.session_state["step3_total_rows"]
 
-# --- UI ---
-st.markdown("---")
-st.header("🔍 Generate Objects with GPT")
-
-api_key = st.session_state.get("api_key")
-profession = st.session_state.get("profession")
-object_types = st.session_state.get("confirmed_object_types")
-activities = st.session_state.get("confirmed_activities")
-
-if not (profession and object_types and activities):
-    st.warning("⚠️ Please make sure you have completed Step 1 and Step 2 (profession, object types, and activities).")
+# --- GPT Call (map stage: one chunk of titles) ---
+MAX_KNOWN_OBJECTS = 50  # locally found objects listed in a prompt, those related to the chunk's titles only
 
-elif api_key:
-    if 'step3_gpt_objects' not in st.session_state:
-        if st.button("🧠 Generate Objects with GPT"):
-            client = openai.OpenAI(api_key=api_key)
-            titles = summary_df['Title'].tolist()
-
-            system_prompt = """
+def build_object_messages(profession, object_types, activities, titles, known_objects=None):
+    system_prompt = """
 You are an assistant specialized in extracting object instances from textual digital traces.
 Your task is to identify distinct object instances and assign them to appropriate object types.
 This is part of preparing structured data for object-centric process mining.
@@ -66,45 +68,170 @@ A JSON array of dictionaries:
 ]
 """
 
-            user_prompt = f"""
+    user_prompt = f"""
 Profession: {profession}
 Object Types: {json.dumps(object_types)}
 Activities: {json.dumps(activities)}
 Window Titles: {json.dumps(titles)}
+"""
+    if known_objects:
+        # Objects found locally: GPT only looks for others, and can reuse their exact spelling
+        user_prompt += f"""Known Objects (already found, do not repeat): {json.dumps([o["object"] for o in known_objects])}
 """
 
-            try:
-                response = client.chat.completions.create(
-                    model="gpt-4.1",
-                    messages=[
-                        {"role": "system", "content": system_prompt},
-                        {"role": "user", "content": user_prompt}
-                    ],
-                    temperature=0.7
-                )
+    return [
+        {"role": "system", "content": system_prompt},
+        {"role": "user", "content": user_prompt}
+    ]
+
+# Runs on worker threads, so errors are raised and reported by the caller instead of via st.error.
+# Objects are passed to on_item as soon as GPT has streamed them; an interrupted chunk raises PartialJSONArray.
+# Records without a string object and object type are dropped instead of failing the chunk.
+def extract_objects_chunk(profession, object_types, activities, titles, api_key, metrics=None, batch=None, on_item=None,
+                          known_objects=None):
+    messages = build_object_messages(profession, object_types, activities, titles, known_objects)
+
+    def keep_valid(item):
+        if on_item is not None and valid_objects([item]):
+            on_item(item)
+
+    try:
+        objects = stream_json_array(
+            api_key, messages, on_item=keep_valid, metrics=metrics, step="step3", batch=batch,
+            response_format=object_list_format(object_types)
+        )
+    except PartialJSONArray as e:
+        raise PartialJSONArray(valid_objects(e.items), e.reason) from e
+    return valid_objects(objects)
+
+# --- Object table ---
+def objects_frame(objects):
+    # One row per object, with its aliases joined into one editable text cell
+    return pd.DataFrame(
+        [(o["object"], o.get("object_type"), join_aliases(o.get("aliases") or [])) for o in objects],
+        columns=["object", "object_type", "aliases"]
+    )
 
-                output = response.choices[0].message.content.strip()
+# --- UI ---
+st.markdown("---")
+st.header("🔍 Generate Objects with GPT")
+
+api_key = st.session_state.get("api_key")
+profession = st.session_state.get("profession")
+object_types = st.session_state.get("confirmed_object_types")
+activities = st.session_state.get("confirmed_activities")
 
-                # Extract the first JSON block if multiple outputs are present
-                if "```json" in output:
-                    output = output.split("```json")[1].split("```", 1)[0].strip()
-                elif "```" in output:
-                    output = output.split("```", 1)[1].split("```", 1)[0].strip()
+if not (profession and object_types and activities):
+    st.warning("⚠️ Please make sure you have completed Step 1 and Step 2 (profession, object types, and activities).")
 
-                #st.markdown("**🔎 Raw GPT Output:**")
-                #st.code(output, language="json")
-                object_data = json.loads(output)
+elif api_key:
+    if 'step3_gpt_objects' not in st.session_state:
+        title_sources = {
+            "Summarized titles": summary_df['Title'].tolist(),
+            "All titles, including those filtered out on the Home page": st.session_state.get("step4_all_titles", summary_df['Title'].tolist())
+        }
+        titles = title_sources[st.radio("📚 Titles to analyze", list(title_sources), key="step3_title_source")]
+
+        # Objects confirmed in an earlier session are kept; only titles GPT has not seen yet need analysing
+        store = get_label_store()
+        saved = store.load_profile(profession, OBJECTS)
+        saved_objects = saved[0] if saved else []
+        if saved_objects:
+            new_titles = store.unseen(profession, STEP3_SCOPE, titles)
+            if st.checkbox(
+                f"♻️ Keep my {len(saved_objects)} saved objects and only analyze the {len(new_titles)} titles not seen in earlier sessions",
+                value=True
+            ):
+                titles = new_titles
+        col1, col2 = st.columns(2)
+        with col1:
+            titles_per_chunk = st.number_input("Titles per GPT request", min_value=10, max_value=1000, value=DEFAULT_TITLES_PER_CHUNK, step=10)
+        with col2:
+            max_concurrency = st.number_input("⚡ Parallel GPT requests", min_value=1, max_value=16, value=DEFAULT_MAX_CONCURRENCY)
+        find_locally = st.checkbox(
+            "🧩 Find regularly formed objects locally first (names like \"Lastname, X. (First)\", course codes, conferences, file names)",
+            value=True,
+            help="Titles these objects fully cover are not sent to GPT. Other titles still are, with the objects listed in the prompt so GPT does not repeat them."
+        )
+
+        if st.button("🧠 Generate Objects with GPT"):
+            st.session_state['step3_analyzed_titles'] = titles
+            local_objects, gpt_titles = [], titles
+            if find_locally:
+                local_objects, explained = extract_local_objects(titles, object_types)
+                gpt_titles = [t for t in titles if t not in explained]
+                st.info(f"🧩 Found {len(local_objects)} objects locally, fully covering {len(explained)} titles; {len(gpt_titles)} titles are left for GPT.")
+            known_index = CandidateIndex(local_objects)
+            chunks = make_batches(gpt_titles, titles_per_chunk)
+            results = [None] * len(chunks)
+            progress = st.progress(0.0, text=f"Extracting objects from {len(chunks)} chunks of titles...")
+            if not chunks:
+                st.info("ℹ️ No titles left for GPT to analyze; the objects found so far are listed below.")
+            done = 0
+            metrics = get_llm_metrics()
+
+            # Objects stream in from the worker threads and are shown while the chunks are still running
+            streamed = queue.SimpleQueue()
+            found = [saved_objects, local_objects]
+            live = st.empty()
+
+            def show_streamed():
+                new_objects = []
+                while not streamed.empty():
+                    new_objects.append(streamed.get())
+                if new_objects:
+                    found.append(new_objects)
+                    live.dataframe(pd.DataFrame(merge_object_lists(found), columns=["object", "object_type"]), use_container_width=True)
+
+            partial = []
+            for i, objects, error in run_batches_concurrently(
+                list(enumerate(chunks)),
+                lambda item: extract_objects_chunk(
+                    profession, object_types, activities, item[1], api_key,
+                    metrics=metrics, batch=f"chunk {item[0]+1}", on_item=streamed.put,
+                    known_objects=known_index.candidates(item[1])[:MAX_KNOWN_OBJECTS]
+                ),
+                max_concurrency,
+                on_wait=show_streamed
+            ):
+                done += 1
+                if error is not None:
+                    st.error(f"❌ GPT call failed for chunk {i+1}: {error}")
+                    if isinstance(error, PartialJSONArray):
+                        partial.append(error.items)
+                else:
+                    results[i] = objects
+                progress.progress(done / len(chunks), text=f"Finished chunk {i+1} ({done} of {len(chunks)})")
+            progress.empty()
+            live.empty()
+
+            # Reduce stage: merge and deduplicate the per-chunk object lists
+            if any(objects is None for objects in results):
+                st.session_state['step3_partial_objects'] = merge_object_lists(
+                    [saved_objects, local_objects] + [objects for objects in results if objects] + partial
+                )
+                st.warning("⚠️ Some chunks failed. Click the button again to retry; finished chunks are served from the cache.")
+            else:
+                st.session_state.pop('step3_partial_objects', None)
+                object_data = merge_object_lists([saved_objects, local_objects] + results)
                 st.session_state['step3_gpt_objects'] = object_data
-                st.session_state['step3_edited_objects'] = pd.DataFrame(object_data)
+                st.session_state['step3_edited_objects'] = objects_frame(object_data)
 
-            except Exception as e:
-                st.error(f"❌ GPT call failed: {e}")
+        # Objects received before a failure or dropped connection are kept and can be used as they are
+        if 'step3_partial_objects' in st.session_state and 'step3_gpt_objects' not in st.session_state:
+            partial_objects = st.session_state['step3_partial_objects']
+            if st.button(f"➡️ Continue with the {len(partial_objects)} objects found so far"):
+                st.session_state['step3_gpt_objects'] = partial_objects
+                st.session_state['step3_edited_objects'] = objects_frame(partial_objects)
+                st.rerun()
 
     if 'step3_edited_objects' in st.session_state:
         df_objects = st.session_state['step3_edited_objects'].copy()
 
         if 'Confirm' not in df_objects.columns:
             df_objects['Confirm'] = True
+        if 'aliases' not in df_objects.columns:
+            df_objects['aliases'] = ""
 
         df_objects['object_type'] = pd.Categorical(df_objects['object_type'], categories=object_types)
 
@@ -114,11 +241,29 @@ Window Titles: {json.dumps(titles)}
             num_rows="dynamic",
             column_config={
                 "Confirm": st.column_config.CheckboxColumn("Confirm", help="Check to keep this object"),
-                "object_type": st.column_config.SelectboxColumn("Object Type", options=object_types)
+                "object_type": st.column_config.SelectboxColumn("Object Type", options=object_types),
+                "aliases": st.column_config.TextColumn("Aliases", help="Other spellings of this object, separated by |")
             },
-            key="object_editor"
+            key=f"object_editor_{st.session_state.get('step3_merge_count', 0)}"
         )
 
+        # --- Duplicate objects: the same person, course or event spelled differently ---
+        kept_df = edited_df[edited_df['Confirm'].fillna(False).astype(bool)]
+        resolved, clusters = resolve_objects(kept_df.to_dict(orient="records"))
+        if clusters:
+            with st.expander(f"🔗 Possible duplicates ({len(clusters)})"):
+                st.caption("These objects look like other spellings of the same object. Merging keeps one name per object and "
+                           "lists the others as its aliases, which Step 4 and the OCEL export recognise as that object.")
+                st.dataframe(objects_frame(clusters), use_container_width=True, hide_index=True)
+                if st.button("🔗 Merge Duplicates"):
+                    merged_df = objects_frame(resolved)
+                    merged_df['Confirm'] = True
+                    dropped_df = edited_df[~edited_df.index.isin(kept_df.index)]
+                    st.session_state['step3_edited_objects'] = pd.concat([merged_df, dropped_df], ignore_index=True)
+                    # A new editor key, so the table shows the merged objects instead of the previous edits
+                    st.session_state['step3_merge_count'] = st.session_state.get('step3_merge_count', 0) + 1
+                    st.rerun()
+
         # Only update session state after explicit confirmation
         if st.button("✅ Confirm Objects"):
             st.session_state['step3_edited_objects'] = edited_df  # Safe to store final state now
@@ -128,10 +273,17 @@ Window Titles: {json.dumps(titles)}
             st.session_state['step3_data'] = {
                 "total_rows": total_rows,
                 "gpt_suggestions": st.session_state['step3_gpt_objects'],
-                "confirmed_objects": confirmed_df.to_dict(orient="records")
+                "confirmed_objects": object_records(confirmed_df)
             }
+            mark_changed(st.session_state, "step3_data")
+            store = get_label_store()
+            store.save_profile(profession, OBJECTS, st.session_state['step3_data']["confirmed_objects"])
+            store.mark_seen(profession, STEP3_SCOPE, st.session_state.get('step3_analyzed_titles', []))
+            snapshot_session("Step 3")
             st.success("🎯 Object suggestions processed and saved!")
 
+show_llm_metrics("step3")
+
 cols = st.columns([1, 6, 1])
 
 with cols[0]:
@@ -1,14 +1,37 @@
 import streamlit as st
-import openai
 import pandas as pd
 import json
-import random
 import math
-import collections
+import queue
+import random
+from utils.llm import stream_json_array
+from utils.scheduler import BULK
+from utils.json_stream import PartialJSONArray
+from utils.responses import enrichment_format, valid_labels, missing_titles
+from utils.utils import get_llm_metrics, show_llm_metrics, snapshot_session, restore_saved
+from utils.titles import expand_to_members
+from utils.classifier import TitleLabeller
+from utils.candidates import CandidateIndex
+from utils.objects import object_records
+from utils.label_store import candidate_fingerprint, get_label_store
+from utils.export import mark_changed
+from utils.enrichment import (
+    plan_batches, estimate_tokens, run_batches_concurrently, sample_titles,
+    checkpoint_path, load_checkpoint, append_checkpoint,
+    DEFAULT_MAX_CONCURRENCY, DEFAULT_MAX_PROMPT_TOKENS, DEFAULT_MAX_COMPLETION_TOKENS,
+    DEFAULT_MAX_TITLES_PER_BATCH, SAMPLE_SIZE
+)
 
 # --- Page Setup ---
 st.set_page_config(page_title="Step 4: Enrich Events", layout="centered", initial_sidebar_state="collapsed")
 
+# --- Saved session: keys this page uses, read on first use after resuming ---
+restore_saved(
+    "source", "confirmed_activities", "step3_summary_df", "step4_all_titles", "title_groups", "step3_objects_df",
+    "step4_enrichment_mode", "step4_enriched_titles", "step4_sampled_titles", "step4_gpt_enrichment",
+    "step4_training_examples", "step4_local_enrichment", "step4_local_titles", "step4_data"
+)
+
 # --- Custom CSS ---
 st.markdown("""
     <style>
@@ -37,25 +60,50 @@ if not all(k in st.session_state for k in required_keys):
     st.warning("⚠️ Please ensure all previous steps are completed and inputs provided.")
     st.stop()
 
+# --- Memoized derived data ---
+def memoized(name, sources, compute):
+    # Recomputed only when one of the session objects it derives from has been replaced, not on every rerun
+    memo = st.session_state.setdefault("step4_memo", {})
+    entry = memo.get(name)
+    if entry is None or len(entry[0]) != len(sources) or any(a is not b for a, b in zip(entry[0], sources)):
+        entry = (sources, compute())
+        memo[name] = entry
+    return entry[1]
+
 # --- Extract Data ---
 summary_df = st.session_state["step3_summary_df"]
-titles = summary_df["Title"].tolist()
-if len(titles) > 100:
-    titles = random.sample(titles, 100)
+summary_titles = memoized("summary_titles", (summary_df,), lambda: summary_df["Title"].tolist())
 profession = st.session_state["profession"]
 api_key = st.session_state["api_key"]
 objects_df = st.session_state["step3_objects_df"]
 confirmed_activities = st.session_state["confirmed_activities"]
-object_mappings = objects_df.to_dict(orient="records")
+object_mappings = memoized("object_mappings", (objects_df,), lambda: object_records(objects_df))
+candidate_index = memoized("candidate_index", (objects_df,), lambda: CandidateIndex(object_mappings))
+object_names = memoized("object_names", (objects_df,), lambda: [o["object"] for o in object_mappings])
+candidate_fingerprints = memoized("candidate_fingerprints", (objects_df,), dict)
 
-# --- GPT Call ---
-@st.cache_data(show_spinner="🔄 Enriching a batch of titles with GPT-4.1")
-def enrich_titles_batch(profession, objects, activities, batch_titles, api_key):
-    client = openai.OpenAI(api_key=api_key)
+def title_candidates(titles):
+    # Stored labels are keyed by profession and title; this fingerprint tells which ones predate a change in their candidate objects
+    for title in titles:
+        if title not in candidate_fingerprints:
+            candidate_fingerprints[title] = candidate_fingerprint(candidate_index.candidates([title]))
+    return {title: candidate_fingerprints[title] for title in titles}
+
+def save_labels(items, source):
+    titles = [item["title"] for item in items if item.get("title")]
+    get_label_store().save_labels(profession, items, source, title_candidates(titles))
+
+# --- GPT Prompt ---
+def build_enrichment_messages(profession, objects, activities, batch_titles):
     system_prompt = """
 You are an assistant specialized in associating textual titles with objects and activities relevant to professional workflows.
 Your task is to infer meaningful semantic associations between window titles and known entities.
 """
+    # Only mentioned when merged duplicates are listed, so prompts (and their cache entries) are otherwise unchanged
+    alias_guideline = (
+        "\n- An object's aliases are other spellings of it; always answer with its \"object\" name."
+        if any(o.get("aliases") for o in objects) else ""
+    )
     user_prompt = f"""
 ### Task
 For each of the following window titles, determine whether it clearly relates to one or more of the given activities and one or more of the given objects. 
@@ -64,7 +112,7 @@ If so, return the title and its associated activities and objects. Otherwise, re
 ### Guidelines
 - Use your understanding of the user's profession to ground your associations.
 - Include objects and activities only if they are directly and unambiguously implied.
-- Avoid guessing or over-interpreting vague titles.
+- Avoid guessing or over-interpreting vague titles.{alias_guideline}
 
 ### Output Format
 Return a JSON array of dictionaries with the following structure:
@@ -76,67 +124,289 @@ Objects and Types: {json.dumps(objects)}
 Activities: {json.dumps(activities)}
 Titles: {json.dumps(batch_titles)}
 """
-    try:
-        response = client.chat.completions.create(
-            model="gpt-4.1",
-            messages=[
-                {"role": "system", "content": system_prompt},
-                {"role": "user", "content": user_prompt}
-            ],
-            temperature=0.7
-        )
-        output = response.choices[0].message.content.strip()
-        if "```json" in output:
-            output = output.split("```json")[1].split("```", 1)[0].strip()
-        elif "```" in output:
-            output = output.split("```", 1)[1].split("```", 1)[0].strip()
-        return json.loads(output)
-    except Exception as e:
-        st.error(f"❌ GPT call failed: {e}")
-        return []
+    return [
+        {"role": "system", "content": system_prompt},
+        {"role": "user", "content": user_prompt}
+    ]
+
+# --- GPT Call ---
+# Runs on worker threads, so errors are raised and reported by the caller instead of via st.error.
+# Enrichments are passed to on_item as soon as GPT has streamed them. Titles missing from the answer (skipped, malformed
+# or cut off) are re-requested on their own; a batch still interrupted after that raises PartialJSONArray.
+MAX_FOLLOW_UPS = 2
+
+def enrich_titles_batch(profession, objects, activities, batch_titles, api_key, metrics=None, batch=None, on_item=None):
+    object_names = [o["object"] for o in objects]
+    response_format = enrichment_format(activities, object_names)
+    labels = []
+    pending = list(batch_titles)
+    for attempt in range(MAX_FOLLOW_UPS + 1):
+        messages = build_enrichment_messages(profession, objects, activities, pending)
+        try:
+            received = stream_json_array(
+                api_key, messages, on_item=on_item, metrics=metrics, step="step4",
+                batch=batch if attempt == 0 or batch is None else f"{batch} follow-up {attempt}",
+                priority=BULK, response_format=response_format
+            )
+            interrupted = None
+        except PartialJSONArray as e:
+            received, interrupted = e.items, e
+        new_labels = valid_labels(received, pending, object_names)
+        labels += new_labels
+        pending = missing_titles(pending, new_labels)
+        if not pending or (interrupted is not None and not new_labels):
+            break
+    if pending and interrupted is not None:
+        raise PartialJSONArray(labels, interrupted.reason)
+    # Titles GPT keeps skipping are left out and labelled with the remaining titles later on
+    return labels
+
+# --- Batch planning and execution ---
+LIVE_ROWS = 100  # latest streamed enrichments shown while batches run
+DEFAULT_REVIEW_SIZE = 10
+REVIEW_PAGE_SIZE = 10
+
+def batch_objects(batch_titles):
+    # The objects listed in a batch's prompt: only those its titles plausibly mention, or the whole catalogue
+    return candidate_index.candidates(batch_titles) if prefilter_objects else object_mappings
+
+def plan_enrichment(titles, max_prompt_tokens, max_completion_tokens, max_titles):
+    listed = [] if prefilter_objects else object_mappings
+    base_prompt_tokens = sum(
+        estimate_tokens(m["content"]) for m in build_enrichment_messages(profession, listed, confirmed_activities, [])
+    )
+    # With prefiltering, each title adds its own candidate objects (an upper bound: shared candidates are listed once)
+    title_prompt_tokens = (
+        (lambda title: estimate_tokens(json.dumps(candidate_index.candidates([title])))) if prefilter_objects else None
+    )
+    batches, estimate = plan_batches(
+        titles, base_prompt_tokens, max_prompt_tokens, max_completion_tokens, max_titles, title_prompt_tokens
+    )
+    return batches, estimate, checkpoint_path(profession, object_mappings, confirmed_activities, batches)
+
+def run_enrichment(batches, checkpoint, max_concurrency, phase="enrich"):
+    # Returns the GPT output per batch, or None when some batches failed. Finished batches stay checkpointed and,
+    # like the titles an interrupted batch did return, are saved to the label store so a retry skips them.
+    num_batches = len(batches)
+    completed = load_checkpoint(checkpoint)
+    results = [completed.get(i, []) for i in range(num_batches)]
+    pending = [i for i in range(num_batches) if i not in completed]
+    failed = 0
+    done = len(completed)
+    progress = st.progress(done / max(num_batches, 1), text=f"Processing {len(pending)} of {num_batches} batches...")
+    metrics = get_llm_metrics()
+
+    # Enrichments stream in from the worker threads; the latest labelled titles are shown while batches run
+    streamed = queue.SimpleQueue()
+    labelled = []
+    live = st.empty()
+
+    def show_streamed():
+        received = 0
+        while not streamed.empty():
+            item = streamed.get()
+            received += 1
+            if isinstance(item, dict) and has_labels(item):
+                labelled.append(item)
+        if received and labelled:
+            live.dataframe(pd.DataFrame(labelled[-LIVE_ROWS:][::-1]), use_container_width=True)
+
+    for j, enriched, error in run_batches_concurrently(
+        [(i, batches[i]) for i in pending],
+        lambda item: enrich_titles_batch(
+            profession, batch_objects(item[1]), confirmed_activities, item[1], api_key,
+            metrics=metrics, batch=f"{phase} {item[0]+1}", on_item=streamed.put
+        ),
+        max_concurrency,
+        on_wait=show_streamed
+    ):
+        i = pending[j]
+        done += 1
+        if error is not None:
+            failed += 1
+            st.error(f"❌ GPT call failed for batch {i+1}: {error}")
+            if isinstance(error, PartialJSONArray):
+                save_labels(error.items, "gpt")
+        else:
+            results[i] = enriched
+            append_checkpoint(checkpoint, i, batches[i], enriched)
+            save_labels(enriched, "gpt")
+        progress.progress(done / num_batches, text=f"Finished batch {i+1} ({done} of {num_batches})")
+    progress.empty()
+    live.empty()
+    if failed:
+        st.warning(f"⚠️ {failed} batches failed. Click the button again to retry only those batches.")
+        return None
+    return results
+
+def has_labels(item):
+    return bool(item.get("activities") and item.get("objects"))
+
+def stored_labels(titles):
+    # Labels saved in earlier sessions for this profession, without their source and limited to the confirmed
+    # activities and objects; titles whose candidate objects changed since are labelled again
+    stored = get_label_store().load_labels(
+        profession, titles, confirmed_activities, object_names, title_candidates(titles)
+    )
+    return {title: {k: v for k, v in item.items() if k != "source"} for title, item in stored.items()}, stored
+
+def get_labeller():
+    # Trained once per session on every GPT output (including titles without labels) and the reviewed sample
+    if "step4_labeller" not in st.session_state:
+        labeller = TitleLabeller()
+        labeller.partial_fit(st.session_state.get("step4_training_examples", []))
+        labeller.partial_fit(st.session_state.get("step4_data", {}).get("reviewed_sample", []))
+        st.session_state["step4_labeller"] = labeller
+    return st.session_state["step4_labeller"]
+
+# --- Request settings ---
+with st.expander("🧮 Request budget", expanded=False):
+    max_prompt_tokens = st.number_input("Max prompt tokens per request", min_value=1000, max_value=100000, value=DEFAULT_MAX_PROMPT_TOKENS, step=1000)
+    max_completion_tokens = st.number_input("Max completion tokens per request", min_value=500, max_value=32000, value=DEFAULT_MAX_COMPLETION_TOKENS, step=500)
+    max_titles = st.number_input("Max titles per request", min_value=1, max_value=500, value=DEFAULT_MAX_TITLES_PER_BATCH)
+    max_concurrency = st.number_input(
+        "⚡ Parallel GPT requests",
+        min_value=1,
+        max_value=16,
+        value=DEFAULT_MAX_CONCURRENCY,
+        help="Number of title batches sent to GPT-4.1 at the same time."
+    )
+    prefilter_objects = st.checkbox(
+        "🎯 Only list the objects each batch's titles mention",
+        value=True,
+        help="Objects are picked by their words, abbreviations and codes (e.g. INFOBPM), so prompts stay small with a large object list."
+    )
 
 # --- Trigger GPT only on button click ---
 if "step4_gpt_enrichment" not in st.session_state:
+    enrichment_modes = {
+        f"Random sample ({SAMPLE_SIZE} titles)": "sample",
+        "All summarized titles": "summary",
+        "All titles, including those filtered out on the Home page": "all"
+    }
+    mode_label = st.radio("📚 Titles to enrich", list(enrichment_modes), key="step4_mode_label")
+    enrichment_mode = enrichment_modes[mode_label]
+    review_size = st.number_input(
+        "✍️ Titles to review",
+        min_value=1,
+        max_value=1000,
+        value=DEFAULT_REVIEW_SIZE,
+        help="Number of randomly chosen enrichments you will check and correct below."
+    )
+
+    if enrichment_mode == "sample":
+        titles = sample_titles(summary_titles)
+    elif enrichment_mode == "summary":
+        titles = summary_titles
+    else:
+        titles = st.session_state.get("step4_all_titles", summary_titles)
+
+    reused, _ = stored_labels(titles)
+    new_titles = [t for t in titles if t not in reused]
+    batches, estimate, checkpoint = plan_enrichment(new_titles, max_prompt_tokens, max_completion_tokens, max_titles)
+    completed = load_checkpoint(checkpoint)
+    if reused:
+        st.info(f"💾 {len(reused)} of these titles were labelled in an earlier session and will not be sent to GPT again.")
+    st.caption(
+        f"Planned: {len(new_titles)} titles in {estimate['requests']} requests, "
+        f"~{estimate['prompt_tokens']:,} prompt and ~{estimate['completion_tokens']:,} completion tokens (estimated)."
+    )
+    if completed:
+        st.info(f"♻️ Resuming: {len(completed)} of {len(batches)} batches were already enriched and will not be sent again.")
+
     if st.button("🔍 Generate Title Enrichments with GPT"):
-        all_valid = []
-        batch_size = 10
-        num_batches = math.ceil(len(titles) / batch_size)
-        for i in range(num_batches):
-            start = i * batch_size
-            end = start + batch_size
-            batch = titles[start:end]
-            with st.spinner(f"Processing batch {i+1} of {num_batches}..."):
-                enriched = enrich_titles_batch(profession, object_mappings, confirmed_activities, batch, api_key)
-                valid = [item for item in enriched if item.get("activities") and item.get("objects")]
-                all_valid.extend(valid)
+        results = run_enrichment(batches, checkpoint, max_concurrency)
+        if results is None:
+            st.stop()
+        gpt_items = [item for enriched in results for item in enriched]
+        all_items = list(reused.values()) + gpt_items
+        all_valid = [item for item in all_items if has_labels(item)]
         if not all_valid:
             st.warning("⚠️ GPT did not find any titles with both activities and objects. Please review your input.")
             st.stop()
-        st.session_state["step4_gpt_enrichment"] = all_valid
-        st.session_state["step4_sampled_titles"] = random.sample(all_valid, k=min(10, len(all_valid)))
+        # Labels of each group's representative title also apply to its near-identical variants
+        st.session_state["step4_gpt_enrichment"] = expand_to_members(all_valid, st.session_state.get("title_groups", {}))
+        st.session_state["step4_training_examples"] = all_items
+        st.session_state["step4_enrichment_mode"] = enrichment_mode
+        st.session_state["step4_enriched_titles"] = len(titles)
+        st.session_state["step4_sampled_titles"] = random.sample(all_valid, k=min(review_size, len(all_valid)))
+        st.session_state["step4_review_edits"] = {}
+        st.session_state["step4_review_page"] = 0
+        snapshot_session("Step 4")
         st.rerun()
 
-# --- Proceed only if GPT results exist ---
-if "step4_gpt_enrichment" in st.session_state:
-    st.subheader("✍️ Review and Edit Enrichments")
-    activity_options = confirmed_activities
-    object_options = list(objects_df["object"].unique())
-    edited_rows = []
-    for i, row in enumerate(st.session_state["step4_sampled_titles"]):
+# --- Review: one page of rows at a time, in a fragment so edits only rerun that page ---
+def reviewed_rows():
+    # Edits live outside widget state, which Streamlit drops for rows on pages that are not shown
+    edits = st.session_state.get("step4_review_edits", {})
+    return [
+        {
+            "title": row["title"],
+            "activities": edits.get(i, {}).get("activities", row["activities"]),
+            "objects": edits.get(i, {}).get("objects", row["objects"])
+        }
+        for i, row in enumerate(st.session_state["step4_sampled_titles"])
+    ]
+
+def save_review_edit(i, field):
+    st.session_state.setdefault("step4_review_edits", {}).setdefault(i, {})[field] = st.session_state[f"{field}_{i}"]
+
+def set_review_page(page):
+    # Button callbacks run before the fragment reruns, so the new page is drawn straight away
+    st.session_state["step4_review_page"] = page
+
+@st.fragment
+def review_page(activity_options, object_options):
+    rows = st.session_state["step4_sampled_titles"]
+    edits = st.session_state.get("step4_review_edits", {})
+    num_pages = max(1, math.ceil(len(rows) / REVIEW_PAGE_SIZE))
+    page = min(st.session_state.get("step4_review_page", 0), num_pages - 1)
+
+    for i in range(page * REVIEW_PAGE_SIZE, min((page + 1) * REVIEW_PAGE_SIZE, len(rows))):
+        row = rows[i]
         st.markdown(f"**{i+1}. {row['title']}")
         col1, col2 = st.columns(2)
         with col1:
-            activities = st.multiselect("Activities", options=activity_options, default=row["activities"], key=f"activities_{i}")
+            st.multiselect(
+                "Activities", options=activity_options, default=edits.get(i, {}).get("activities", row["activities"]),
+                key=f"activities_{i}", on_change=save_review_edit, args=(i, "activities")
+            )
         with col2:
-            objects = st.multiselect("Objects", options=object_options, default=row["objects"], key=f"objects_{i}")
-        edited_rows.append({"title": row["title"], "activities": activities, "objects": objects})
+            st.multiselect(
+                "Objects", options=object_options, default=edits.get(i, {}).get("objects", row["objects"]),
+                key=f"objects_{i}", on_change=save_review_edit, args=(i, "objects")
+            )
+
+    if num_pages > 1:
+        cols = st.columns([1, 4, 1])
+        with cols[0]:
+            st.button("◀️", key="review_previous", disabled=page == 0, on_click=set_review_page, args=(page - 1,))
+        with cols[1]:
+            st.caption(f"Page {page+1} of {num_pages} ({len(rows)} titles to review, {len(edits)} edited)")
+        with cols[2]:
+            st.button("▶️", key="review_next", disabled=page == num_pages - 1, on_click=set_review_page, args=(page + 1,))
+
+# --- Proceed only if GPT results exist ---
+if "step4_gpt_enrichment" in st.session_state:
+    st.subheader("✍️ Review and Edit Enrichments")
+    object_options = memoized("object_options", (objects_df,), lambda: list(objects_df["object"].unique()))
+    review_page(confirmed_activities, object_options)
 
     if "step4_data" not in st.session_state:
         st.session_state["step4_data"] = {}
 
     if st.button("✅ Confirm Event Enrichment"):
+        edited_rows = reviewed_rows()
+        if "step4_labeller" in st.session_state:
+            st.session_state["step4_labeller"].partial_fit(edited_rows)
+        save_labels(edited_rows, "reviewed")
         st.session_state["step4_data"]["gpt_suggestions"] = st.session_state["step4_gpt_enrichment"]
+        st.session_state["step4_data"]["local_suggestions"] = st.session_state.get("step4_local_enrichment", [])
+        st.session_state["step4_data"]["enrichment_mode"] = st.session_state.get("step4_enrichment_mode", "sample")
+        st.session_state["step4_data"]["enriched_titles"] = st.session_state.get("step4_enriched_titles", 0)
         st.session_state["step4_data"]["reviewed_sample"] = edited_rows
+        mark_changed(st.session_state, "step4_data")
+        snapshot_session("Step 4")
         st.success("🎯 Annotations saved!")
         st.balloons()
 
@@ -145,10 +415,81 @@ if "step4_gpt_enrichment" in st.session_state:
         rating_options = ["very poor", "poor", "fair", "good", "very good"]
         activity_rating = st.selectbox("How would you rate the quality of the activity labels?", rating_options, key="activity_rating")
         object_rating = st.selectbox("How would you rate the quality of the object labels?", rating_options, key="object_rating")
-        st.session_state["step4_data"]["activity_rating"] = activity_rating
-        st.session_state["step4_data"]["object_rating"] = object_rating
+        ratings = {"activity_rating": activity_rating, "object_rating": object_rating}
+        if any(st.session_state["step4_data"].get(k) != v for k, v in ratings.items()):
+            st.session_state["step4_data"].update(ratings)
+            mark_changed(st.session_state, "step4_data")
         st.success("✅ Thank you for your feedback!")
 
+# --- Local labelling of the remaining titles ---
+if "step4_gpt_enrichment" in st.session_state:
+    st.subheader("🤖 Label the Remaining Titles")
+    st.markdown(
+        "A local model trained on the enrichments above (and your review) labels the rest of your titles on this machine. "
+        "Only titles it is not confident about are sent to GPT-4.1."
+    )
+    training_examples = st.session_state.get("step4_training_examples", [])
+    local_titles = st.session_state.get("step4_local_titles", [])
+    # Falls back to the memoized list so remaining_titles is not recomputed on every rerun
+    all_titles = st.session_state.get("step4_all_titles", summary_titles)
+
+    def remaining_titles():
+        labelled_titles = {item["title"] for item in training_examples}
+        labelled_titles.update(local_titles)
+        return [t for t in all_titles if t not in labelled_titles]
+
+    remaining = memoized("remaining_titles", (training_examples, local_titles, all_titles), remaining_titles)
+
+    if not remaining:
+        st.info("✅ All titles have been labelled.")
+    elif st.button(f"🤖 Label {len(remaining)} remaining titles"):
+        # Titles labelled in an earlier session keep their stored labels
+        reused, stored = stored_labels(remaining)
+        reused_gpt = [item for title, item in reused.items() if stored[title]["source"] != "local"]
+        reused_local = [item for title, item in reused.items() if stored[title]["source"] == "local"]
+
+        labeller = get_labeller()
+        labeller.partial_fit(reused_gpt)
+        threshold = labeller.calibrate()
+        with st.spinner("Labelling titles locally..."):
+            predictions = [labeller.predict(title) for title in remaining if title not in reused]
+        confident = [p for p in predictions if p["confidence"] >= threshold]
+        uncertain = [p["title"] for p in predictions if p["confidence"] < threshold]
+
+        batches, estimate, checkpoint = plan_enrichment(uncertain, max_prompt_tokens, max_completion_tokens, max_titles)
+        results = run_enrichment(batches, checkpoint, max_concurrency, phase="remaining")
+        if results is None:
+            st.stop()
+        gpt_items = [item for enriched in results for item in enriched]
+        labeller.partial_fit(gpt_items)
+
+        title_groups = st.session_state.get("title_groups", {})
+        local_items = [{"title": p["title"], "activities": p["activities"], "objects": p["objects"]} for p in confident]
+        save_labels(local_items, "local")
+        gpt_items = reused_gpt + gpt_items
+        local_items = reused_local + local_items
+        local_valid = [item for item in local_items if has_labels(item)]
+        st.session_state["step4_training_examples"] = st.session_state["step4_training_examples"] + gpt_items
+        st.session_state["step4_local_titles"] = st.session_state.get("step4_local_titles", []) + [i["title"] for i in local_items]
+        st.session_state["step4_local_enrichment"] = (
+            st.session_state.get("step4_local_enrichment", []) + expand_to_members(local_valid, title_groups)
+        )
+        st.session_state["step4_gpt_enrichment"] = (
+            st.session_state["step4_gpt_enrichment"] + expand_to_members([i for i in gpt_items if has_labels(i)], title_groups)
+        )
+        if "gpt_suggestions" in st.session_state["step4_data"]:
+            st.session_state["step4_data"]["gpt_suggestions"] = st.session_state["step4_gpt_enrichment"]
+            st.session_state["step4_data"]["local_suggestions"] = st.session_state["step4_local_enrichment"]
+            mark_changed(st.session_state, "step4_data")
+        snapshot_session("Step 4")
+        st.success(
+            f"✅ {len(reused)} titles reused from earlier sessions; "
+            f"{len(confident)} labelled locally (confidence ≥ {threshold:.2f}); "
+            f"{len(uncertain)} sent to GPT-4.1 in {len(batches)} requests."
+        )
+
+show_llm_metrics("step4")
+
 cols = st.columns([1, 6, 1])
 with cols[0]:
     st.page_link("pages/Step 3 - Identify objects.py", label="⬅️ Previous")
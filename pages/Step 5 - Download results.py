@@ -1,11 +1,19 @@
 import streamlit as st
-import json
 from datetime import datetime
 import re
+import pandas as pd
+from utils.utils import get_llm_metrics, restore_saved
+from utils.export import EXPORT_FORMATS, cached_export, export_summary, truncated
 
 # --- Page Setup ---
 st.set_page_config(page_title="Step 5: Download Results", layout="centered", initial_sidebar_state="collapsed")
 
+# --- Saved session: keys this page uses, read on first use after resuming ---
+restore_saved(
+    "source", "original_object_types", "confirmed_object_types", "added_object_types", "removed_object_types",
+    "step2_data", "step3_data", "step4_data"
+)
+
 # --- Build structured export data ---
 export_data = {
     "step1": {
@@ -18,33 +26,58 @@ export_data = {
     },
     "step2": st.session_state.get("step2_data", {}),
     "step3": st.session_state.get("step3_data", {}),
-    "step4": st.session_state.get("step4_data", {})
+    "step4": st.session_state.get("step4_data", {}),
+    "metrics": get_llm_metrics().summary()
 }
 
-# --- Convert to formatted JSON string ---
-export_json = json.dumps(export_data, indent=4)
-
-# --- Generate dynamic filename ---
-profession = st.session_state.get("profession", "unknown").lower()
-profession_clean = re.sub(r'\W+', '_', profession)
-timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-filename = f"{profession_clean}_results_{timestamp}.json"
-
 # --- UI ---
 st.title("Step 5: Export Your Data")
 
 st.markdown("You can now download the full record of your results from steps 1 through 4.")
 
+st.subheader("📊 GPT Usage per Step")
+step_totals = export_data["metrics"]["steps"]
+if step_totals:
+    st.dataframe(pd.DataFrame.from_dict(step_totals, orient="index"), use_container_width=True)
+    totals = export_data["metrics"]["totals"]
+    st.caption(
+        f"{totals['calls']} calls ({totals['cache_hits']} from the local cache), "
+        f"{totals['prompt_tokens'] + totals['completion_tokens']:,} tokens, ~${totals['cost_usd']:.4f} at list prices."
+    )
+else:
+    st.caption("No GPT calls were made in this session.")
+
 st.subheader("📄 Preview of Your Data")
-with st.expander("Click to expand and preview the full data", expanded=False):
-    st.json(export_data)
+st.dataframe(pd.DataFrame(export_summary(export_data)), use_container_width=True, hide_index=True)
+with st.expander("Click to expand and preview the data (first items of each list)", expanded=False):
+    st.json(truncated(export_data))
+
+# --- Download: serialized only when the results or the format changed ---
+export_format = st.radio(
+    "Download format",
+    list(EXPORT_FORMATS),
+    format_func=lambda fmt: EXPORT_FORMATS[fmt][0],
+    horizontal=True,
+    help="All formats hold the same data. The OCEL converter reads each of them."
+)
+label, extension, mime = EXPORT_FORMATS[export_format]
+export_file, built_at = cached_export(st.session_state, export_data, export_format)
+
+# --- Generate dynamic filename ---
+profession = st.session_state.get("profession", "unknown").lower()
+profession_clean = re.sub(r'\W+', '_', profession)
+timestamp = datetime.fromtimestamp(built_at).strftime("%Y%m%d_%H%M%S")
+filename = f"{profession_clean}_results_{timestamp}{extension}"
 
 st.download_button(
-    label="📥 Download Your Data as JSON",
-    data=export_json,
+    label=f"📥 Download Your Data as {label} ({len(export_file) / 1024:,.0f} KB)",
+    data=export_file,
     file_name=filename,
-    mime="application/json"
+    mime=mime,
+    on_click="ignore"
 )
+if st.session_state.get("snapshot_id"):
+    st.caption(f"💾 This session is saved under the resume code **{st.session_state['snapshot_id']}**.")
 
 cols = st.columns([1, 6, 1])
 with cols[0]:
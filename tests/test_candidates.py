@@ -0,0 +1,42 @@
+from utils.candidates import CandidateIndex
+
+OBJECTS = [
+    {"object": "INFOBPM", "object_type": "courses"},
+    {"object": "Business Process Management", "object_type": "topics"},
+    {"object": "Iris Beerepoot", "object_type": "colleagues", "aliases": ["Beerepoot, I.M. (Iris)"]},
+    {"object": "Data Science 2025", "object_type": "courses"},
+    {"object": "Brightspace", "object_type": "systems"},
+]
+
+
+def _found(titles, objects=OBJECTS):
+    return [o["object"] for o in CandidateIndex(objects).candidates(titles)]
+
+
+def test_code_suffix_finds_the_course_code():
+    assert _found(["BPM lecture slides"]) == ["INFOBPM", "Business Process Management"]
+    assert _found(["Grading infobpm week 3"]) == ["INFOBPM"]
+
+
+def test_acronym_of_title_words_finds_the_abbreviated_object():
+    assert _found(["Intro to business process management"], [{"object": "BPM", "object_type": "topics"}]) == ["BPM"]
+    # The title's acronym "bpm" is also the suffix of the course code
+    assert _found(["Intro to business process management"]) == ["INFOBPM", "Business Process Management"]
+
+
+def test_aliases_select_their_object():
+    assert _found(["Mail from Beerepoot, I.M. (Iris)"]) == ["Iris Beerepoot"]
+
+
+def test_unrelated_titles_and_stopwords_select_nothing():
+    assert _found(["Holiday photos - Chrome", "the and for with"]) == []
+
+
+def test_candidates_keep_catalogue_order_across_titles():
+    assert _found(["Brightspace upload", "Data Science 2025 exam"]) == ["Data Science 2025", "Brightspace"]
+
+
+def test_keys_shared_by_many_objects_do_not_select_on_their_own():
+    meetings = [{"object": f"Project meeting {name}", "object_type": "meetings"} for name in "ABCDEFGHIJKL"]
+    assert _found(["Team meeting notes"], meetings) == []
+    assert _found(["Project meeting C"], meetings) == ["Project meeting C"]
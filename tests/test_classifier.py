@@ -0,0 +1,44 @@
+from utils.classifier import MIN_EXAMPLES_TO_CALIBRATE, TitleLabeller
+
+TEMPLATES = [
+    ("Grading INFOBPM assignment {i} - Brightspace", ["grade"], ["INFOBPM"]),
+    ("Lecture slides INFOMPM week {i}.pptx - PowerPoint", ["teach"], ["INFOMPM"]),
+    ("Meeting with Jansen about thesis chapter {i}", ["meet"], ["Jansen"]),
+]
+
+
+def _examples(count):
+    return [
+        {"title": template.format(i=i), "activities": activities, "objects": objects}
+        for i in range(count) for template, activities, objects in TEMPLATES
+    ]
+
+
+def test_predicts_labels_of_similar_titles():
+    labeller = TitleLabeller().partial_fit(_examples(10))
+    prediction = labeller.predict("Grading INFOBPM assignment 42 - Brightspace")
+    assert prediction["activities"] == ["grade"] and prediction["objects"] == ["INFOBPM"]
+    assert prediction["confidence"] > 0.5
+    assert labeller.predict("Holiday photos Mallorca")["confidence"] < prediction["confidence"]
+
+
+def test_calibrated_threshold_separates_confident_from_unknown_titles():
+    labeller = TitleLabeller().partial_fit(_examples(10))
+    threshold = labeller.calibrate()
+    assert 0 < threshold <= 1
+    assert labeller.predict("Meeting with Jansen about thesis chapter 77")["confidence"] >= threshold
+    assert labeller.predict("Holiday photos Mallorca")["confidence"] < threshold
+
+
+def test_too_few_examples_send_every_title_to_gpt():
+    labeller = TitleLabeller().partial_fit(_examples(1)[:MIN_EXAMPLES_TO_CALIBRATE - 1])
+    assert labeller.calibrate() > 1
+    assert labeller.predict("Grading INFOBPM assignment 0 - Brightspace")["confidence"] <= 1 < labeller.threshold
+
+
+def test_a_later_example_replaces_the_earlier_label():
+    labeller = TitleLabeller().partial_fit(_examples(10))
+    title = "Grading INFOBPM assignment 3 - Brightspace"
+    labeller.partial_fit([{"title": title, "activities": ["review"], "objects": ["INFOBPM"]}])
+    assert len(labeller) == 30
+    assert labeller._docs[title][1] == frozenset({"review"})
@@ -0,0 +1,59 @@
+from utils.enrichment import COMPLETION_TOKENS_PER_TITLE, plan_batches
+
+# json.dumps("abcdef") is 8 characters: 2 tokens, plus 1 for the separator
+TITLE_TOKENS = 3
+TITLES = ["abcdef", "ghijkl", "mnopqr", "stuvwx"]
+
+
+def test_prompt_budget_is_inclusive():
+    batches, estimate = plan_batches(TITLES, 10, max_prompt_tokens=10 + 2 * TITLE_TOKENS, max_completion_tokens=10_000)
+
+    assert batches == [["abcdef", "ghijkl"], ["mnopqr", "stuvwx"]]
+    assert estimate == {
+        "requests": 2,
+        "prompt_tokens": 2 * 10 + 4 * TITLE_TOKENS,
+        "completion_tokens": 4 * (TITLE_TOKENS + COMPLETION_TOKENS_PER_TITLE),
+    }
+
+
+def test_one_token_over_the_prompt_budget_starts_a_new_batch():
+    batches, _ = plan_batches(TITLES, 10, max_prompt_tokens=10 + 2 * TITLE_TOKENS - 1, max_completion_tokens=10_000)
+
+    assert batches == [[title] for title in TITLES]
+
+
+def test_completion_budget():
+    per_title = TITLE_TOKENS + COMPLETION_TOKENS_PER_TITLE
+    batches, _ = plan_batches(TITLES, 10, max_completion_tokens=3 * per_title)
+
+    assert batches == [["abcdef", "ghijkl", "mnopqr"], ["stuvwx"]]
+
+
+def test_max_titles_cap():
+    batches, estimate = plan_batches(TITLES, 10, max_titles=3)
+
+    assert batches == [["abcdef", "ghijkl", "mnopqr"], ["stuvwx"]]
+    assert estimate["requests"] == 2
+
+
+def test_oversized_title_gets_its_own_batch():
+    long_title = "x" * 400
+    batches, estimate = plan_batches(["abcdef", long_title, "ghijkl"], 10, max_prompt_tokens=20)
+
+    assert batches == [["abcdef"], [long_title], ["ghijkl"]]
+    # The oversized batch is still counted in full so the estimate does not undershoot
+    assert estimate["prompt_tokens"] == 3 * 10 + 2 * TITLE_TOKENS + 101 + 1
+
+
+def test_title_prompt_tokens_count_against_the_budget():
+    batches, estimate = plan_batches(
+        TITLES, 10, max_prompt_tokens=10 + 2 * TITLE_TOKENS, max_completion_tokens=10_000,
+        title_prompt_tokens=lambda title: 1 if title == "ghijkl" else 0
+    )
+
+    assert batches == [["abcdef"], ["ghijkl"], ["mnopqr", "stuvwx"]]
+    assert estimate["prompt_tokens"] == 3 * 10 + 4 * TITLE_TOKENS + 1
+
+
+def test_no_titles():
+    assert plan_batches([], 10) == ([], {"requests": 0, "prompt_tokens": 0, "completion_tokens": 0})
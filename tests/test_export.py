@@ -0,0 +1,44 @@
+import json
+
+from utils.export import cached_export, mark_changed, read_export
+
+
+def test_cached_export_sees_sections_changed_in_place():
+    # Step 4 updates st.session_state["step4_data"] in place after Step 5 was visited, and marks it changed
+    state = {}
+    step4 = {"reviewed_sample": [{"title": "a", "activities": [], "objects": []}], "activity_rating": 3}
+    export_data = {"step4": step4}
+    first, _ = cached_export(state, export_data, "compact")
+
+    step4["activity_rating"] = 5
+    step4["reviewed_sample"].append({"title": "b", "activities": ["x"], "objects": []})
+    mark_changed(state, "step4_data")
+    second, _ = cached_export(state, export_data, "compact")
+
+    assert second != first
+    assert json.loads(second) == {"step4": step4}
+
+
+def test_versioned_sections_are_not_hashed_on_rerun():
+    # An unmarked section is taken as unchanged: only its version is compared, not its content
+    state = {}
+    step4 = {"gpt_suggestions": [{"title": "a"}]}
+    first, _ = cached_export(state, {"step4": step4}, "compact")
+    step4["gpt_suggestions"].append({"title": "b"})
+    assert cached_export(state, {"step4": step4}, "compact")[0] is first
+
+
+def test_cached_export_reuses_unchanged_bytes():
+    state = {}
+    export_data = {"step1": {"profession": "Academic staff"}}
+    first, built_at = cached_export(state, export_data, "json")
+    second, built_again = cached_export(state, {"step1": {"profession": "Academic staff"}}, "json")
+    assert second is first and built_again == built_at
+
+
+def test_every_format_reads_back(tmp_path):
+    export_data = {"step1": {"profession": "A", "added_object_types": []}, "step2": {}, "step4": {"gpt_suggestions": [{"title": "t"}] * 3}}
+    for fmt in ("json", "compact", "ndjson", "gzip"):
+        path = tmp_path / f"results.{fmt}"
+        path.write_bytes(cached_export({}, export_data, fmt)[0])
+        assert read_export(str(path)) == export_data
@@ -0,0 +1,27 @@
+import pandas as pd
+
+from benchmarks.synthetic import write_tockler_csv
+from utils.ingest import read_sources_title_days, read_title_days
+
+
+def _sorted(title_days):
+    return title_days.sort_values(["Title", "Date"], ignore_index=True)[["Title", "Date", "Duration", "Frequency"]]
+
+
+def test_single_export_matches_read_title_days(tmp_path):
+    path = str(tmp_path / "tockler.csv")
+    write_tockler_csv(path, 5000, 400, 20)
+    title_days, report = read_sources_title_days([path])
+    assert report["duplicates"] == report["overlaps"] == 0
+    pd.testing.assert_frame_equal(_sorted(title_days), _sorted(read_title_days(path)), check_dtype=False)
+
+
+def test_rows_repeated_in_several_exports_count_once(tmp_path):
+    path = str(tmp_path / "tockler.csv")
+    write_tockler_csv(path, 5000, 400, 20)
+    rows = pd.read_csv(path, sep=";")
+    rows.iloc[:3000].to_csv(tmp_path / "first.csv", sep=";", index=False)
+    rows.iloc[2000:].to_csv(tmp_path / "second.csv", sep=";", index=False)
+    title_days, report = read_sources_title_days([str(tmp_path / "first.csv"), str(tmp_path / "second.csv")])
+    assert report["rows"] == 6000 and report["duplicates"] == 1000 and report["overlaps"] == 0
+    pd.testing.assert_frame_equal(_sorted(title_days), _sorted(read_title_days(path)), check_dtype=False)
@@ -0,0 +1,54 @@
+import json
+
+from utils.json_stream import JsonArrayParser, PartialJSONArray, repair_json_value
+
+ITEMS = [
+    {"title": "Re: \"Exam\" [draft], v2", "objects": ["INFOBPM", "a\\b"]},
+    {"title": "Zoë's notes — {week 3}", "objects": []},
+    [1, [2, 3]],
+    "plain, string",
+]
+
+
+def _feed(parser, text, size):
+    received = []
+    for start in range(0, len(text), size):
+        received.extend(parser.feed(text[start:start + size]))
+    return received
+
+
+def test_any_chunk_boundary_gives_the_same_items():
+    # Boundaries fall inside strings, right after backslashes and between brackets
+    text = json.dumps(ITEMS, ensure_ascii=False)
+    for size in (1, 2, 3, 7, len(text)):
+        parser = JsonArrayParser()
+        assert _feed(parser, text, size) == ITEMS
+        assert parser.complete and parser.items == ITEMS and parser.errors == 0
+
+
+def test_text_around_the_array_is_ignored():
+    parser = JsonArrayParser()
+    items = _feed(parser, 'Sure, here you go:\n```json\n[{"a": 1}, {"b": 2}]\n```\n[{"c": 3}]', 4)
+    assert items == [{"a": 1}, {"b": 2}] and parser.complete
+
+
+def test_truncated_trailing_object_is_left_out():
+    parser = JsonArrayParser()
+    _feed(parser, '[{"title": "a"}, {"title": "b"}, {"title": "c", "obj', 5)
+    assert parser.items == [{"title": "a"}, {"title": "b"}]
+    assert not parser.complete
+    partial = PartialJSONArray(parser.items, "GPT stream interrupted")
+    assert partial.items == parser.items and "2 items received" in str(partial)
+
+
+def test_malformed_elements_are_repaired_or_counted():
+    parser = JsonArrayParser()
+    items = parser.feed("[{'title': 'a', 'ok': True}, {\"title\": \"b\",}, {title: c}]")
+    assert items == [{"title": "a", "ok": True}, {"title": "b"}]
+    assert parser.errors == 1 and parser.complete
+
+
+def test_repair_json_value():
+    assert repair_json_value('{"a": [1, 2,],}') == {"a": [1, 2]}
+    assert repair_json_value("['x', None]") == ["x", None]
+    assert repair_json_value("{not json") is None
@@ -0,0 +1,31 @@
+from utils.label_store import LabelStore, candidate_fingerprint
+
+
+def test_confirming_a_new_object_keeps_other_labels(tmp_path):
+    store = LabelStore(str(tmp_path / "labels.db"))
+    objects = [{"object": "INFOMPM"}, {"object": "Blackboard"}]
+    candidates = {
+        "INFOMPM lecture": candidate_fingerprint(objects[:1]),
+        "Blackboard - week 3": candidate_fingerprint(objects[1:]),
+    }
+    store.save_labels("Academic staff", [
+        {"title": "INFOMPM lecture", "activities": ["Teaching"], "objects": ["INFOMPM"]},
+        {"title": "Blackboard - week 3", "activities": ["Grading"], "objects": ["Blackboard"]},
+    ], "gpt", candidates)
+
+    # A newly confirmed object only changes the candidates of the title it matches
+    candidates["Blackboard - week 3"] = candidate_fingerprint(objects[1:] + [{"object": "Week 3"}])
+    stored = store.load_labels(
+        "Academic staff", list(candidates), ["Teaching", "Grading"], ["INFOMPM", "Blackboard", "Week 3"], candidates
+    )
+    assert list(stored) == ["INFOMPM lecture"]
+
+
+def test_load_drops_unconfirmed_activities_and_objects(tmp_path):
+    store = LabelStore(str(tmp_path / "labels.db"))
+    store.save_labels("Academic staff", [
+        {"title": "Meeting about INFOMPM", "activities": ["Meeting", "Teaching"], "objects": ["INFOMPM", "Zoom"]},
+    ], "gpt")
+    stored = store.load_labels("academic staff", ["meeting about infompm"], ["Meeting"], ["INFOMPM"])
+    assert stored["meeting about infompm"]["activities"] == ["Meeting"]
+    assert stored["meeting about infompm"]["objects"] == ["INFOMPM"]
@@ -0,0 +1,77 @@
+import pytest
+
+from utils import llm_cache
+from utils.llm_cache import LLMCache
+
+
+class FakeTime:
+    """Stands in for the time module: time() is set by the test."""
+
+    def __init__(self):
+        self.now = 1_000_000.0
+
+    def time(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    fake = FakeTime()
+    monkeypatch.setattr(llm_cache, "time", fake)
+    return fake
+
+
+def test_hits_and_misses_are_counted(tmp_path, clock):
+    cache = LLMCache(str(tmp_path / "cache.sqlite3"))
+
+    assert cache.get("a") is None
+    cache.put("a", "gpt-4.1", '{"x": 1}')
+    assert cache.get("a") == '{"x": 1}'
+    assert cache.get("a") == '{"x": 1}'
+    assert cache.get("b") is None
+
+    assert cache.stats() == {"hits": 2, "misses": 2, "entries": 1, "bytes": 8}
+
+
+def test_expired_entries_miss_and_are_evicted(tmp_path, clock):
+    cache = LLMCache(str(tmp_path / "cache.sqlite3"), max_age_seconds=100)
+    cache.put("old", "gpt-4.1", "old")
+    clock.now += 60
+    cache.put("new", "gpt-4.1", "new")
+
+    clock.now += 50
+    assert cache.get("old") is None
+    assert cache.get("new") == "new"
+
+    cache.evict()
+    assert cache.stats()["entries"] == 1
+
+    # The age limit counts from creation: reading an entry does not extend its lifetime
+    clock.now += 60
+    assert cache.get("new") is None
+
+
+def test_size_eviction_drops_least_recently_accessed_first(tmp_path, clock):
+    cache = LLMCache(str(tmp_path / "cache.sqlite3"), max_bytes=25)
+    for key in ("a", "b", "c"):
+        cache.put(key, "gpt-4.1", key * 10)
+        clock.now += 1
+    cache.get("a")
+
+    cache.evict()
+
+    assert cache.get("b") is None
+    assert cache.get("a") == "a" * 10
+    assert cache.get("c") == "c" * 10
+    assert cache.stats()["bytes"] == 20
+
+
+def test_size_eviction_stops_at_the_limit(tmp_path, clock):
+    cache = LLMCache(str(tmp_path / "cache.sqlite3"), max_bytes=30)
+    for key in ("a", "b", "c"):
+        cache.put(key, "gpt-4.1", key * 10)
+        clock.now += 1
+
+    cache.evict()
+
+    assert cache.stats()["entries"] == 3
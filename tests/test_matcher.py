@@ -0,0 +1,8 @@
+from utils.matcher import ObjectMatcher
+
+
+def test_offsets_stay_aligned_when_lowercasing_lengthens_text():
+    # "İ".lower() is two code points long
+    matcher = ObjectMatcher(["blackboard", "istanbul"], case_insensitive=True, word_boundary=True)
+    title = "İİ Blackboard - İstanbul trip"
+    assert [title[start:end] for start, end, _ in matcher.find_all(title)] == ["Blackboard", "İstanbul"]
@@ -0,0 +1,66 @@
+from utils.objects import extract_local_objects, merge_object_lists
+
+
+def test_merge_object_lists_accepts_numbers_and_skips_empty_names():
+    merged = merge_object_lists([
+        [{"object": 2024, "object_type": "Year"}, {"object": None}, {"object": "  "}, {"object": "INFOMPM ", "object_type": "Course"}],
+        [{"object": "2024", "object_type": "Year"}],
+    ])
+    assert merged == [{"object": "2024", "object_type": "Year"}, {"object": "INFOMPM", "object_type": "Course"}]
+
+
+def test_conference_needs_a_known_venue_or_venue_context():
+    titles = [
+        "COVID19 vaccination schedule", "Export PDF 2024 overview", "Watching GPT4 demo",
+        "ICPM 2025 - reviews", "RPA24 call for papers",
+    ]
+    objects, _ = extract_local_objects(titles, ["conferences"])
+    assert {o["object"] for o in objects} == {"ICPM 2025", "RPA24"}
+
+
+def test_only_fully_covered_titles_are_explained():
+    titles = [
+        "Re: Course intro (INFOBPM) assignment 3 question from Jansen",
+        "Academische Vaardigheden (INFOAVA) - Microsoft Teams",
+        "Thesis draft de Boer v7.docx - Word",
+    ]
+    objects, explained = extract_local_objects(titles, ["courses", "documents"])
+    assert {o["object"] for o in objects} == {"Course intro (INFOBPM)", "Academische Vaardigheden (INFOAVA)", "Thesis draft de Boer v7"}
+    # The first title also names a person and an assignment, so it still goes to GPT
+    assert explained == set(titles[1:])
+
+
+def _local_names(titles, object_types):
+    return {o["object"] for o in extract_local_objects(titles, object_types)[0]}
+
+
+def test_person_pattern():
+    titles = ["Stein Dani, V. (Vinicius) - Outlook", "van der Aalst, W.M.P. (Wil)", "Smith, John (colleague)", "Meeting, notes (draft)"]
+    assert _local_names(titles, ["colleagues"]) == {"Stein Dani, V. (Vinicius)", "van der Aalst, W.M.P. (Wil)"}
+
+
+def test_course_pattern():
+    titles = ["Academische Vaardigheden (INFOAVA)", "Grading (INFOMPM) - Teams", "Report (v2)", "Budget (EU)"]
+    assert _local_names(titles, ["courses"]) == {"Academische Vaardigheden (INFOAVA)", "Grading (INFOMPM)"}
+
+
+def test_file_pattern():
+    titles = ["Thesis draft de Boer v7.docx - Word", "(2) budget 2025.xlsx", "www.example.com - Chrome", "notes.txt - Notepad"]
+    assert _local_names(titles, ["documents"]) == {"Thesis draft de Boer v7", "budget 2025"}
+
+
+def test_phrase_pattern_needs_several_titles_and_a_confirmed_type():
+    titles = ["BPM Exam - grading", "BPM Exam results", "Data Exam once", "Research Project plan"]
+    assert _local_names(titles, ["exams"]) == {"BPM Exam"}
+    # A phrase that only repeats the type's name is not an object
+    assert _local_names(["Exam", "Exam"], ["exams"]) == set()
+
+
+def test_matches_without_a_fitting_type_are_dropped():
+    assert extract_local_objects(["Academische Vaardigheden (INFOAVA)"], ["buildings"]) == ([], set())
+    assert extract_local_objects(["Academische Vaardigheden (INFOAVA)"], []) == ([], set())
+
+
+def test_titles_without_local_objects_are_not_explained():
+    titles = ["Inbox - Outlook", "ICPM 2025 - reviews"]
+    assert extract_local_objects(titles, ["conferences"])[1] == {"ICPM 2025 - reviews"}
@@ -0,0 +1,58 @@
+from utils.resolution import resolve_objects
+
+
+def _groups(objects):
+    resolved, _ = resolve_objects(objects)
+    return sorted(sorted([r["object"]] + r["aliases"]) for r in resolved)
+
+
+def test_people_codes_and_acronyms_merge():
+    objects = [
+        {"object": "Beerepoot, I.M. (Iris)", "object_type": "colleagues"},
+        {"object": "Iris Beerepoot", "object_type": "colleagues"},
+        {"object": "INFOBPM", "object_type": "courses"},
+        {"object": "BPM Course 2024 - 2025 (INFOBPM)", "object_type": "courses"},
+        {"object": "BPMS", "object_type": "topics"},
+        {"object": "Business Process Management Systems", "object_type": "topics"},
+    ]
+    assert _groups(objects) == [
+        ["BPM Course 2024 - 2025 (INFOBPM)", "INFOBPM"],
+        ["BPMS", "Business Process Management Systems"],
+        ["Beerepoot, I.M. (Iris)", "Iris Beerepoot"],
+    ]
+
+
+def test_different_people_types_and_editions_stay_apart():
+    objects = [
+        {"object": "Jansen, P. (Piet)", "object_type": "colleagues"},
+        {"object": "Jansen, A. (Anna)", "object_type": "colleagues"},
+        {"object": "CoopIS 2024", "object_type": "conferences"},
+        {"object": "CoopIS 2025", "object_type": "conferences"},
+        {"object": "Process Mining", "object_type": "topics"},
+        {"object": "Process Mining", "object_type": "courses"},
+    ]
+    assert len(resolve_objects(objects)[0]) == 5  # only the two exact "Process Mining" spellings merge
+
+
+def test_a_year_free_name_joins_one_edition_but_does_not_chain_editions():
+    # Intended: "Data Science" is taken as the same course as its only dated run
+    assert _groups([
+        {"object": "Data Science", "object_type": "courses"},
+        {"object": "Data Science 2025", "object_type": "courses"},
+    ]) == [["Data Science", "Data Science 2025"]]
+    # With two runs, the year-free name joins the first; the runs themselves stay apart
+    assert _groups([
+        {"object": "Data Science 2024", "object_type": "courses"},
+        {"object": "Data Science", "object_type": "courses"},
+        {"object": "Data Science 2025", "object_type": "courses"},
+    ]) == [["Data Science", "Data Science 2024"], ["Data Science 2025"]]
+
+
+def test_canonical_name_is_the_most_frequent_spelling():
+    resolved, clusters = resolve_objects([
+        {"object": "Iris Beerepoot", "object_type": "colleagues"},
+        {"object": "Beerepoot, I.M. (Iris)", "object_type": "colleagues"},
+        {"object": "Iris Beerepoot", "object_type": "colleagues"},
+    ])
+    assert resolved == [{"object": "Iris Beerepoot", "object_type": "colleagues", "aliases": ["Beerepoot, I.M. (Iris)"]}]
+    assert len(clusters) == 1
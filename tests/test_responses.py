@@ -0,0 +1,57 @@
+import pytest
+
+from utils.responses import (
+    MAX_ENUM_VALUES, enrichment_format, missing_titles, object_list_format, parse_json_array, valid_labels
+)
+
+
+def test_parse_json_array_unwraps_schema_output_and_fences():
+    assert parse_json_array('{"items": [{"object": "INFOBPM", "object_type": "courses"}]}') == [
+        {"object": "INFOBPM", "object_type": "courses"}
+    ]
+    assert parse_json_array('```json\n["a", "b"]\n```') == ["a", "b"]
+    assert parse_json_array('{"items": []}') == []
+    assert parse_json_array('{"items": ["a", "b", "c') == ["a", "b"]  # a cut-off answer keeps what was complete
+    with pytest.raises(ValueError):
+        parse_json_array("I cannot help with that.")
+
+
+def test_list_formats_wrap_the_array_in_an_object():
+    schema = object_list_format(["courses", "people"])["json_schema"]["schema"]
+    assert schema["required"] == ["items"] and schema["properties"]["items"]["type"] == "array"
+    assert schema["properties"]["items"]["items"]["properties"]["object_type"]["enum"] == ["courses", "people"]
+
+
+def test_enums_are_capped():
+    def objects_schema(objects):
+        return enrichment_format(["teach"], objects)["json_schema"]["schema"]["properties"]["items"]["items"]["properties"]["objects"]["items"]
+
+    assert len(objects_schema([f"o{i}" for i in range(MAX_ENUM_VALUES)])["enum"]) == MAX_ENUM_VALUES
+    assert objects_schema([f"o{i}" for i in range(MAX_ENUM_VALUES + 1)]) == {"type": "string"}
+    assert objects_schema([]) == {"type": "string"}
+
+
+def test_valid_labels_keeps_requested_titles_and_known_objects():
+    titles = ["Grading INFOBPM", "Email - Outlook"]
+    items = [
+        {"title": "Grading INFOBPM", "activities": ["grade"], "objects": ["INFOBPM", "Invented", 3]},
+        {"title": "Grading INFOBPM", "activities": ["other"], "objects": []},  # a repeated title: the first answer wins
+        {"title": "Email - Outlook", "activities": "email", "objects": []},  # activities must be a list
+        {"title": "Not asked", "activities": [], "objects": []},
+        "noise",
+    ]
+    assert valid_labels(items, titles, objects=["INFOBPM"]) == [
+        {"title": "Grading INFOBPM", "activities": ["grade"], "objects": ["INFOBPM"]}
+    ]
+
+
+def test_slightly_altered_titles_count_as_missing():
+    titles = ["Grading INFOBPM - Word", "Email  - Outlook", "Week 3"]
+    items = [
+        {"title": "Grading INFOBPM – Word", "activities": ["grade"], "objects": []},  # en dash instead of hyphen
+        {"title": "Email - Outlook", "activities": ["email"], "objects": []},        # whitespace collapsed
+        {"title": "Week 3", "activities": [], "objects": []},
+    ]
+    labels = valid_labels(items, titles)
+    assert [label["title"] for label in labels] == ["Week 3"]
+    assert missing_titles(titles, labels) == ["Grading INFOBPM - Word", "Email  - Outlook"]
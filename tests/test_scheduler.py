@@ -0,0 +1,137 @@
+import threading
+import time
+
+import httpx
+import openai
+import pytest
+
+from utils import scheduler
+from utils.scheduler import BULK, INTERACTIVE, MAX_RETRIES, RequestScheduler, TokenBucket
+
+API_KEY = "sk-test"
+REQUEST = httpx.Request("POST", "https://api.openai.com/v1/chat/completions")
+
+
+class FakeTime:
+    """Stands in for the time module: monotonic() is set by the test and sleep() only advances it."""
+
+    def __init__(self):
+        self.now = 1000.0
+        self.sleeps = []
+
+    def monotonic(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    fake = FakeTime()
+    monkeypatch.setattr(scheduler, "time", fake)
+    return fake
+
+
+def _until(condition, timeout=5):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "condition not reached"
+        time.sleep(0.01)
+
+
+def _rate_limited(retry_after):
+    response = httpx.Response(429, headers={"retry-after": str(retry_after)}, request=REQUEST)
+    return openai.RateLimitError("rate limited", response=response, body=None)
+
+
+def test_token_bucket_refills_continuously_up_to_one_minute():
+    bucket = TokenBucket(60)
+    start = bucket.updated
+    bucket.take(60, start)
+    assert bucket.delay(30, start) == pytest.approx(30)
+    assert bucket.delay(30, start + 30) == 0
+    # More than a minute's capacity waits for a full bucket, not forever
+    assert bucket.delay(600, start + 30) == pytest.approx(30)
+
+
+def test_interactive_requests_go_before_waiting_bulk_ones(clock):
+    gate = RequestScheduler()
+    credential = gate._credential(API_KEY)
+    credential.requests = TokenBucket(1)
+    credential.requests.take(1, clock.now)  # empty: every request waits for the clock to advance a minute
+    order = []
+
+    def call(name, priority):
+        gate.call(API_KEY, lambda client: order.append(name), tokens=1, priority=priority)
+
+    bulk = threading.Thread(target=call, args=("bulk", BULK))
+    bulk.start()
+    _until(lambda: len(credential.waiting) == 1)
+    interactive = threading.Thread(target=call, args=("interactive", INTERACTIVE))
+    interactive.start()
+    _until(lambda: len(credential.waiting) == 2)
+
+    clock.now += 60
+    gate.settle(API_KEY, 0, 0)  # wakes the waiting threads
+    _until(lambda: order == ["interactive"])
+    assert bulk.is_alive()
+
+    clock.now += 60
+    gate.settle(API_KEY, 0, 0)
+    bulk.join(5)
+    interactive.join(5)
+    assert order == ["interactive", "bulk"]
+
+
+def test_retry_after_is_honoured_and_pauses_the_key(clock):
+    gate = RequestScheduler()
+    attempts = []
+
+    def request(client):
+        attempts.append(clock.now)
+        if len(attempts) < 3:
+            raise _rate_limited(7)
+        return "ok"
+
+    response, retries = gate.call(API_KEY, request, tokens=10)
+    assert (response, retries) == ("ok", 2)
+    assert len(clock.sleeps) == 2 and all(7 <= s <= 7 + 0.1 * 7 + 0.1 for s in clock.sleeps)
+    assert gate._credential(API_KEY).paused_until >= attempts[1] + 7
+
+
+def test_retries_stop_at_the_cap(clock):
+    gate = RequestScheduler()
+    attempts = []
+
+    def request(client):
+        attempts.append(clock.now)
+        raise openai.APIConnectionError(request=REQUEST)
+
+    with pytest.raises(openai.APIConnectionError):
+        gate.call(API_KEY, request, tokens=10)
+    assert len(attempts) == MAX_RETRIES + 1
+    assert all(s <= min(scheduler.BACKOFF_MAX, scheduler.BACKOFF_BASE * 2 ** i) for i, s in enumerate(clock.sleeps))
+
+
+def test_other_errors_are_not_retried(clock):
+    gate = RequestScheduler()
+    attempts = []
+
+    def request(client):
+        attempts.append(1)
+        raise openai.BadRequestError("bad", response=httpx.Response(400, request=REQUEST), body=None)
+
+    with pytest.raises(openai.BadRequestError):
+        gate.call(API_KEY, request, tokens=10)
+    assert attempts == [1] and clock.sleeps == []
+
+
+def test_settle_corrects_the_token_reservation(clock):
+    gate = RequestScheduler()
+    credential = gate._credential(API_KEY)
+    credential.tokens = TokenBucket(1000)
+    gate.call(API_KEY, lambda client: None, tokens=500)
+    gate.settle(API_KEY, reserved=500, used=200)
+    assert credential.tokens.level == pytest.approx(800)
@@ -0,0 +1,23 @@
+import pandas as pd
+
+from utils import storage
+from utils.snapshot import load_pending, restore_snapshot, save_snapshot
+
+
+def test_sessions_resume_only_their_own_code_and_lazily(tmp_path, monkeypatch):
+    monkeypatch.setattr(storage, "DATA_DIR", str(tmp_path))
+    first = {"profession": "Academic staff", "step3_summary_df": pd.DataFrame({"Title": ["a"]}), "step2_data": {"n": 1}}
+    second = {"profession": "Academic staff", "step2_data": {"n": 2}}
+    save_snapshot(first, "Step 2")
+    save_snapshot(second, "Step 2")
+    assert first["snapshot_id"] != second["snapshot_id"]
+
+    resumed = {}
+    restore_snapshot(resumed, first["snapshot_id"])
+    assert "step2_data" not in resumed and set(resumed["snapshot_pending"]) == {"step3_summary_df", "step2_data"}
+    load_pending(resumed, ["step2_data"])
+    assert resumed["step2_data"] == {"n": 1} and list(resumed["snapshot_pending"]) == ["step3_summary_df"]
+
+    # Keys not loaded yet stay in the snapshot when the resumed session saves again
+    manifest = save_snapshot(resumed, "Step 3")
+    assert set(manifest["keys"]) == {"step3_summary_df", "step2_data"}
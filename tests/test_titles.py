@@ -0,0 +1,17 @@
+from utils.titles import cluster_keys
+
+
+def test_titles_differing_in_a_name_stay_apart():
+    keys = [
+        "meeting with meijer about infosen", "meeting with mulder about infosen",
+        "infompm - blackboard - week 66", "busan - blackboard - week 66",
+    ]
+    assert len(set(cluster_keys(keys))) == 4
+
+
+def test_punctuation_and_truncation_variants_merge():
+    clusters = cluster_keys([
+        "grading assignment feedback for infompm students",
+        "grading assignment feedback for infompm studen",
+    ])
+    assert len(set(clusters)) == 1
@@ -0,0 +1,55 @@
+import sqlite3
+
+import pandas as pd
+
+from ocel.writers import _type_maps, write_ocel_sqlite
+
+
+def test_type_maps_keep_clear_of_fixed_tables():
+    maps = _type_maps(["Object", "object", "Read paper", "Read-paper"])
+
+    assert maps == {"Object": "Object2", "object": "object3", "Read paper": "Readpaper", "Read-paper": "Readpaper2"}
+
+
+def test_sqlite_round_trip(tmp_path):
+    events = pd.DataFrame({
+        "id": ["e1", "e2", "e3"],
+        "type": ["object", "Write report", "object"],
+        "time": pd.to_datetime(["2025-05-09 07:56", "2025-05-09 08:10", "2025-05-09 08:30"]),
+    })
+    objects = pd.DataFrame({
+        "id": ["o1", "o2"],
+        "type": ["Document", "object"],
+        "name": ["Report.docx", "Inbox"],
+        "time": pd.to_datetime(["2025-05-09 07:56", "2025-05-09 08:10"]),
+    })
+    relations = pd.DataFrame({
+        "event_id": ["e1", "e2", "e2", "e3"],
+        "object_id": ["o1", "o1", "o2", "o2"],
+        "qualifier": ["", "", "", ""],
+    })
+
+    path = tmp_path / "log.sqlite"
+    write_ocel_sqlite(str(path), events, objects, relations)
+
+    conn = sqlite3.connect(path)
+    try:
+        event_maps = dict(conn.execute('SELECT ocel_type, ocel_type_map FROM "event_map_type"'))
+        object_maps = dict(conn.execute('SELECT ocel_type, ocel_type_map FROM "object_map_type"'))
+        assert event_maps == {"Write report": "Writereport", "object": "object2"}
+        assert object_maps == {"Document": "Document", "object": "object2"}
+
+        assert conn.execute('SELECT COUNT(*) FROM "event"').fetchone() == (3,)
+        assert conn.execute('SELECT COUNT(*) FROM "object"').fetchone() == (2,)
+        assert sorted(conn.execute('SELECT ocel_id FROM "event_object2"')) == [("e1",), ("e3",)]
+        assert list(conn.execute('SELECT ocel_id, name FROM "object_object2"')) == [("o2", "Inbox")]
+
+        # The fixed relation tables keep their OCEL 2.0 columns and contents
+        columns = [row[1] for row in conn.execute('PRAGMA table_info("event_object")')]
+        assert columns == ["ocel_event_id", "ocel_object_id", "ocel_qualifier"]
+        assert sorted(conn.execute('SELECT ocel_event_id, ocel_object_id FROM "event_object"')) == [
+            ("e1", "o1"), ("e2", "o1"), ("e2", "o2"), ("e3", "o2"),
+        ]
+        assert conn.execute('SELECT COUNT(*) FROM "object_object"').fetchone() == (0,)
+    finally:
+        conn.close()
@@ -0,0 +1,91 @@
+import re
+
+from utils.matcher import ObjectMatcher
+from utils.objects import split_aliases
+
+_TOKEN = re.compile(r"[^\W_]+")
+_PARTS = re.compile(r"[^\W\d_]+|\d+")
+
+MIN_KEY_LENGTH = 2
+MIN_CODE_SUFFIX = 3   # "INFOBPM" is also found through "BPM"
+MAX_ACRONYM_WORDS = 4
+# A key shared by more objects than this share of the catalogue (and at least MIN_GENERIC_OBJECTS) is too
+# generic to select objects on its own, e.g. "meeting" when many objects are meetings
+MAX_KEY_SHARE = 0.2
+MIN_GENERIC_OBJECTS = 5
+STOPWORDS = {"the", "and", "for", "with", "from", "about", "van", "het", "een", "der", "den", "und", "les"}
+
+
+def _tokens(text):
+    # Whole alphanumeric runs plus their letter and digit parts: "INFOBPM2024" -> infobpm2024, infobpm, 2024
+    keys = set()
+    for run in _TOKEN.findall(text):
+        keys.add(run.casefold())
+        keys.update(part.casefold() for part in _PARTS.findall(run))
+    return {k for k in keys if len(k) >= MIN_KEY_LENGTH and k not in STOPWORDS}
+
+
+def _words(text):
+    return [w for w in _PARTS.findall(text) if not w.isdigit()]
+
+
+def object_keys(name):
+    """Index keys of an object name: its tokens, its acronym and, for codes, their suffixes."""
+    name = str(name)
+    keys = _tokens(name)
+    words = _words(name)
+    if 2 <= len(words) <= MAX_ACRONYM_WORDS:
+        keys.add("".join(w[0] for w in words).casefold())  # "Business Process Management" -> bpm
+    for run in _TOKEN.findall(name):
+        if run.isupper() and len(run) > MIN_CODE_SUFFIX:
+            keys.update(run[i:].casefold() for i in range(1, len(run) - MIN_CODE_SUFFIX + 1))
+    return keys
+
+
+def title_keys(title):
+    """Lookup keys of a title: its tokens and the acronyms of short runs of its words."""
+    keys = _tokens(title)
+    words = _words(title)
+    for size in range(2, MAX_ACRONYM_WORDS + 1):
+        for i in range(len(words) - size + 1):
+            keys.add("".join(w[0] for w in words[i:i + size]).casefold())
+    return keys
+
+
+class CandidateIndex:
+    """
+    Inverted index from name tokens, acronyms and code suffixes to confirmed
+    objects, plus an ObjectMatcher for names occurring inside a title. Aliases
+    of an object select it like its own name. Selects
+    the objects plausibly relevant to a batch of titles, so a Step 4 prompt
+    only lists those instead of the whole catalogue.
+    """
+
+    def __init__(self, objects):
+        self.objects = list(objects)
+        names = []
+        self._owners = []  # object index of each name
+        for index, entry in enumerate(self.objects):
+            for name in [str(entry["object"])] + split_aliases(entry.get("aliases")):
+                names.append(name)
+                self._owners.append(index)
+        self._matcher = ObjectMatcher(names, case_insensitive=True)
+        postings = {}
+        for name, index in zip(names, self._owners):
+            for key in object_keys(name):
+                postings.setdefault(key, set()).add(index)
+        limit = max(MIN_GENERIC_OBJECTS, MAX_KEY_SHARE * len(self.objects))
+        self._postings = {key: indices for key, indices in postings.items() if len(indices) <= limit}
+
+    def candidate_indices(self, titles):
+        indices = set()
+        for title in titles:
+            title = str(title)
+            indices.update(self._owners[i] for i in self._matcher.matched_indices(title))
+            for key in title_keys(title):
+                indices.update(self._postings.get(key, ()))
+        return sorted(indices)
+
+    def candidates(self, titles):
+        """Objects (in catalogue order) whose name, a token, acronym or code suffix of it appears in the titles."""
+        return [self.objects[i] for i in self.candidate_indices(titles)]
@@ -0,0 +1,156 @@
+import math
+from collections import Counter, defaultdict
+
+from utils.titles import normalize_title
+
+# --- Model settings ---
+NGRAM_SIZES = (3, 4, 5)
+NEIGHBOURS = 5
+MAX_DOCUMENT_FREQUENCY = 0.5
+MIN_EXAMPLES_TO_CALIBRATE = 20
+DEFAULT_TARGET_PRECISION = 0.9
+
+
+def char_ngrams(title):
+    text = f" {normalize_title(title)} "
+    grams = Counter()
+    for n in NGRAM_SIZES:
+        for i in range(len(text) - n + 1):
+            grams[text[i:i + n]] += 1
+    return grams
+
+
+class TitleLabeller:
+    """
+    CPU-only activity/object labeller for window titles: TF-IDF over character
+    n-grams with a cosine k-nearest-neighbour vote. Examples can be added at
+    any time with partial_fit; a later example for the same title replaces the
+    earlier one, so reviewed labels override GPT suggestions.
+
+    predict() returns a confidence in [0, 1]; calibrate() turns the training
+    set into a threshold above which predictions are precise enough to skip GPT.
+    """
+
+    def __init__(self):
+        self._docs = {}                  # title -> (n-gram counts, frozenset activities, frozenset objects)
+        self._df = Counter()             # n-gram -> number of titles containing it
+        self._weights = None             # n-gram -> [(title, weight)], rebuilt lazily after partial_fit
+        self.threshold = 1.01
+
+    def __len__(self):
+        return len(self._docs)
+
+    # --- Training ---
+    def partial_fit(self, examples):
+        for example in examples:
+            title = example.get("title")
+            if not title:
+                continue
+            if title in self._docs:
+                self._remove(title)
+            grams = char_ngrams(title)
+            self._docs[title] = (
+                grams,
+                frozenset(example.get("activities") or []),
+                frozenset(example.get("objects") or [])
+            )
+            for gram in grams:
+                self._df[gram] += 1
+        self._weights = None
+        return self
+
+    def _remove(self, title):
+        grams = self._docs.pop(title)[0]
+        for gram in grams:
+            self._df[gram] -= 1
+
+    # --- TF-IDF ---
+    def _idf(self, gram):
+        n = len(self._docs)
+        df = self._df.get(gram, 0)
+        if df == 0 or (n >= 10 and df / n > MAX_DOCUMENT_FREQUENCY):
+            return 0.0  # unseen or too common to discriminate between titles
+        return math.log((1 + n) / (1 + df)) + 1
+
+    def _vector(self, grams):
+        vector = {}
+        for gram, tf in grams.items():
+            idf = self._idf(gram)
+            if idf:
+                vector[gram] = (1 + math.log(tf)) * idf
+        norm = math.sqrt(sum(w * w for w in vector.values()))
+        return {gram: w / norm for gram, w in vector.items()} if norm else {}
+
+    def _weighted_postings(self):
+        # n-gram -> [(title, weight)], rebuilt once after each partial_fit so queries are simple sums
+        if self._weights is None:
+            self._weights = defaultdict(list)
+            for title, doc in self._docs.items():
+                for gram, weight in self._vector(doc[0]).items():
+                    self._weights[gram].append((title, weight))
+        return self._weights
+
+    def _neighbours(self, title, exclude=None):
+        postings = self._weighted_postings()
+        scores = {}
+        for gram, weight in self._vector(char_ngrams(title)).items():
+            for other, other_weight in postings.get(gram, ()):
+                scores[other] = scores.get(other, 0.0) + weight * other_weight
+        scores.pop(exclude, None)
+        return Counter(scores).most_common(NEIGHBOURS)
+
+    # --- Prediction ---
+    def _vote(self, neighbours):
+        total = sum(score for _, score in neighbours)
+        if total <= 0:
+            return frozenset(), frozenset(), 0.0
+        activity_votes, object_votes = Counter(), Counter()
+        for other, score in neighbours:
+            _, activities, objects = self._docs[other]
+            for activity in activities:
+                activity_votes[activity] += score
+            for obj in objects:
+                object_votes[obj] += score
+        activities = frozenset(a for a, v in activity_votes.items() if v * 2 >= total)
+        objects = frozenset(o for o, v in object_votes.items() if v * 2 >= total)
+
+        # Confidence: closeness of the best match times the share of neighbours agreeing on the full label set
+        agreeing = sum(
+            score for other, score in neighbours
+            if self._docs[other][1] == activities and self._docs[other][2] == objects
+        )
+        return activities, objects, min(1.0, neighbours[0][1]) * agreeing / total
+
+    def predict(self, title):
+        activities, objects, confidence = self._vote(self._neighbours(title))
+        return {
+            "title": title,
+            "activities": sorted(activities),
+            "objects": sorted(objects),
+            "confidence": round(confidence, 4)
+        }
+
+    def calibrate(self, target_precision=DEFAULT_TARGET_PRECISION):
+        """
+        Leave-one-out over the training titles: pick the lowest confidence at
+        which predictions still reproduce the known labels with at least
+        target_precision. Too few examples keep every title going to GPT.
+        """
+        if len(self._docs) < MIN_EXAMPLES_TO_CALIBRATE:
+            self.threshold = 1.01
+            return self.threshold
+
+        scored = []
+        for title, (_, activities, objects) in self._docs.items():
+            pred_activities, pred_objects, confidence = self._vote(self._neighbours(title, exclude=title))
+            scored.append((confidence, pred_activities == activities and pred_objects == objects))
+        scored.sort(key=lambda item: item[0], reverse=True)
+
+        threshold = 1.01
+        correct = 0
+        for count, (confidence, is_correct) in enumerate(scored, start=1):
+            correct += is_correct
+            if confidence > 0 and correct / count >= target_precision:
+                threshold = confidence
+        self.threshold = threshold
+        return threshold
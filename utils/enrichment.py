@@ -0,0 +1,140 @@
+import json
+import math
+import os
+import random
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+
+from utils.storage import content_hash, data_path
+
+# --- Defaults for Step 4 enrichment ---
+DEFAULT_MAX_CONCURRENCY = 4
+SAMPLE_SIZE = 100
+WAIT_INTERVAL = 0.25
+
+# --- Token budget for one enrichment request ---
+DEFAULT_MAX_PROMPT_TOKENS = 12000
+DEFAULT_MAX_COMPLETION_TOKENS = 4000
+DEFAULT_MAX_TITLES_PER_BATCH = 50
+CHARS_PER_TOKEN = 4
+COMPLETION_TOKENS_PER_TITLE = 40
+
+
+def make_batches(items, batch_size):
+    return [items[i:i + batch_size] for i in range(0, len(items), batch_size)]
+
+
+def estimate_tokens(text):
+    # Offline approximation (~4 characters per token for English GPT tokenizers); no API call needed
+    return math.ceil(len(text) / CHARS_PER_TOKEN)
+
+
+def plan_batches(
+    titles,
+    base_prompt_tokens,
+    max_prompt_tokens=DEFAULT_MAX_PROMPT_TOKENS,
+    max_completion_tokens=DEFAULT_MAX_COMPLETION_TOKENS,
+    max_titles=DEFAULT_MAX_TITLES_PER_BATCH,
+    title_prompt_tokens=None
+):
+    """
+    Pack titles, in order, into the fewest batches whose estimated prompt and
+    completion sizes stay within budget. base_prompt_tokens is the cost of the
+    prompt with an empty title list (instructions, objects and activities).
+    title_prompt_tokens(title) optionally adds per-title prompt cost, e.g. for
+    objects that are only listed when a batch's titles mention them.
+
+    Returns (batches, estimate) where estimate holds the planned request count
+    and total prompt/completion token estimates.
+    """
+    batches = []
+    prompt_total = 0
+    completion_total = 0
+    batch, batch_prompt, batch_completion = [], base_prompt_tokens, 0
+
+    for title in titles:
+        title_tokens = estimate_tokens(json.dumps(title)) + 1
+        prompt_cost = title_tokens + (title_prompt_tokens(title) if title_prompt_tokens else 0)
+        completion_cost = title_tokens + COMPLETION_TOKENS_PER_TITLE
+        if batch and (
+            len(batch) >= max_titles
+            or batch_prompt + prompt_cost > max_prompt_tokens
+            or batch_completion + completion_cost > max_completion_tokens
+        ):
+            batches.append(batch)
+            prompt_total += batch_prompt
+            completion_total += batch_completion
+            batch, batch_prompt, batch_completion = [], base_prompt_tokens, 0
+        batch.append(title)
+        batch_prompt += prompt_cost
+        batch_completion += completion_cost
+
+    if batch:
+        batches.append(batch)
+        prompt_total += batch_prompt
+        completion_total += batch_completion
+
+    estimate = {"requests": len(batches), "prompt_tokens": prompt_total, "completion_tokens": completion_total}
+    return batches, estimate
+
+
+def sample_titles(titles, k=SAMPLE_SIZE):
+    # Seeded by the title set so a refreshed page draws the same sample and can resume its checkpoint
+    if len(titles) <= k:
+        return list(titles)
+    return random.Random(content_hash(sorted(titles))).sample(list(titles), k)
+
+
+def run_batches_concurrently(batches, enrich_fn, max_concurrency=DEFAULT_MAX_CONCURRENCY, on_wait=None):
+    """
+    Run enrich_fn(batch) for every batch on a bounded thread pool.
+
+    Yields (index, result, error) tuples in completion order so the caller can
+    report progress as batches finish; use the index to restore input order.
+    on_wait() is called on the caller's thread every WAIT_INTERVAL seconds
+    while batches are running, e.g. to render results streamed so far.
+    """
+    if not batches:
+        return
+
+    workers = max(1, min(int(max_concurrency), len(batches)))
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        futures = {executor.submit(enrich_fn, batch): i for i, batch in enumerate(batches)}
+        pending = set(futures)
+        while pending:
+            done, pending = wait(pending, timeout=WAIT_INTERVAL if on_wait else None, return_when=FIRST_COMPLETED)
+            if on_wait is not None:
+                on_wait()
+            for future in done:
+                i = futures[future]
+                try:
+                    yield i, future.result(), None
+                except Exception as e:
+                    yield i, None, e
+
+
+# --- Resumable checkpoints: one JSON line per finished batch ---
+def checkpoint_path(profession, objects, activities, batches):
+    key = content_hash([profession, objects, activities, batches])
+    return data_path("checkpoints", f"step4_{key[:24]}.jsonl")
+
+
+def load_checkpoint(path):
+    done = {}
+    if not os.path.exists(path):
+        return done
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError:
+                # A crash mid-write leaves at most one partial trailing line
+                continue
+            done[record["batch"]] = record["result"]
+    return done
+
+
+def append_checkpoint(path, index, batch, result):
+    with open(path, "a", encoding="utf-8") as f:
+        f.write(json.dumps({"batch": index, "titles": batch, "result": result}, ensure_ascii=False) + "\n")
+        f.flush()
+        os.fsync(f.fileno())
@@ -0,0 +1,188 @@
+import gzip
+import json
+import time
+import zlib
+
+from utils.storage import content_hash
+
+# --- Download formats: label, file extension, MIME type ---
+EXPORT_FORMATS = {
+    "json": ("JSON (indented)", ".json", "application/json"),
+    "compact": ("JSON (compact)", ".json", "application/json"),
+    "ndjson": ("NDJSON (one record per line)", ".ndjson", "application/x-ndjson"),
+    "gzip": ("JSON (compact, gzip)", ".json.gz", "application/gzip"),
+}
+PREVIEW_ITEMS = 5
+_COMPACT = {"separators": (",", ":"), "ensure_ascii": False}
+
+
+# --- Change tracking: export sections the steps update in place, by session key ---
+# Hashing these on every rerun costs about as much as serializing them, so the pages bump a version instead
+VERSIONED_SECTIONS = {"step2": "step2_data", "step3": "step3_data", "step4": "step4_data"}
+
+
+def mark_changed(state, *keys):
+    """Record that the session values under keys were replaced or changed in place."""
+    versions = state.setdefault("data_versions", {})
+    for key in keys:
+        versions[key] = versions.get(key, 0) + 1
+
+
+def export_key(state, export_data, fmt):
+    # Versioned sections by their version, the small remaining ones (step1, metrics) by content
+    versions = state.get("data_versions", {})
+    return content_hash([fmt, {
+        name: ["version", versions.get(VERSIONED_SECTIONS[name], 0)] if name in VERSIONED_SECTIONS else content_hash(value)
+        for name, value in export_data.items()
+    }])
+
+
+# --- Serialization, record by record instead of one large string ---
+# Sections and their fields are written one by one and the items of list fields in slices; each slice is
+# encoded in one call, which for compact output runs in json's C encoder
+STREAM_DEPTH = 3
+STREAM_SLICE = 1000
+_ENCODERS = {
+    "json": json.JSONEncoder(indent=4),
+    "compact": json.JSONEncoder(**_COMPACT),
+}
+
+
+def _iter_json(value, encoder, depth=0):
+    indent = encoder.indent
+    if depth >= STREAM_DEPTH or not isinstance(value, (dict, list)) or not value:
+        text = encoder.encode(value)
+        yield text.replace("\n", "\n" + " " * (indent * depth)) if indent else text
+        return
+    is_dict = isinstance(value, dict)
+    opening, closing = ("{", "}") if is_dict else ("[", "]")
+    inner = "\n" + " " * (indent * (depth + 1)) if indent else ""
+    separator = ("," if indent else encoder.item_separator) + inner
+    end = ("\n" + " " * (indent * depth) if indent else "") + closing
+    yield opening + inner
+    if not is_dict and depth + 1 >= STREAM_DEPTH:
+        # Leaf items are encoded a slice at a time, without the slice's own brackets
+        for start in range(0, len(value), STREAM_SLICE):
+            text = encoder.encode(value[start:start + STREAM_SLICE])
+            if indent:
+                text = text.replace("\n", "\n" + " " * (indent * depth))
+            yield (separator if start else "") + text[len(opening + inner):-len(end)]
+    else:
+        for i, item in enumerate(value.items() if is_dict else value):
+            if i:
+                yield separator
+            if is_dict:
+                key, item = item
+                yield encoder.encode(str(key)) + encoder.key_separator
+            yield from _iter_json(item, encoder, depth + 1)
+    yield end
+
+
+def iter_ndjson(export_data):
+    # One line per field; list fields are spread over one line per item (empty sections and lists keep one line)
+    encode = _ENCODERS["compact"].encode
+    for section, fields in export_data.items():
+        if not isinstance(fields, dict) or not fields:
+            yield encode({"section": section, "value": fields}) + "\n"
+            continue
+        for field, value in fields.items():
+            if isinstance(value, list) and value:
+                for item in value:
+                    yield encode({"section": section, "field": field, "item": item}) + "\n"
+            else:
+                yield encode({"section": section, "field": field, "value": value}) + "\n"
+
+
+def iter_export(export_data, fmt):
+    """The export as text chunks in the given format (gzip is compressed by export_bytes)."""
+    if fmt == "ndjson":
+        return iter_ndjson(export_data)
+    return _iter_json(export_data, _ENCODERS["json" if fmt == "json" else "compact"])
+
+
+def iter_export_bytes(export_data, fmt):
+    """The export as encoded (and for gzip, compressed) blocks of about 64 KB, e.g. for writing to a file."""
+    # wbits=31 writes a gzip container; its header carries no timestamp, so equal exports give equal bytes
+    compressor = zlib.compressobj(6, zlib.DEFLATED, 31) if fmt == "gzip" else None
+    buffer = []
+    size = 0
+    for chunk in iter_export(export_data, fmt):
+        buffer.append(chunk)
+        size += len(chunk)
+        if size >= 1 << 16:
+            data = "".join(buffer).encode("utf-8")
+            yield compressor.compress(data) if compressor else data
+            buffer, size = [], 0
+    data = "".join(buffer).encode("utf-8")
+    yield compressor.compress(data) + compressor.flush() if compressor else data
+
+
+def export_bytes(export_data, fmt):
+    # st.download_button needs the whole file as bytes; the blocks are joined once, without an extra copy
+    return b"".join(iter_export_bytes(export_data, fmt))
+
+
+def cached_export(state, export_data, fmt):
+    """
+    (bytes, built_at) of the export in fmt, built only when the format, a
+    versioned section's version (see mark_changed) or another section's
+    content changed since the last build.
+    """
+    key = export_key(state, export_data, fmt)
+    cached = state.get("export_cache")
+    if cached is None or cached["key"] != key:
+        cached = {"key": key, "data": export_bytes(export_data, fmt), "built_at": time.time()}
+        state["export_cache"] = cached
+    return cached["data"], cached["built_at"]
+
+
+# --- Preview ---
+def export_summary(export_data):
+    """One row per exported field: its section, name and size (items, keys or the value itself)."""
+    rows = []
+    for section, fields in export_data.items():
+        for field, value in (fields.items() if isinstance(fields, dict) else [("", fields)]):
+            if isinstance(value, list):
+                size = f"{len(value):,} items"
+            elif isinstance(value, dict):
+                size = f"{len(value):,} keys"
+            else:
+                size = str(value)
+            rows.append({"Section": section, "Field": field, "Size": size})
+    return rows
+
+
+def truncated(value, limit=PREVIEW_ITEMS):
+    """A copy with every list cut to its first items, for previewing large exports."""
+    if isinstance(value, dict):
+        return {k: truncated(v, limit) for k, v in value.items()}
+    if isinstance(value, list):
+        head = [truncated(v, limit) for v in value[:limit]]
+        return head + ([f"… {len(value) - limit:,} more"] if len(value) > limit else [])
+    return value
+
+
+# --- Reading an export back (any of the formats above) ---
+def read_export(path):
+    with open(path, "rb") as f:
+        raw = f.read()
+    if raw[:2] == b"\x1f\x8b":
+        raw = gzip.decompress(raw)
+    text = raw.decode("utf-8-sig")
+    try:
+        return json.loads(text)
+    except json.JSONDecodeError:
+        pass
+    export_data = {}
+    for line in text.splitlines():
+        if not line.strip():
+            continue
+        record = json.loads(line)
+        section = record["section"]
+        if "field" not in record:
+            export_data[section] = record["value"]
+        elif "item" in record:
+            export_data.setdefault(section, {}).setdefault(record["field"], []).append(record["item"])
+        else:
+            export_data.setdefault(section, {})[record["field"]] = record["value"]
+    return export_data
@@ -0,0 +1,242 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+
+import numpy as np
+import pandas as pd
+
+from utils.sources import detect_adapter, expand_sources, open_payload, read_head, sniff_header
+
+TOCKLER_COLUMNS = ["Title", "Begin", "End"]
+DEFAULT_CHUNKSIZE = 200_000
+# Below this much export data, starting worker processes costs more than it saves
+MIN_PARALLEL_BYTES = 8 * 1024 * 1024
+
+
+def _aggregate_chunk(chunk):
+    chunk = chunk.dropna(subset=["Title"])
+    return _aggregate_intervals(pd.DataFrame({
+        "Title": chunk["Title"].astype("category"),
+        "Begin": pd.to_datetime(chunk["Begin"]),
+        "End": pd.to_datetime(chunk["End"])
+    }))
+
+
+def _aggregate_intervals(intervals):
+    # Title, Begin, End rows -> one row per (Title, Date) with summed Duration and Frequency
+    frame = pd.DataFrame({
+        "Title": intervals["Title"].astype("category"),
+        "Date": intervals["Begin"].dt.normalize(),
+        "Duration": (intervals["End"] - intervals["Begin"]).dt.total_seconds()
+    })
+    return (
+        frame.groupby(["Title", "Date"], observed=True, sort=False)
+        .agg(Duration=("Duration", "sum"), Frequency=("Duration", "size"))
+        .reset_index()
+    )
+
+
+def summarize_title_days(parts):
+    # Fold partial (Title, Date) aggregates so memory stays proportional to distinct title-days
+    merged = pd.concat(parts, ignore_index=True)
+    merged["Title"] = merged["Title"].astype(str)
+    return (
+        merged.groupby(["Title", "Date"], sort=False)
+        .agg(Duration=("Duration", "sum"), Frequency=("Frequency", "sum"))
+        .reset_index()
+    )
+
+
+def read_title_days(source, sep=";", chunksize=DEFAULT_CHUNKSIZE):
+    """
+    Read a Tockler export in chunks and return one row per (Title, Date) with
+    its Duration (seconds) and Frequency (rows), without ever holding the full
+    export in memory.
+    """
+    title_days = None
+    reader = pd.read_csv(
+        source,
+        sep=sep,
+        usecols=lambda c: c in TOCKLER_COLUMNS,
+        dtype={"Title": "string"},
+        chunksize=chunksize
+    )
+    for chunk in reader:
+        missing = set(TOCKLER_COLUMNS) - set(chunk.columns)
+        if missing:
+            raise ValueError(f"Missing required columns: {', '.join(sorted(missing))}")
+        part = _aggregate_chunk(chunk)
+        title_days = part if title_days is None else summarize_title_days([title_days, part])
+
+    if title_days is None:
+        return pd.DataFrame(columns=["Title", "Date", "Duration", "Frequency"])
+    title_days["Title"] = title_days["Title"].astype(str)
+    return title_days
+
+
+def summarize_titles(title_days, groups=None):
+    """
+    One row per title with total Duration, Frequency and UniqueDays, longest
+    first. With groups (a title -> group title mapping), variants are pooled
+    under their group title and Variants counts the distinct titles merged.
+    """
+    if title_days.empty:
+        return pd.DataFrame(columns=["Title", "Duration", "Frequency", "UniqueDays", "Variants"])
+    frame = title_days.assign(Source=title_days["Title"])
+    if groups is not None:
+        frame["Title"] = frame["Title"].map(groups).fillna(frame["Title"])
+    return (
+        frame.groupby("Title", as_index=False)
+        .agg(
+            Duration=("Duration", "sum"),
+            Frequency=("Frequency", "sum"),
+            UniqueDays=("Date", "nunique"),
+            Variants=("Source", "nunique")
+        )
+        .sort_values(by="Duration", ascending=False, ignore_index=True)
+    )
+
+
+def summarize_tockler_csv(source, sep=";", chunksize=DEFAULT_CHUNKSIZE):
+    return summarize_titles(read_title_days(source, sep=sep, chunksize=chunksize))
+
+
+# --- Many exports: several machines, months or trackers at once ---
+def _read_source(source, intervals=False, chunksize=DEFAULT_CHUNKSIZE):
+    """
+    Worker: read one export through the adapter matching its columns. Returns
+    its name, adapter name, row count and either its title-days or, with
+    intervals=True, its Title/Begin/End rows.
+    """
+    name, payload = source
+    sep, columns = sniff_header(read_head(payload))
+    try:
+        adapter = detect_adapter(columns)
+    except ValueError as e:
+        raise ValueError(f"{name}: {e}") from e
+    reader = pd.read_csv(
+        open_payload(payload),
+        sep=sep,
+        usecols=adapter.columns,
+        dtype={adapter.title: "string"},
+        encoding="utf-8-sig",
+        chunksize=chunksize
+    )
+    rows = 0
+    result = None
+    parts = []
+    for chunk in reader:
+        rows += len(chunk)
+        part = adapter.intervals(chunk.dropna(subset=[adapter.title]))
+        if intervals:
+            parts.append(part.assign(Title=part["Title"].astype(str)))
+        else:
+            part = _aggregate_intervals(part)
+            result = part if result is None else summarize_title_days([result, part])
+    if intervals:
+        result = pd.concat(parts, ignore_index=True) if parts else pd.DataFrame(columns=TOCKLER_COLUMNS)
+        result["Title"] = result["Title"].astype("category")  # pickled back as codes plus distinct titles
+    return {"name": name, "adapter": adapter.name, "rows": rows, "data": result}
+
+
+def _expand(inputs):
+    sources = expand_sources(inputs)
+    if not sources:
+        raise ValueError("No CSV exports found")
+    return sources
+
+
+def _payload_size(payload):
+    return os.path.getsize(payload) if isinstance(payload, str) else len(payload)
+
+
+def _map_sources(sources, work, max_workers=None):
+    # One worker process per export, when there are several exports and enough data to be worth it
+    workers = min(len(sources), max_workers or os.cpu_count() or 1)
+    if workers <= 1 or sum(_payload_size(payload) for _, payload in sources) < MIN_PARALLEL_BYTES:
+        return [work(source) for source in sources]
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        return list(executor.map(work, sources))
+
+
+def _report(results, duplicates=0, overlaps=0):
+    return {
+        "files": [{"name": r["name"], "adapter": r["adapter"], "rows": r["rows"]} for r in results],
+        "rows": sum(r["rows"] for r in results),
+        "duplicates": duplicates,
+        "overlaps": overlaps
+    }
+
+
+def dedupe_intervals(intervals, overlaps=False):
+    """
+    Sort-merge pass over Title/Begin/End rows from several exports. After one
+    sort on Begin, rows repeated by overlapping exports are dropped. With
+    overlaps=True, time an earlier row of any title already covers is also
+    cut from the start of a later one, so every second is counted once (rows
+    left empty are dropped). Returns (intervals, duplicates dropped, rows
+    trimmed or dropped as overlapping).
+    """
+    frame = intervals.sort_values(["Begin", "End", "Title"], kind="stable", na_position="last", ignore_index=True)
+    begin = frame["Begin"].to_numpy("datetime64[ns]").view("i8")
+    end = frame["End"].to_numpy("datetime64[ns]").view("i8")
+    valid = (begin != np.iinfo(np.int64).min) & (end != np.iinfo(np.int64).min)
+
+    title = frame["Title"].astype(str).to_numpy()
+    duplicate = np.r_[False, (title[1:] == title[:-1]) & (begin[1:] == begin[:-1]) & (end[1:] == end[:-1]) & valid[1:]]
+    keep = ~duplicate
+    overlapping = np.zeros(len(frame), dtype=bool)
+
+    if overlaps:
+        # The latest end among all earlier rows (NaT is the smallest int64, so it never covers anything)
+        covered = np.r_[np.iinfo(np.int64).min, np.maximum.accumulate(np.where(valid, end, np.iinfo(np.int64).min))[:-1]]
+        overlapping = valid & ~duplicate & (covered > begin) & (begin < end)
+        trimmed = np.where(overlapping, np.minimum(covered, end), begin)
+        frame["Begin"] = pd.to_datetime(np.where(valid, trimmed, begin).view("datetime64[ns]"))
+        keep &= ~(overlapping & (covered >= end))
+    return frame[keep].reset_index(drop=True), int(duplicate.sum()), int(overlapping.sum())
+
+
+def _merge_intervals(sources, dedupe, overlaps, max_workers, chunksize):
+    results = _map_sources(sources, partial(_read_source, intervals=True, chunksize=chunksize), max_workers)
+    frames = [r["data"] for r in results]
+    intervals = pd.concat([f.assign(Title=f["Title"].astype(str)) for f in frames], ignore_index=True)
+    duplicates = trimmed = 0
+    if overlaps or (dedupe and len(sources) > 1):
+        intervals, duplicates, trimmed = dedupe_intervals(intervals, overlaps)
+    return intervals, _report(results, duplicates, trimmed)
+
+
+def read_intervals(inputs, dedupe=True, overlaps=False, max_workers=None, chunksize=DEFAULT_CHUNKSIZE):
+    """
+    Read exports (paths, directories, zip archives or uploaded files; see
+    utils.sources) in parallel worker processes and return (intervals, report):
+    one Title/Begin/End row per activity across all of them and what was read
+    and removed. With dedupe, rows repeated in several exports are dropped;
+    overlaps=True also trims time recorded twice (see dedupe_intervals).
+    """
+    return _merge_intervals(_expand(inputs), dedupe, overlaps, max_workers, chunksize)
+
+
+def read_sources_title_days(inputs, dedupe=True, overlaps=False, max_workers=None, chunksize=DEFAULT_CHUNKSIZE):
+    """
+    Like read_title_days for any number of exports, of any tracker with an
+    adapter. Each worker aggregates its own export in chunks and only the
+    title-days are combined, so the result equals read_title_days of the
+    exports concatenated into one file. Only for several exports with dedupe,
+    or with overlaps=True, are their rows merged first as in read_intervals.
+    Returns (title_days, report).
+    """
+    sources = _expand(inputs)
+    if overlaps or (dedupe and len(sources) > 1):
+        intervals, report = _merge_intervals(sources, dedupe, overlaps, max_workers, chunksize)
+        title_days = _aggregate_intervals(intervals) if len(intervals) else None
+    else:
+        results = _map_sources(sources, partial(_read_source, chunksize=chunksize), max_workers)
+        parts = [r["data"] for r in results if r["data"] is not None]
+        title_days = summarize_title_days(parts) if parts else None
+        report = _report(results)
+    if title_days is None:
+        return pd.DataFrame(columns=["Title", "Date", "Duration", "Frequency"]), report
+    title_days["Title"] = title_days["Title"].astype(str)
+    return title_days, report
@@ -0,0 +1,105 @@
+import ast
+import json
+import re
+
+_TRAILING_COMMA = re.compile(r",\s*([}\]])")
+
+
+class PartialJSONArray(ValueError):
+    """A streamed JSON array ended early; items holds the elements that were complete."""
+
+    def __init__(self, items, reason):
+        super().__init__(f"{reason} ({len(items)} items received)")
+        self.items = items
+        self.reason = reason
+
+
+def repair_json_value(text):
+    """
+    Parse one JSON value, tolerating the slips GPT makes most: trailing commas
+    and Python-style literals (single quotes, True/False/None). Returns None
+    when the value cannot be recovered.
+    """
+    try:
+        return json.loads(text)
+    except json.JSONDecodeError:
+        pass
+    try:
+        return json.loads(_TRAILING_COMMA.sub(r"\1", text))
+    except json.JSONDecodeError:
+        pass
+    try:
+        return ast.literal_eval(text)
+    except (ValueError, SyntaxError, MemoryError, RecursionError):
+        return None
+
+
+class JsonArrayParser:
+    """
+    Incremental parser for one top-level JSON array arriving in pieces, e.g.
+    a streamed GPT answer. feed() returns the elements completed by each
+    piece, so they can be shown before the array is closed. Text before the
+    opening bracket (such as a ```json fence) and after the closing bracket
+    is ignored.
+    """
+
+    def __init__(self):
+        self.items = []
+        self.errors = 0
+        self.complete = False
+        self._depth = 0
+        self._in_string = False
+        self._escape = False
+        self._buffer = []
+
+    def _flush(self, new_items):
+        text = "".join(self._buffer).strip()
+        self._buffer = []
+        if not text:
+            return
+        item = repair_json_value(text)
+        if item is None:
+            self.errors += 1
+            return
+        self.items.append(item)
+        new_items.append(item)
+
+    def feed(self, text):
+        new_items = []
+        buffer = self._buffer
+        for ch in text:
+            if self.complete:
+                break
+            if self._depth == 0:
+                if ch == "[":
+                    self._depth = 1
+                continue
+            if self._in_string:
+                buffer.append(ch)
+                if self._escape:
+                    self._escape = False
+                elif ch == "\\":
+                    self._escape = True
+                elif ch == '"':
+                    self._in_string = False
+                continue
+            if ch == '"':
+                self._in_string = True
+                buffer.append(ch)
+            elif ch in "[{":
+                self._depth += 1
+                buffer.append(ch)
+            elif ch in "]}":
+                if self._depth == 1:
+                    self._flush(new_items)
+                    buffer = self._buffer
+                    self.complete = True
+                else:
+                    self._depth -= 1
+                    buffer.append(ch)
+            elif ch == "," and self._depth == 1:
+                self._flush(new_items)
+                buffer = self._buffer
+            else:
+                buffer.append(ch)
+        return new_items
@@ -0,0 +1,190 @@
+import contextlib
+import json
+import sqlite3
+import threading
+import time
+
+from utils.storage import content_hash, data_path
+from utils.titles import normalize_title
+
+# --- Profile steps kept per profession ---
+OBJECT_TYPES = "object_types"
+ACTIVITIES = "activities"
+OBJECTS = "objects"
+
+# --- Title scopes: which step has already looked at a title ---
+STEP3_SCOPE = "step3"
+
+# --- Label sources, in increasing order of trust ---
+SOURCE_PRIORITY = {"local": 0, "gpt": 1, "reviewed": 2}
+
+
+def profession_key(profession):
+    return (profession or "").strip().lower()
+
+
+def candidate_fingerprint(objects):
+    """Short hash of the confirmed objects a title could be labelled with; its stored label is redone when this changes."""
+    return content_hash(sorted(str(o["object"]) for o in objects))[:16]
+
+
+class LabelStore:
+    """
+    Local SQLite store of everything a participant confirmed: object types,
+    activities and objects per profession, which titles Step 3 has analysed,
+    and per-title enrichments keyed by profession and normalized title.
+    """
+
+    def __init__(self, path=None):
+        self.path = path or data_path("labels.sqlite3")
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS profiles (
+                    profession TEXT NOT NULL,
+                    step TEXT NOT NULL,
+                    data TEXT NOT NULL,
+                    updated REAL NOT NULL,
+                    PRIMARY KEY (profession, step)
+                )
+            """)
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS seen_titles (
+                    profession TEXT NOT NULL,
+                    scope TEXT NOT NULL,
+                    title_key TEXT NOT NULL,
+                    PRIMARY KEY (profession, scope, title_key)
+                )
+            """)
+            # Replaces the earlier title_labels table, whose labels were keyed by the whole confirmed configuration
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS profession_labels (
+                    profession TEXT NOT NULL,
+                    title_key TEXT NOT NULL,
+                    title TEXT NOT NULL,
+                    activities TEXT NOT NULL,
+                    objects TEXT NOT NULL,
+                    candidates TEXT NOT NULL,
+                    source TEXT NOT NULL,
+                    updated REAL NOT NULL,
+                    PRIMARY KEY (profession, title_key)
+                )
+            """)
+
+    @contextlib.contextmanager
+    def _connect(self):
+        # One connection per operation: committed (or rolled back) and then closed, which sqlite3's own
+        # context manager does not do
+        conn = sqlite3.connect(self.path, timeout=30)
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    # --- Profiles ---
+    def save_profile(self, profession, step, data):
+        with self._connect() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO profiles (profession, step, data, updated) VALUES (?, ?, ?, ?)",
+                (profession_key(profession), step, json.dumps(data, ensure_ascii=False), time.time())
+            )
+
+    def load_profile(self, profession, step):
+        with self._connect() as conn:
+            row = conn.execute(
+                "SELECT data, updated FROM profiles WHERE profession = ? AND step = ?",
+                (profession_key(profession), step)
+            ).fetchone()
+        return None if row is None else (json.loads(row[0]), row[1])
+
+    # --- Titles already analysed ---
+    def mark_seen(self, profession, scope, titles):
+        rows = {(profession_key(profession), scope, normalize_title(t)) for t in titles}
+        with self._connect() as conn:
+            conn.executemany("INSERT OR IGNORE INTO seen_titles VALUES (?, ?, ?)", rows)
+
+    def unseen(self, profession, scope, titles):
+        with self._connect() as conn:
+            seen = {
+                row[0] for row in conn.execute(
+                    "SELECT title_key FROM seen_titles WHERE profession = ? AND scope = ?",
+                    (profession_key(profession), scope)
+                )
+            }
+        return [t for t in titles if normalize_title(t) not in seen]
+
+    # --- Per-title enrichments ---
+    def save_labels(self, profession, items, source, candidates=None):
+        """
+        Save title labels; candidates optionally maps titles to the
+        candidate_fingerprint of the objects they were labelled with.
+        """
+        now = time.time()
+        candidates = candidates or {}
+        key = profession_key(profession)
+        rows = [
+            (key, normalize_title(item["title"]), item["title"],
+             json.dumps(item.get("activities") or [], ensure_ascii=False),
+             json.dumps(item.get("objects") or [], ensure_ascii=False),
+             candidates.get(item["title"], ""), source, now)
+            for item in items if item.get("title")
+        ]
+        with self._connect() as conn:
+            existing = {
+                title_key: (source, fingerprint) for title_key, source, fingerprint in conn.execute(
+                    "SELECT title_key, source, candidates FROM profession_labels WHERE profession = ?", (key,)
+                )
+            }
+            # Never let a less trusted source overwrite, e.g. a local prediction replacing a reviewed label,
+            # unless the stored label was made with other candidate objects
+            rows = [
+                r for r in rows
+                if r[1] not in existing
+                or existing[r[1]][1] != r[5]
+                or SOURCE_PRIORITY[source] >= SOURCE_PRIORITY.get(existing[r[1]][0], -1)
+            ]
+            conn.executemany("INSERT OR REPLACE INTO profession_labels VALUES (?, ?, ?, ?, ?, ?, ?, ?)", rows)
+
+    def load_labels(self, profession, titles, activities=None, objects=None, candidates=None):
+        """
+        Stored labels for the given titles (matched on normalized title), as
+        {title: item}. Activities and objects that are no longer confirmed are
+        dropped; with candidates (title -> candidate_fingerprint), titles whose
+        candidate objects changed are left out so they are labelled again.
+        """
+        wanted = {}
+        for title in titles:
+            wanted.setdefault(normalize_title(title), []).append(title)
+        known_activities = None if activities is None else set(activities)
+        known_objects = None if objects is None else set(objects)
+        found = {}
+        with self._connect() as conn:
+            for title_key, stored_activities, stored_objects, fingerprint, source in conn.execute(
+                "SELECT title_key, activities, objects, candidates, source FROM profession_labels WHERE profession = ?",
+                (profession_key(profession),)
+            ):
+                for title in wanted.get(title_key, []):
+                    if candidates is not None and candidates.get(title) != fingerprint:
+                        continue
+                    stored_activities = json.loads(stored_activities) if isinstance(stored_activities, str) else stored_activities
+                    stored_objects = json.loads(stored_objects) if isinstance(stored_objects, str) else stored_objects
+                    found[title] = {
+                        "title": title,
+                        "activities": [a for a in stored_activities if known_activities is None or a in known_activities],
+                        "objects": [o for o in stored_objects if known_objects is None or o in known_objects],
+                        "source": source
+                    }
+        return found
+
+
+_store = None
+_store_lock = threading.Lock()
+
+
+def get_label_store():
+    global _store
+    with _store_lock:
+        if _store is None:
+            _store = LabelStore()
+        return _store
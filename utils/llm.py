@@ -0,0 +1,171 @@
+import time
+
+from utils.enrichment import estimate_tokens
+from utils.json_stream import JsonArrayParser, PartialJSONArray
+from utils.llm_cache import completion_key, get_cache
+from utils.scheduler import get_scheduler, INTERACTIVE, DEFAULT_COMPLETION_TOKENS
+
+DEFAULT_MODEL = "gpt-4.1"
+DEFAULT_TEMPERATURE = 0.7
+
+
+def _reserved_tokens(messages):
+    return sum(estimate_tokens(m["content"]) for m in messages) + DEFAULT_COMPLETION_TOKENS
+
+
+def _request_options(response_format):
+    return {} if response_format is None else {"response_format": response_format}
+
+
+def chat_completion(api_key, messages, model=DEFAULT_MODEL, temperature=DEFAULT_TEMPERATURE, use_cache=True,
+                    metrics=None, step=None, batch=None, priority=INTERACTIVE, response_format=None):
+    """
+    Return the text of a chat completion, served from the shared disk cache when possible.
+    Requests go through the shared scheduler (rate limits, retries, priority).
+    With metrics (an LLMMetrics), the call's wall time, token usage, retries and cache hit are recorded under step and batch.
+    response_format (see utils.responses) asks for output matching a JSON schema.
+    """
+    start = time.perf_counter()
+    cache = get_cache()
+    key = completion_key(model, messages, temperature, response_format)
+    if use_cache:
+        cached = cache.get(key)
+        if cached is not None:
+            if metrics is not None:
+                metrics.record(step, batch, model, time.perf_counter() - start, cache_hit=True)
+            return cached
+
+    scheduler = get_scheduler()
+    reserved = _reserved_tokens(messages)
+    try:
+        raw, retries = scheduler.call(
+            api_key,
+            lambda client: client.chat.completions.with_raw_response.create(
+                model=model,
+                messages=messages,
+                temperature=temperature,
+                **_request_options(response_format)
+            ),
+            reserved,
+            priority
+        )
+        response = raw.parse()
+    except Exception as e:
+        if metrics is not None:
+            metrics.record(step, batch, model, time.perf_counter() - start, error=type(e).__name__)
+        raise
+    output = response.choices[0].message.content
+    cache.put(key, model, output)
+    usage = response.usage
+    if usage:
+        scheduler.settle(api_key, reserved, usage.total_tokens)
+    if metrics is not None:
+        metrics.record(
+            step, batch, model, time.perf_counter() - start,
+            prompt_tokens=usage.prompt_tokens if usage else 0,
+            completion_tokens=usage.completion_tokens if usage else 0,
+            retries=retries
+        )
+    return output
+
+
+def stream_chat_completion(api_key, messages, model=DEFAULT_MODEL, temperature=DEFAULT_TEMPERATURE, use_cache=True,
+                           metrics=None, step=None, batch=None, priority=INTERACTIVE, response_format=None):
+    """
+    Like chat_completion, but yields the text as it is generated. A cached
+    output is yielded in one piece; a new one is cached only once complete.
+    """
+    start = time.perf_counter()
+    cache = get_cache()
+    key = completion_key(model, messages, temperature, response_format)
+    if use_cache:
+        cached = cache.get(key)
+        if cached is not None:
+            if metrics is not None:
+                elapsed = time.perf_counter() - start
+                metrics.record(step, batch, model, elapsed, cache_hit=True, first_token_seconds=elapsed)
+            yield cached
+            return
+
+    scheduler = get_scheduler()
+    reserved = _reserved_tokens(messages)
+    parts = []
+    usage = None
+    first_token = None
+    finished = False
+    retries = 0
+    try:
+        # Only opening the stream is retried; an answer cut off halfway is reported to the caller
+        raw, retries = scheduler.call(
+            api_key,
+            lambda client: client.chat.completions.with_raw_response.create(
+                model=model,
+                messages=messages,
+                temperature=temperature,
+                stream=True,
+                stream_options={"include_usage": True},
+                **_request_options(response_format)
+            ),
+            reserved,
+            priority
+        )
+        for chunk in raw.parse():
+            if chunk.usage is not None:
+                usage = chunk.usage
+            delta = chunk.choices[0].delta.content if chunk.choices else None
+            if delta:
+                if first_token is None:
+                    first_token = time.perf_counter() - start
+                parts.append(delta)
+                yield delta
+            if chunk.choices and chunk.choices[0].finish_reason:
+                finished = True
+        if not finished:
+            raise ConnectionError("the GPT stream ended before the answer was complete")
+    except Exception as e:
+        if metrics is not None:
+            metrics.record(step, batch, model, time.perf_counter() - start, retries=retries,
+                           first_token_seconds=first_token, error=type(e).__name__)
+        raise
+    cache.put(key, model, "".join(parts))
+    if usage:
+        scheduler.settle(api_key, reserved, usage.total_tokens)
+    if metrics is not None:
+        metrics.record(
+            step, batch, model, time.perf_counter() - start,
+            prompt_tokens=usage.prompt_tokens if usage else 0,
+            completion_tokens=usage.completion_tokens if usage else 0,
+            retries=retries,
+            first_token_seconds=first_token
+        )
+
+
+def stream_json_array(api_key, messages, on_item=None, model=DEFAULT_MODEL, temperature=DEFAULT_TEMPERATURE,
+                      metrics=None, step=None, batch=None, priority=INTERACTIVE, response_format=None):
+    """
+    Stream a completion that answers with a JSON array (optionally wrapped as
+    {"items": [...]}) and call on_item(item) for every element as soon as it
+    is complete. Slightly malformed elements are repaired or skipped. Returns
+    all elements; raises PartialJSONArray (carrying the elements received)
+    when the connection drops or the array is cut off.
+    """
+    parser = JsonArrayParser()
+    try:
+        for delta in stream_chat_completion(
+            api_key, messages, model, temperature, metrics=metrics, step=step, batch=batch, priority=priority,
+            response_format=response_format
+        ):
+            for item in parser.feed(delta):
+                if on_item is not None:
+                    on_item(item)
+    except Exception as e:
+        raise PartialJSONArray(parser.items, f"GPT stream interrupted: {e}") from e
+    if not parser.complete:
+        discard_completion(messages, model, temperature, response_format)
+        raise PartialJSONArray(parser.items, "GPT output was not a complete JSON array")
+    return parser.items
+
+
+def discard_completion(messages, model=DEFAULT_MODEL, temperature=DEFAULT_TEMPERATURE, response_format=None):
+    # Drop an output that could not be parsed, so that regenerating actually calls GPT again
+    get_cache().discard(completion_key(model, messages, temperature, response_format))
@@ -0,0 +1,126 @@
+import contextlib
+import os
+import sqlite3
+import threading
+import time
+
+from utils.storage import content_hash, data_path
+
+# --- Limits (override through the environment) ---
+MAX_CACHE_MB = float(os.environ.get("EXOAR_LLM_CACHE_MAX_MB", "200"))
+MAX_CACHE_AGE_DAYS = float(os.environ.get("EXOAR_LLM_CACHE_MAX_AGE_DAYS", "30"))
+EVICT_EVERY_N_WRITES = 50
+
+
+def completion_key(model, messages, temperature, response_format=None):
+    # The credential is deliberately not part of the key: identical prompts share one entry
+    request = {"model": model, "messages": messages, "temperature": temperature}
+    if response_format is not None:
+        request["response_format"] = response_format  # keeps keys of free-form requests unchanged
+    return content_hash(request)
+
+
+class LLMCache:
+    """
+    On-disk cache of chat completions, shared by every Streamlit session and
+    worker on this machine. Entries are evicted by age and by total size
+    (least recently used first).
+    """
+
+    def __init__(self, path=None, max_bytes=MAX_CACHE_MB * 1024 * 1024, max_age_seconds=MAX_CACHE_AGE_DAYS * 86400):
+        self.path = path or data_path("llm_cache.sqlite3")
+        self.max_bytes = max_bytes
+        self.max_age_seconds = max_age_seconds
+        self.hits = 0
+        self.misses = 0
+        self._writes = 0
+        self._lock = threading.Lock()
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS completions (
+                    key TEXT PRIMARY KEY,
+                    model TEXT NOT NULL,
+                    response TEXT NOT NULL,
+                    size INTEGER NOT NULL,
+                    created REAL NOT NULL,
+                    accessed REAL NOT NULL
+                )
+            """)
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_completions_accessed ON completions (accessed)")
+        self.evict()
+
+    @contextlib.contextmanager
+    def _connect(self):
+        # One connection per operation: committed (or rolled back) and then closed, which sqlite3's own
+        # context manager does not do
+        conn = sqlite3.connect(self.path, timeout=30)
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    def get(self, key):
+        now = time.time()
+        with self._connect() as conn:
+            row = conn.execute(
+                "SELECT response FROM completions WHERE key = ? AND created >= ?",
+                (key, now - self.max_age_seconds)
+            ).fetchone()
+            if row is not None:
+                conn.execute("UPDATE completions SET accessed = ? WHERE key = ?", (now, key))
+        with self._lock:
+            if row is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+        return None if row is None else row[0]
+
+    def put(self, key, model, response):
+        now = time.time()
+        with self._connect() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO completions (key, model, response, size, created, accessed) VALUES (?, ?, ?, ?, ?, ?)",
+                (key, model, response, len(response.encode("utf-8")), now, now)
+            )
+        with self._lock:
+            self._writes += 1
+            should_evict = self._writes % EVICT_EVERY_N_WRITES == 0
+        if should_evict:
+            self.evict()
+
+    def discard(self, key):
+        with self._connect() as conn:
+            conn.execute("DELETE FROM completions WHERE key = ?", (key,))
+
+    def evict(self):
+        with self._connect() as conn:
+            conn.execute("DELETE FROM completions WHERE created < ?", (time.time() - self.max_age_seconds,))
+            total = conn.execute("SELECT COALESCE(SUM(size), 0) FROM completions").fetchone()[0]
+            if total <= self.max_bytes:
+                return
+            stale = []
+            for key, size in conn.execute("SELECT key, size FROM completions ORDER BY accessed ASC"):
+                if total <= self.max_bytes:
+                    break
+                stale.append((key,))
+                total -= size
+            conn.executemany("DELETE FROM completions WHERE key = ?", stale)
+
+    def stats(self):
+        with self._connect() as conn:
+            entries, size = conn.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM completions").fetchone()
+        return {"hits": self.hits, "misses": self.misses, "entries": entries, "bytes": size}
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_cache():
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            _cache = LLMCache()
+        return _cache
@@ -0,0 +1,113 @@
+from collections import deque
+
+
+def _is_word_char(ch):
+    return ch.isalnum() or ch == "_"
+
+
+def _lower_same_length(text):
+    # str.lower() can lengthen a string ("İ" becomes "i" plus a combining dot), which would shift every offset
+    # after it; lowercasing one character at a time and keeping the first code point keeps them aligned
+    if text.isascii():
+        return text.lower()
+    return "".join(ch.lower()[0] for ch in text)
+
+
+class ObjectMatcher:
+    """
+    Aho-Corasick automaton over object names. Built once, it finds every
+    object occurring in a title in a single left-to-right pass, however many
+    objects there are.
+
+    Patterns are referred to by their position in the list given to the
+    constructor, so callers can keep "first object in list order" semantics.
+    """
+
+    def __init__(self, patterns, case_insensitive=False, word_boundary=False):
+        self.patterns = list(patterns)
+        self.case_insensitive = case_insensitive
+        self.word_boundary = word_boundary
+
+        # Node 0 is the root; every node has transitions, a failure link and output pattern indices
+        self._goto = [{}]
+        self._fail = [0]
+        self._out = [[]]
+        self._lengths = []
+
+        for index, pattern in enumerate(self.patterns):
+            key = self._prepare(pattern or "")
+            self._lengths.append(len(key))
+            if key:
+                self._add(key, index)
+        self._build_failure_links()
+
+    def _prepare(self, text):
+        return _lower_same_length(text) if self.case_insensitive else text
+
+    def _add(self, key, index):
+        node = 0
+        for ch in key:
+            nxt = self._goto[node].get(ch)
+            if nxt is None:
+                nxt = len(self._goto)
+                self._goto[node][ch] = nxt
+                self._goto.append({})
+                self._fail.append(0)
+                self._out.append([])
+            node = nxt
+        self._out[node].append(index)
+
+    def _build_failure_links(self):
+        queue = deque(self._goto[0].values())
+        while queue:
+            node = queue.popleft()
+            for ch, child in self._goto[node].items():
+                queue.append(child)
+                fallback = self._fail[node]
+                while fallback and ch not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                target = self._goto[fallback].get(ch, 0)
+                self._fail[child] = target if target != child else 0
+                self._out[child] = self._out[child] + self._out[self._fail[child]]
+
+    def find_all(self, text):
+        """Return (start, end, pattern_index) for every occurrence in text."""
+        if not text:
+            return []
+        haystack = self._prepare(text)
+        matches = []
+        node = 0
+        for pos, ch in enumerate(haystack):
+            while node and ch not in self._goto[node]:
+                node = self._fail[node]
+            node = self._goto[node].get(ch, 0)
+            for index in self._out[node]:
+                end = pos + 1
+                start = end - self._lengths[index]
+                if self.word_boundary and not self._at_boundary(haystack, start, end):
+                    continue
+                matches.append((start, end, index))
+        return matches
+
+    @staticmethod
+    def _at_boundary(text, start, end):
+        before_ok = start == 0 or not (_is_word_char(text[start - 1]) and _is_word_char(text[start]))
+        after_ok = end == len(text) or not (_is_word_char(text[end - 1]) and _is_word_char(text[end]))
+        return before_ok and after_ok
+
+    def matched_indices(self, text):
+        return sorted({index for _, _, index in self.find_all(text)})
+
+    def first_match(self, text):
+        """Index of the earliest pattern (in constructor order) found in text, or None."""
+        indices = self.matched_indices(text)
+        return indices[0] if indices else None
+
+    def match_titles(self, titles):
+        """Match each distinct title once; returns {title: [pattern indices]} for titles with matches."""
+        result = {}
+        for title in set(titles):
+            indices = self.matched_indices(title)
+            if indices:
+                result[title] = indices
+        return result
@@ -0,0 +1,84 @@
+import threading
+import time
+
+# --- Prices in USD per million tokens (input, output), for cost estimates only ---
+MODEL_PRICES = {
+    "gpt-4.1": (2.00, 8.00),
+    "gpt-4.1-mini": (0.40, 1.60),
+    "gpt-4.1-nano": (0.10, 0.40),
+    "gpt-4o": (2.50, 10.00),
+    "gpt-4o-mini": (0.15, 0.60),
+}
+TOTAL_FIELDS = ["calls", "cache_hits", "errors", "retries", "seconds", "prompt_tokens", "completion_tokens", "cost_usd"]
+
+
+def estimate_cost(model, prompt_tokens, completion_tokens):
+    input_price, output_price = MODEL_PRICES.get(model, (0.0, 0.0))
+    return (prompt_tokens * input_price + completion_tokens * output_price) / 1_000_000
+
+
+def _totals(calls):
+    totals = dict.fromkeys(TOTAL_FIELDS, 0)
+    for call in calls:
+        totals["calls"] += 1
+        totals["cache_hits"] += call["cache_hit"]
+        totals["errors"] += call["error"] is not None
+        totals["retries"] += call["retries"]
+        totals["seconds"] += call["seconds"]
+        totals["prompt_tokens"] += call["prompt_tokens"]
+        totals["completion_tokens"] += call["completion_tokens"]
+        totals["cost_usd"] += call["cost_usd"]
+    totals["seconds"] = round(totals["seconds"], 3)
+    totals["cost_usd"] = round(totals["cost_usd"], 6)
+    return totals
+
+
+class LLMMetrics:
+    """
+    Thread-safe log of completion calls: wall time, token usage, retries,
+    cache hits, model and estimated cost, tagged with the step and batch that
+    made the call. Worker threads record into it directly.
+    """
+
+    def __init__(self):
+        self._calls = []
+        self._lock = threading.Lock()
+
+    def record(self, step, batch, model, seconds, prompt_tokens=0, completion_tokens=0, retries=0,
+               cache_hit=False, first_token_seconds=None, error=None):
+        call = {
+            "step": step,
+            "batch": batch,
+            "model": model,
+            "started": round(time.time() - seconds, 3),
+            "seconds": round(seconds, 4),
+            "first_token_seconds": None if first_token_seconds is None else round(first_token_seconds, 4),
+            "prompt_tokens": prompt_tokens,
+            "completion_tokens": completion_tokens,
+            "retries": retries,
+            "cache_hit": cache_hit,
+            "cost_usd": round(estimate_cost(model, prompt_tokens, completion_tokens), 6),
+            "error": error
+        }
+        with self._lock:
+            self._calls.append(call)
+
+    def calls(self, step=None):
+        with self._lock:
+            return [c for c in self._calls if step is None or c["step"] == step]
+
+    def totals(self, step=None):
+        return _totals(self.calls(step))
+
+    def summary(self):
+        """Export form: overall and per-step totals plus every call, in call order."""
+        calls = self.calls()
+        steps = {}
+        for call in calls:
+            steps.setdefault(call["step"], []).append(call)
+        return {
+            "totals": _totals(calls),
+            "steps": {step: _totals(step_calls) for step, step_calls in steps.items()},
+            "model_prices_usd_per_million_tokens": {m: list(p) for m, p in MODEL_PRICES.items()},
+            "calls": calls
+        }
@@ -0,0 +1,216 @@
+import re
+from collections import Counter
+
+import pandas as pd
+
+_WHITESPACE = re.compile(r"\s+")
+
+# --- Step 3 sharding ---
+DEFAULT_TITLES_PER_CHUNK = 100
+
+
+def object_key(name):
+    return _WHITESPACE.sub(" ", str(name)).strip().casefold()
+
+
+# --- Aliases: other spellings of an object, kept as one editable string in the Step 3 table ---
+ALIAS_SEPARATOR = " | "
+
+
+def split_aliases(value):
+    if isinstance(value, str):
+        return [a.strip() for a in value.split(ALIAS_SEPARATOR.strip()) if a.strip()]
+    if isinstance(value, (list, tuple)):
+        return [str(a).strip() for a in value if str(a).strip()]
+    return []
+
+
+def join_aliases(aliases):
+    return ALIAS_SEPARATOR.join(aliases)
+
+
+def object_records(objects_df):
+    """Confirmed objects as records, with their aliases as a list (left out when there are none)."""
+    records = []
+    for record in objects_df.to_dict(orient="records"):
+        aliases = split_aliases(record.pop("aliases", None))
+        if aliases:
+            record["aliases"] = aliases
+        records.append(record)
+    return records
+
+
+def merge_object_lists(object_lists):
+    """
+    Reduce per-chunk GPT object lists to one deduplicated list.
+
+    Objects are matched case- and whitespace-insensitively; the first spelling
+    seen is kept and the object type is the one most chunks agreed on (ties go
+    to the type seen first). Aliases of saved objects are kept.
+    """
+    names = {}
+    types = {}
+    aliases = {}
+    for objects in object_lists:
+        for item in objects or []:
+            if not isinstance(item, dict) or item.get("object") is None:
+                continue
+            # GPT sometimes returns a bare number (a year, a course code) as the object name
+            name = str(item["object"]).strip()
+            if not name:
+                continue
+            key = object_key(name)
+            names.setdefault(key, name)
+            types.setdefault(key, Counter())
+            if item.get("object_type"):
+                types[key][item["object_type"]] += 1
+            for alias in split_aliases(item.get("aliases")):
+                aliases.setdefault(key, {})[alias] = None
+    merged = []
+    for key, name in names.items():
+        most_common = types[key].most_common(1)
+        record = {"object": name, "object_type": most_common[0][0] if most_common else None}
+        if key in aliases:
+            record["aliases"] = list(aliases[key])
+        merged.append(record)
+    return merged
+
+
+# --- Local candidate extraction (before Step 3 asks GPT) ---
+# Regular object forms found with patterns; the kind decides the object type when the name does not
+_FILE_EXTENSIONS = "pdf|docx?|xlsx?|pptx?|odt|tex|bib|ipynb|csv"
+LOCAL_PATTERNS = {
+    # "Lastname, X.Y. (First)", also "Stein Dani, V. (Vinicius)" and "van der Aalst, W.M.P. (Wil)"
+    "person": r"(?P<object>(?:[a-z]{1,3} ){0,3}[A-Z][\w'’\-]+(?: [A-Z][\w'’\-]+)?, (?:[A-Z]\.){1,4} ?\([A-Z][\w'’\-]+\))",
+    # "Academische Vaardigheden (INFOAVA)" or a bare "(INFOAVA)"
+    "course": r"(?P<object>(?:[A-Z0-9][\w&'’]*(?: [\w&'’\-]+){0,6} )?\([A-Z]{3,}[A-Z0-9]*\))",
+    # "ICPM 2025", "CoopIS 2024", "WI25"; only kept for a known venue or in a title about a venue (see VENUE_CONTEXT)
+    "conference": r"(?P<object>\b(?P<acronym>[A-Z][A-Za-z]*[A-Z][A-Za-z]*)(?: ?(?:19|20)\d{2}|\d{2})\b)",
+    # "Thesis draft de Boer v7.docx - Word" -> "Thesis draft de Boer v7", a whole title segment without unsaved/unread markers
+    "file": rf"(?:^[*\s]*(?:\(\d+\)\s*)?|[|:–—]\s*|\s-\s)(?P<object>[^\s|:*?\"<>/\\][^|:*?\"<>/\\]*?)\.(?:{_FILE_EXTENSIONS})\b",
+}
+# Acronym plus year is common outside conferences ("COVID19", "PDF 2024"), so one of these must hold as well
+KNOWN_VENUES = {
+    "bpm", "icpm", "caise", "coopis", "edoc", "er", "poem", "bpmds", "emmsad", "rcis", "icis", "ecis", "hicss",
+    "amcis", "pacis", "wi", "icse", "fse", "ase", "chi", "cscw", "kdd", "icde", "vldb", "sigmod", "aaai", "ijcai",
+    "neurips", "icml", "acl", "emnlp", "www", "sigir", "recsys", "icsoc", "models",
+}
+VENUE_CONTEXT = re.compile(
+    r"\b(?:conference|conf|workshop|symposium|proceedings|track|call for papers|cfp|camera[- ]ready|submission|"
+    r"rebuttal|registration|keynote|program committee|pc meeting|easychair|openreview)\b",
+    re.IGNORECASE
+)
+KIND_TYPE_HINTS = {
+    "person": ("colleague", "student", "person", "people", "contact", "staff", "supervisor", "participant", "client"),
+    "course": ("course", "class", "module", "lecture", "subject"),
+    "conference": ("conference", "workshop", "venue", "event"),
+    "file": ("document", "file", "publication", "paper", "report", "assignment", "thesis"),
+}
+# Words that may be left over in a title without it hiding another object: reply markers and application names
+_FILLER_WORDS = {
+    "re", "fw", "fwd", "aw", "wg", "microsoft", "word", "excel", "powerpoint", "outlook", "onenote", "teams", "zoom",
+    "slack", "google", "chrome", "mozilla", "firefox", "edge", "safari", "adobe", "acrobat", "reader", "notepad",
+    "visual", "studio", "code", "explorer", *_FILE_EXTENSIONS.replace("?", "").split("|"), "doc", "xls", "ppt",
+}
+_WORD = re.compile(r"[^\W_]+")
+MIN_PHRASE_TITLES = 2  # a mined phrase must occur in at least this many titles
+MAX_PHRASE_WORDS = 4
+
+
+def _singular(object_type):
+    word = str(object_type).replace("_", " ").strip().casefold()
+    if word.endswith("ies"):
+        return word[:-3] + "y"
+    if word.endswith(("sses", "ches", "shes", "xes")):
+        return word[:-2]
+    return word[:-1] if word.endswith("s") and not word.endswith("ss") else word
+
+
+def _type_word(object_type):
+    # Regex for a type's name in singular or plural form: "research_projects" matches "Research project"
+    return re.escape(_singular(object_type)).replace(r"\ ", r"[\s_]") + r"(?:e?s)?"
+
+
+def _type_for(name, kind, object_types):
+    # A type named in the object itself wins ("BPM Exam" -> exams), then the first type matching the kind's hints
+    for object_type in object_types:
+        if re.search(rf"\b{_type_word(object_type)}\b", name, re.IGNORECASE):
+            return object_type
+    for hint in KIND_TYPE_HINTS.get(kind, ()):
+        for object_type in object_types:
+            if hint in str(object_type).casefold():
+                return object_type
+    return None
+
+
+def _leftover_names(title, names):
+    # Words outside the matched objects that could name another object: capitalised, acronyms, or with digits
+    for name in sorted(names, key=len, reverse=True):
+        title = title.replace(name, " ")
+    return [
+        word for word in _WORD.findall(title)
+        if word.casefold() not in _FILLER_WORDS and any(ch.isupper() or ch.isdigit() for ch in word)
+    ]
+
+
+def extract_local_objects(titles, object_types):
+    """
+    Find regularly formed objects in titles without GPT: pattern matches
+    (person names, parenthesised course codes, conference acronyms with
+    years, file names) plus phrases naming a confirmed object type, such as
+    "BPM Exam", that occur in several titles. Every match is typed from the
+    confirmed object types; untypeable ones are dropped.
+
+    Returns (objects, explained) where objects are {"object", "object_type"}
+    dicts, most frequent first, and explained is the set of titles they fully
+    cover: apart from them, only lowercase words, reply markers and
+    application names. Other titles with local objects still go to GPT,
+    with those objects listed as known.
+    """
+    object_types = list(object_types or [])
+    series = pd.Series(list(titles), dtype=object).dropna().astype(str).drop_duplicates().reset_index(drop=True)
+    if series.empty or not object_types:
+        return [], set()
+
+    found = []
+    for kind, pattern in LOCAL_PATTERNS.items():
+        extracted = series.str.extractall(pattern).dropna(subset=["object"])
+        if kind == "conference":
+            in_context = series.str.contains(VENUE_CONTEXT)
+            known = extracted["acronym"].str.casefold().isin(KNOWN_VENUES)
+            extracted = extracted[known.values | in_context.loc[extracted.index.get_level_values(0)].values]
+        matches = extracted["object"].str.strip()
+        found.append(pd.DataFrame({"title": matches.index.get_level_values(0), "object": matches.values, "kind": kind, "support": 1}))
+
+    # Frequency mining: short capitalised phrases ending in a confirmed type's name, kept when several titles share them
+    for object_type in object_types:
+        phrase = rf"(?P<object>\b(?:[A-Z0-9][\w'’]*\s){{1,{MAX_PHRASE_WORDS - 1}}}(?i:{_type_word(object_type)}))\b"
+        matches = series.str.extractall(phrase)["object"].dropna().str.strip()
+        found.append(pd.DataFrame({
+            "title": matches.index.get_level_values(0), "object": matches.values, "kind": "phrase", "support": MIN_PHRASE_TITLES
+        }))
+
+    candidates = pd.concat(found, ignore_index=True)
+    candidates = candidates[(candidates["object"].str.len() > 2) & candidates["object"].str.contains(r"[^\W\d_]")]
+    if candidates.empty:
+        return [], set()
+    candidates["key"] = candidates["object"].map(object_key)
+    titles_per_key = candidates.groupby("key")["title"].nunique()
+    candidates = candidates[candidates["key"].map(titles_per_key) >= candidates["support"]]
+
+    objects = []
+    kept = set()
+    type_names = {object_key(t) for t in object_types}
+    first = candidates.drop_duplicates("key").set_index("key")
+    for key in titles_per_key.loc[titles_per_key.index.isin(first.index)].sort_values(ascending=False, kind="stable").index:
+        row = first.loc[key]
+        if key in type_names:
+            continue  # an object must not just repeat its type's name
+        object_type = _type_for(row["object"], row["kind"], object_types)
+        if object_type is None:
+            continue
+        objects.append({"object": row["object"], "object_type": object_type})
+        kept.add(key)
+    names_per_title = candidates[candidates["key"].isin(kept)].groupby("title")["object"].agg(list)
+    explained = {series[i] for i, names in names_per_title.items() if not _leftover_names(series[i], names)}
+    return objects, explained
@@ -0,0 +1,197 @@
+import math
+import re
+from collections import Counter
+
+from utils.objects import object_key, split_aliases
+
+TOKEN_THRESHOLD = 0.8    # token Jaccard similarity for merging otherwise unrelated names
+MAX_BLOCK_SIZE = 200     # larger similarity blocks are too generic to compare pairwise
+
+_PERSON_FORMAL = re.compile(r"^(?P<last>[^,()]+?),\s*(?P<initials>(?:[A-Z]\.\s?)+)\s*(?:\((?P<first>[^()]+)\))?$")
+_PERSON_PLAIN = re.compile(r"^(?P<first>[A-Z][a-z'’\-]+)\s+(?P<last>(?:[a-z]{1,3}\s+){0,3}[A-Z][\w'’\-]+(?:\s+[A-Z][\w'’\-]+)?)$")
+_CODE = re.compile(r"\b[A-Z][A-Z0-9]{2,}\b")
+_NAMED_CODE = re.compile(r"^([A-Z][A-Z0-9]{2,})\b|\(([A-Z][A-Z0-9]{2,})\)")  # a leading or parenthesised code
+_WORD = re.compile(r"[^\W_]+")
+_YEAR = re.compile(r"^(?:19|20)?\d{2}$")
+
+
+# --- Name features ---
+class _Name:
+    __slots__ = ("name", "object_type", "key", "person", "codes", "named_codes", "only_code", "tokens", "words", "years", "acronym")
+
+    def __init__(self, name, object_type):
+        self.name = name
+        self.object_type = object_type
+        self.key = object_key(name)
+        self.person = _person(name)
+        self.codes = set(_CODE.findall(name))
+        self.named_codes = {a or b for a, b in _NAMED_CODE.findall(name.strip())}
+        words = _WORD.findall(name)
+        self.only_code = len(self.codes) == 1 and all(w in self.codes or _YEAR.match(w) for w in words)
+        self.tokens = {w.casefold() for w in words}
+        self.words = {t for t in self.tokens if not _YEAR.match(t)}
+        self.years = self.tokens - self.words
+        initials = [w[0] for w in words if not w.isdigit() and w.casefold() not in _SMALL_WORDS]
+        self.acronym = "".join(initials).upper() if len(initials) >= 3 else None
+
+
+_SMALL_WORDS = {"of", "and", "the", "for", "on", "in", "de", "van", "der", "en", "voor"}
+
+
+def _person(name):
+    # (first name or initial, last name), from "Lastname, X.Y. (First)" or "First Lastname"
+    match = _PERSON_FORMAL.match(name.strip())
+    if match:
+        first = (match.group("first") or match.group("initials")[0]).strip()
+        return first.casefold(), match.group("last").strip().casefold()
+    match = _PERSON_PLAIN.match(name.strip())
+    if match:
+        return match.group("first").casefold(), match.group("last").casefold()
+    return None
+
+
+def _same_person(a, b):
+    (first_a, last_a), (first_b, last_b) = a, b
+    if last_a != last_b:
+        return False
+    # A bare initial matches any first name starting with it
+    return first_a == first_b or (len(first_a) == 1 and first_b.startswith(first_a)) or (len(first_b) == 1 and first_a.startswith(first_b))
+
+
+def _similar(a, b):
+    if a.key == b.key:
+        return True
+    if a.person and b.person:
+        return _same_person(a.person, b.person)
+    if a.object_type != b.object_type:
+        return False
+    if a.years and b.years and a.years != b.years:
+        return False  # "CoopIS 2024" and "CoopIS 2025" are different editions
+    # "INFOBPM" and "BPM Course 2024 - 2025 (INFOBPM)"; "BPM" and "Business Process Management"
+    if (a.only_code and a.codes <= b.named_codes) or (b.only_code and b.codes <= a.named_codes):
+        return True
+    if (a.only_code and a.codes == {b.acronym}) or (b.only_code and b.codes == {a.acronym}):
+        return True
+    # "Process Mining Camp" and "Process Mining Camp 2025"
+    if len(a.words) >= 2 and a.words == b.words:
+        return True
+    union = len(a.tokens | b.tokens)
+    return bool(union) and len(a.tokens & b.tokens) / union >= TOKEN_THRESHOLD
+
+
+def _block_keys(entry, token_rank):
+    keys = [("exact", entry.key)]
+    if entry.person:
+        keys.append(("person", entry.person[0][:1] + " " + entry.person[1]))
+    for code in entry.codes:
+        keys.append(("code", code))
+    if entry.acronym:
+        keys.append(("code", entry.acronym))
+    if len(entry.words) >= 2:
+        keys.append(("words", " ".join(sorted(entry.words))))
+    # Prefix filtering: names with Jaccard >= TOKEN_THRESHOLD share one of their rarest few tokens
+    ordered = sorted(entry.tokens, key=lambda t: (token_rank[t], t))
+    prefix = len(ordered) - math.ceil(TOKEN_THRESHOLD * len(ordered)) + 1
+    keys.extend(("token", t) for t in ordered[:prefix])
+    return keys
+
+
+class _UnionFind:
+    def __init__(self, size):
+        self.parent = list(range(size))
+
+    def find(self, i):
+        while self.parent[i] != i:
+            self.parent[i] = self.parent[self.parent[i]]
+            i = self.parent[i]
+        return i
+
+    def union(self, i, j):
+        i, j = self.find(i), self.find(j)
+        if i != j:
+            self.parent[max(i, j)] = min(i, j)
+
+
+def resolve_objects(objects):
+    """
+    Group duplicate objects, e.g. "Beerepoot, I.M. (Iris)" and "Iris
+    Beerepoot", or "INFOBPM" and "BPM Course 2024 - 2025 (INFOBPM)".
+
+    Names are only compared within blocks that share a key (normalized name,
+    person name, code or acronym, words without years, or one of their rarest
+    tokens), so the work grows with the number of objects, not its square.
+
+    Returns (resolved, clusters): every object once, in first-seen order, as
+    {"object", "object_type", "aliases"} with the canonical name (the most
+    frequent, then the longest spelling) and the other spellings as aliases;
+    and only the clusters that merged several names.
+    """
+    names = {}
+    counts = Counter()
+    aliases_in = {}
+    for item in objects:
+        name = str(item.get("object") or "").strip()
+        if not name:
+            continue
+        counts[name] += 1
+        if name not in names:
+            object_type = item.get("object_type")
+            names[name] = _Name(name, object_type if isinstance(object_type, str) else None)
+            aliases_in[name] = []
+        aliases_in[name].extend(split_aliases(item.get("aliases")))
+    entries = list(names.values())
+
+    token_frequency = Counter(t for entry in entries for t in entry.tokens)
+    token_rank = {t: n for t, n in token_frequency.items()}
+    blocks = {}
+    for i, entry in enumerate(entries):
+        for key in _block_keys(entry, token_rank):
+            blocks.setdefault(key, []).append(i)
+
+    union = _UnionFind(len(entries))
+    # Years of each cluster: a year-free name may join one edition, but must not chain two editions together
+    editions = [{frozenset(entry.years)} if entry.years else set() for entry in entries]
+
+    def merge(i, j):
+        root_i, root_j = union.find(i), union.find(j)
+        union.union(root_i, root_j)
+        editions[union.find(i)] = editions[root_i] | editions[root_j]
+
+    for (kind, _), members in blocks.items():
+        if len(members) < 2:
+            continue
+        if kind == "exact":
+            for j in members[1:]:
+                merge(members[0], j)
+            continue
+        if len(members) > MAX_BLOCK_SIZE:
+            continue
+        for x, i in enumerate(members):
+            for j in members[x + 1:]:
+                root_i, root_j = union.find(i), union.find(j)
+                if root_i != root_j and len(editions[root_i] | editions[root_j]) <= 1 and _similar(entries[i], entries[j]):
+                    merge(i, j)
+
+    groups = {}
+    for i in range(len(entries)):
+        groups.setdefault(union.find(i), []).append(entries[i])
+
+    resolved = []
+    clusters = []
+    for members in groups.values():
+        canonical = max(members, key=lambda e: (counts[e.name], len(e.name)))
+        types = Counter(e.object_type for e in members if e.object_type)
+        aliases = []
+        for entry in members:
+            for alias in ([entry.name] if entry is not canonical else []) + aliases_in[entry.name]:
+                if alias != canonical.name and alias not in aliases:
+                    aliases.append(alias)
+        record = {
+            "object": canonical.name,
+            "object_type": types.most_common(1)[0][0] if types else canonical.object_type,
+            "aliases": aliases
+        }
+        resolved.append(record)
+        if len(members) > 1:
+            clusters.append(record)
+    return resolved, clusters
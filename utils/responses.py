@@ -0,0 +1,102 @@
+from utils.json_stream import JsonArrayParser
+
+# Structured outputs need an object at the root, so every list is wrapped as {"items": [...]}
+MAX_ENUM_VALUES = 250  # larger vocabularies fall back to plain strings instead of an enum
+
+
+def _list_format(name, item_schema):
+    return {
+        "type": "json_schema",
+        "json_schema": {
+            "name": name,
+            "strict": True,
+            "schema": {
+                "type": "object",
+                "properties": {"items": {"type": "array", "items": item_schema}},
+                "required": ["items"],
+                "additionalProperties": False
+            }
+        }
+    }
+
+
+def _string_schema(values=None):
+    values = sorted({str(v) for v in values or []})
+    if values and len(values) <= MAX_ENUM_VALUES:
+        return {"type": "string", "enum": values}
+    return {"type": "string"}
+
+
+def string_list_format(name):
+    """Steps 1-2: a list of names."""
+    return _list_format(name, {"type": "string"})
+
+
+def object_list_format(object_types):
+    """Step 3: objects, each with one of the confirmed object types."""
+    return _list_format("objects", {
+        "type": "object",
+        "properties": {"object": {"type": "string"}, "object_type": _string_schema(object_types)},
+        "required": ["object", "object_type"],
+        "additionalProperties": False
+    })
+
+
+def enrichment_format(activities, objects):
+    """Step 4: one label record per title, restricted to the known activities and objects."""
+    return _list_format("title_labels", {
+        "type": "object",
+        "properties": {
+            "title": {"type": "string"},
+            "activities": {"type": "array", "items": _string_schema(activities)},
+            "objects": {"type": "array", "items": _string_schema(objects)}
+        },
+        "required": ["title", "activities", "objects"],
+        "additionalProperties": False
+    })
+
+
+def parse_json_array(text):
+    """
+    Parse a complete GPT answer holding a JSON array, wrapped in {"items": ...}
+    and/or a ```json fence or not. Malformed elements are repaired or skipped
+    and a truncated array keeps its complete elements. Raises ValueError only
+    when nothing usable was found.
+    """
+    parser = JsonArrayParser()
+    parser.feed(text or "")
+    if not parser.items and not parser.complete:
+        raise ValueError("GPT output did not contain a JSON array")
+    return parser.items
+
+
+def valid_objects(items):
+    # Step 3 records that have both fields as strings
+    return [
+        item for item in items
+        if isinstance(item, dict) and isinstance(item.get("object"), str) and isinstance(item.get("object_type"), str)
+    ]
+
+
+def valid_labels(items, titles, objects=None):
+    # Step 4 records for the requested titles, first answer per title wins; with objects, other object names are dropped
+    wanted = set(titles)
+    known = None if objects is None else set(objects)
+    labels = {}
+    for item in items:
+        if not isinstance(item, dict) or item.get("title") not in wanted or item["title"] in labels:
+            continue
+        activities = item.get("activities")
+        found = item.get("objects")
+        if not isinstance(activities, list) or not isinstance(found, list):
+            continue
+        if known is not None:
+            found = [o for o in found if isinstance(o, str) and o in known]
+        labels[item["title"]] = {"title": item["title"], "activities": activities, "objects": found}
+    return list(labels.values())
+
+
+def missing_titles(titles, labels):
+    """Titles that have no label record yet, in their original order."""
+    answered = {label["title"] for label in labels}
+    return [title for title in titles if title not in answered]
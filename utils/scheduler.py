@@ -0,0 +1,203 @@
+import hashlib
+import heapq
+import itertools
+import os
+import random
+import threading
+import time
+
+import openai
+
+# --- Priorities: lower runs first ---
+INTERACTIVE = 0  # Steps 1-3, a participant is waiting for the answer
+BULK = 1         # Step 4 enrichment batches
+
+# --- Limits per API key; replaced by the provider's own limits once a response reports them ---
+DEFAULT_REQUESTS_PER_MINUTE = int(os.environ.get("EXOAR_LLM_RPM", 500))
+DEFAULT_TOKENS_PER_MINUTE = int(os.environ.get("EXOAR_LLM_TPM", 450_000))
+DEFAULT_COMPLETION_TOKENS = 1000  # reserved per request until the real usage is known
+
+# --- Retries ---
+MAX_RETRIES = 6
+BACKOFF_BASE = 1.0
+BACKOFF_MAX = 60.0
+RETRYABLE_STATUS = {408, 409, 429, 500, 502, 503, 504}
+
+
+class TokenBucket:
+    """Continuously refilling bucket holding at most one minute of capacity. Not thread-safe on its own."""
+
+    def __init__(self, per_minute):
+        self.per_minute = per_minute
+        self.level = float(per_minute)
+        self.updated = time.monotonic()
+
+    def _refill(self, now):
+        self.level = min(self.per_minute, self.level + (now - self.updated) * self.per_minute / 60)
+        self.updated = now
+
+    def delay(self, amount, now):
+        # Seconds until amount is available; requests larger than the bucket wait for a full bucket
+        self._refill(now)
+        missing = min(amount, self.per_minute) - self.level
+        return max(0.0, missing * 60 / self.per_minute)
+
+    def take(self, amount, now):
+        self._refill(now)
+        self.level -= amount
+
+    def set_rate(self, per_minute, now):
+        self._refill(now)
+        self.per_minute = per_minute
+        self.level = min(self.level, per_minute)
+
+
+class _Credential:
+    def __init__(self, api_key):
+        self.client = openai.OpenAI(api_key=api_key, max_retries=0)  # one keep-alive connection pool per key
+        self.requests = TokenBucket(DEFAULT_REQUESTS_PER_MINUTE)
+        self.tokens = TokenBucket(DEFAULT_TOKENS_PER_MINUTE)
+        self.paused_until = 0.0
+        self.waiting = []  # heap of (priority, sequence)
+
+
+def _retry_after(error):
+    # Seconds the server asked us to wait (Retry-After / retry-after-ms), if any
+    response = getattr(error, "response", None)
+    if response is None:
+        return None
+    headers = response.headers
+    try:
+        if headers.get("retry-after-ms"):
+            return float(headers["retry-after-ms"]) / 1000
+        if headers.get("retry-after"):
+            return float(headers["retry-after"])
+    except ValueError:
+        return None
+    return None
+
+
+def _is_retryable(error):
+    if isinstance(error, (openai.APIConnectionError, openai.APITimeoutError)):
+        return True
+    return isinstance(error, openai.APIStatusError) and error.status_code in RETRYABLE_STATUS
+
+
+class RequestScheduler:
+    """
+    Process-wide gate for OpenAI requests, shared by every session and worker
+    thread. Each API key gets one pooled client, a requests-per-minute and a
+    tokens-per-minute bucket, and a priority queue so interactive calls go
+    before waiting bulk calls. Failed calls are retried with the server's
+    Retry-After or jittered exponential backoff; a 429 pauses the whole key.
+    """
+
+    def __init__(self):
+        self._credentials = {}
+        self._lock = threading.Lock()
+        self._changed = threading.Condition(self._lock)
+        self._sequence = itertools.count()
+
+    def _credential(self, api_key):
+        key = hashlib.sha256(api_key.encode("utf-8")).hexdigest()
+        if key not in self._credentials:
+            self._credentials[key] = _Credential(api_key)
+        return self._credentials[key]
+
+    def client(self, api_key):
+        with self._lock:
+            return self._credential(api_key).client
+
+    def _acquire(self, credential, tokens, priority):
+        with self._lock:
+            ticket = (priority, next(self._sequence))
+            heapq.heappush(credential.waiting, ticket)
+            self._changed.notify_all()  # a more urgent ticket may now be at the head of the queue
+            try:
+                while True:
+                    now = time.monotonic()
+                    if credential.waiting[0] == ticket:
+                        wait = max(
+                            credential.paused_until - now,
+                            credential.requests.delay(1, now),
+                            credential.tokens.delay(tokens, now)
+                        )
+                        if wait <= 0:
+                            credential.requests.take(1, now)
+                            credential.tokens.take(tokens, now)
+                            return
+                        self._changed.wait(wait)
+                    else:
+                        self._changed.wait()
+            finally:
+                credential.waiting.remove(ticket)
+                heapq.heapify(credential.waiting)
+                self._changed.notify_all()
+
+    def _observe(self, credential, headers):
+        # Adopt the provider's limits for this key, e.g. x-ratelimit-limit-tokens: 30000
+        now = time.monotonic()
+        with self._lock:
+            for header, bucket in (("x-ratelimit-limit-requests", credential.requests),
+                                   ("x-ratelimit-limit-tokens", credential.tokens)):
+                try:
+                    limit = int(headers.get(header, 0))
+                except ValueError:
+                    continue
+                if limit > 0 and limit != bucket.per_minute:
+                    bucket.set_rate(limit, now)
+            self._changed.notify_all()
+
+    def _pause(self, credential, seconds):
+        with self._lock:
+            credential.paused_until = max(credential.paused_until, time.monotonic() + seconds)
+
+    def call(self, api_key, request_fn, tokens, priority=INTERACTIVE):
+        """
+        Run request_fn(client) once the key's limits allow `tokens` more tokens,
+        retrying transient failures. request_fn should return a raw response
+        (with_raw_response) so rate-limit headers can be read. Returns
+        (response, retries).
+        """
+        with self._lock:
+            credential = self._credential(api_key)
+        for attempt in range(MAX_RETRIES + 1):
+            self._acquire(credential, tokens, priority)
+            try:
+                response = request_fn(credential.client)
+            except Exception as e:
+                if attempt == MAX_RETRIES or not _is_retryable(e):
+                    raise
+                wait = _retry_after(e)
+                if wait is None:
+                    wait = random.uniform(0, min(BACKOFF_MAX, BACKOFF_BASE * 2 ** attempt))  # full jitter
+                else:
+                    wait += random.uniform(0, 0.1 * wait + 0.1)  # so paused callers do not all return at once
+                if isinstance(e, openai.APIStatusError) and e.status_code == 429:
+                    self._pause(credential, wait)
+                time.sleep(wait)
+                continue
+            headers = getattr(response, "headers", None)
+            if headers is not None:
+                self._observe(credential, headers)
+            return response, attempt
+
+    def settle(self, api_key, reserved, used):
+        # Correct the token bucket once the real usage of a request is known
+        with self._lock:
+            credential = self._credential(api_key)
+            now = time.monotonic()
+            credential.tokens.take(used - reserved, now)
+            self._changed.notify_all()
+
+
+_scheduler = None
+_scheduler_lock = threading.Lock()
+
+
+def get_scheduler():
+    global _scheduler
+    with _scheduler_lock:
+        if _scheduler is None:
+            _scheduler = RequestScheduler()
+        return _scheduler
@@ -0,0 +1,162 @@
+import json
+import os
+import re
+import secrets
+import shutil
+import time
+import weakref
+
+import pandas as pd
+
+from utils.storage import data_path
+
+# Bump when the meaning or shape of a saved key changes; older snapshots are then rejected
+SNAPSHOT_VERSION = 1
+MANIFEST = "manifest.json"
+# Each session saves under its own random resume code, which the user enters to continue it
+_SNAPSHOT_ID = re.compile(r"^[0-9a-f]{12}$")
+
+# --- Session keys worth keeping; the API key and widget state are deliberately left out ---
+SNAPSHOT_KEYS = [
+    "source", "original_object_types", "confirmed_object_types", "added_object_types", "removed_object_types",
+    "activity_source", "original_activities", "confirmed_activities", "added_activities", "removed_activities",
+    "step2_data",
+    "step3_summary_df", "step3_total_rows", "step4_all_titles", "title_groups",
+    "step3_analyzed_titles", "step3_gpt_objects", "step3_edited_objects", "step3_objects_df", "step3_data",
+    "step4_enrichment_mode", "step4_enriched_titles", "step4_sampled_titles", "step4_gpt_enrichment",
+    "step4_training_examples", "step4_local_enrichment", "step4_local_titles", "step4_data",
+]
+
+
+class SnapshotError(ValueError):
+    """A saved session that cannot be restored: written by another app version, or damaged."""
+
+
+def new_snapshot_id():
+    return secrets.token_hex(6)
+
+
+def snapshot_dir(snapshot_id):
+    snapshot_id = (snapshot_id or "").strip().lower()
+    if not _SNAPSHOT_ID.match(snapshot_id):
+        raise SnapshotError(f"'{snapshot_id}' is not a resume code; codes are 12 characters of 0-9 and a-f.")
+    return os.path.dirname(data_path("snapshots", snapshot_id, MANIFEST))
+
+
+def _write_atomic(path, write):
+    # Readers see either the previous file or the complete new one
+    tmp = f"{path}.tmp"
+    write(tmp)
+    os.replace(tmp, path)
+
+
+def _write_text(path, text):
+    def write(tmp):
+        with open(tmp, "w", encoding="utf-8") as f:
+            f.write(text)
+    _write_atomic(path, write)
+
+
+def save_snapshot(state, step):
+    """
+    Save the session's DataFrames as Parquet and its other values as compact
+    JSON, one file per key, then the manifest listing them, under the
+    session's resume code (created on the first save). A DataFrame that is
+    still the same object as at the previous save is not written again, and
+    keys of a resumed session that no page has loaded yet keep their files.
+    Returns the manifest.
+    """
+    if not state.get("snapshot_id"):
+        state["snapshot_id"] = new_snapshot_id()
+    directory = snapshot_dir(state["snapshot_id"])
+    written = state.setdefault("snapshot_written", {})  # key -> weak reference to the last saved DataFrame
+    pending = state.get("snapshot_pending", {})
+    entries = {}
+    for key in SNAPSHOT_KEYS:
+        if key not in state:
+            if key in pending:
+                entries[key] = pending[key]
+            continue
+        value = state[key]
+        if isinstance(value, pd.DataFrame):
+            path = os.path.join(directory, f"{key}.parquet")
+            ref = written.get(key)
+            if ref is None or ref() is not value or not os.path.exists(path):
+                _write_atomic(path, lambda tmp: value.to_parquet(tmp, index=False))
+                written[key] = weakref.ref(value)
+            entries[key] = "parquet"
+        else:
+            path = os.path.join(directory, f"{key}.json")
+            _write_text(path, json.dumps(value, ensure_ascii=False, separators=(",", ":"), default=str))
+            entries[key] = "json"
+    manifest = {
+        "version": SNAPSHOT_VERSION, "saved_at": time.time(), "step": step,
+        "profession": state.get("profession", ""), "keys": entries
+    }
+    _write_text(os.path.join(directory, MANIFEST), json.dumps(manifest))
+    return manifest
+
+
+def read_manifest(snapshot_id):
+    """The manifest of the session saved under this resume code, or None. Raises SnapshotError when outdated or damaged."""
+    path = os.path.join(snapshot_dir(snapshot_id), MANIFEST)
+    if not os.path.exists(path):
+        return None
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            manifest = json.load(f)
+    except (OSError, json.JSONDecodeError) as e:
+        raise SnapshotError(f"The saved session could not be read: {e}") from e
+    if manifest.get("version") != SNAPSHOT_VERSION:
+        raise SnapshotError(
+            f"The saved session was made by another version of the app (snapshot version "
+            f"{manifest.get('version')}, expected {SNAPSHOT_VERSION}) and cannot be restored."
+        )
+    return manifest
+
+
+def restore_snapshot(state, snapshot_id):
+    """
+    Resume the session saved under snapshot_id: later saves go to the same
+    code, and its keys the session does not have yet are marked pending, to
+    be read by load_pending when a page needs them. Only the manifest is
+    read here. Returns the manifest, or None when there is no snapshot.
+    """
+    manifest = read_manifest(snapshot_id)
+    if manifest is None:
+        return None
+    state["snapshot_id"] = snapshot_id.strip().lower()
+    state["snapshot_pending"] = {key: kind for key, kind in manifest["keys"].items() if key not in state}
+    if manifest.get("profession"):
+        state["profession"] = manifest["profession"]
+    return manifest
+
+
+def load_pending(state, keys):
+    """Read the given keys of a resumed session from its snapshot, if they are still pending."""
+    pending = state.get("snapshot_pending")
+    wanted = [key for key in keys if pending and key in pending and key not in state]
+    if not wanted:
+        return
+    directory = snapshot_dir(state["snapshot_id"])
+    restored = {}
+    try:
+        for key in wanted:
+            if pending[key] == "parquet":
+                restored[key] = pd.read_parquet(os.path.join(directory, f"{key}.parquet"), memory_map=True)
+            else:
+                with open(os.path.join(directory, f"{key}.json"), "r", encoding="utf-8") as f:
+                    restored[key] = json.load(f)
+    except (OSError, ValueError) as e:
+        raise SnapshotError(f"The saved session is incomplete or damaged: {e}") from e
+    # Only assigned once every key was read, so a damaged snapshot leaves the session as it was
+    written = state.setdefault("snapshot_written", {})
+    for key, value in restored.items():
+        state[key] = value
+        pending.pop(key)
+        if isinstance(value, pd.DataFrame):
+            written[key] = weakref.ref(value)
+
+
+def delete_snapshot(snapshot_id):
+    shutil.rmtree(snapshot_dir(snapshot_id), ignore_errors=True)
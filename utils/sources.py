@@ -0,0 +1,145 @@
+import csv
+import io
+import os
+import zipfile
+
+import pandas as pd
+
+SEPARATORS = ";,\t"
+SOURCE_EXTENSIONS = (".csv", ".zip")
+OFFSET_SAMPLE = 100  # times checked for a UTC offset; one export uses one format
+_UTC_OFFSET = r"(?:[+-]\d\d:?\d\d|Z)$"
+
+
+# --- Adapters: one per activity tracker export format ---
+class SourceAdapter:
+    """
+    Maps the columns of one tracker's CSV export onto the Title/Begin/End
+    schema of a Tockler export. End comes from an end-time column or from a
+    duration column (in the given unit) added to Begin.
+    """
+
+    def __init__(self, name, title, begin, end=None, duration=None, duration_unit="s"):
+        self.name = name
+        self.title = title
+        self.begin = begin
+        self.end = end
+        self.duration = duration
+        self.duration_unit = duration_unit
+
+    @property
+    def columns(self):
+        return [c for c in (self.title, self.begin, self.end, self.duration) if c]
+
+    def matches(self, columns):
+        return set(self.columns) <= set(columns)
+
+    def intervals(self, chunk):
+        """The chunk as Title (category), Begin and End (timezone-naive datetimes)."""
+        begin = _naive_datetimes(chunk[self.begin])
+        if self.end:
+            end = _naive_datetimes(chunk[self.end])
+        else:
+            end = begin + pd.to_timedelta(pd.to_numeric(chunk[self.duration], errors="coerce"), unit=self.duration_unit)
+        return pd.DataFrame({"Title": chunk[self.title].astype("category"), "Begin": begin, "End": end})
+
+
+def _naive_datetimes(values):
+    # Local wall-clock times (Tockler, ManicTime) are kept as they are; times with UTC offsets are read in UTC
+    if values.dtype != object and not pd.api.types.is_string_dtype(values):
+        return pd.to_datetime(values, errors="coerce")
+    sample = values.dropna().head(OFFSET_SAMPLE).astype(str)
+    if sample.str.contains(_UTC_OFFSET, regex=True).any():
+        return pd.to_datetime(values, errors="coerce", utc=True).dt.tz_localize(None)
+    return pd.to_datetime(values, errors="coerce")
+
+
+# Tried in order; the first adapter whose columns are all present reads the file
+ADAPTERS = [
+    SourceAdapter("Tockler", title="Title", begin="Begin", end="End"),
+    SourceAdapter("ActivityWatch", title="title", begin="timestamp", duration="duration"),
+    SourceAdapter("ManicTime", title="Name", begin="Start", end="End"),
+]
+
+
+def register_adapter(adapter, first=False):
+    """Add an adapter for another tracker; with first=True it is tried before the built-in ones."""
+    if first:
+        ADAPTERS.insert(0, adapter)
+    else:
+        ADAPTERS.append(adapter)
+    return adapter
+
+
+def sniff_header(head):
+    """(separator, column names) of a CSV from its first line."""
+    line = head.splitlines()[0] if head else ""
+    sep = max(SEPARATORS, key=line.count)
+    columns = next(csv.reader([line], delimiter=sep), [])
+    return sep, [c.strip().lstrip("﻿") for c in columns]
+
+
+def detect_adapter(columns, adapters=None):
+    for adapter in ADAPTERS if adapters is None else adapters:
+        if adapter.matches(columns):
+            return adapter
+    raise ValueError(
+        f"Unrecognized export columns ({', '.join(columns) or 'none'}); expected the columns of one of: "
+        + "; ".join(f"{a.name} ({', '.join(a.columns)})" for a in (ADAPTERS if adapters is None else adapters))
+    )
+
+
+# --- Sources: files, directories, zip archives and uploads ---
+def expand_sources(inputs):
+    """
+    Flatten paths, directories, zip archives and uploaded files into a list
+    of (name, payload) pairs, where payload is a file path or the bytes of
+    one CSV export. Directories are searched recursively for .csv and .zip
+    files, in name order.
+    """
+    sources = []
+    for item in inputs:
+        if isinstance(item, (str, os.PathLike)):
+            path = os.fspath(item)
+            if os.path.isdir(path):
+                found = sorted(
+                    os.path.join(root, f)
+                    for root, _, files in os.walk(path)
+                    for f in files if f.lower().endswith(SOURCE_EXTENSIONS)
+                )
+                sources.extend(expand_sources(found))
+            elif path.lower().endswith(".zip"):
+                sources.extend(_zip_members(path, path))
+            else:
+                sources.append((path, path))
+        else:
+            # An uploaded file: anything with a name and read()
+            name = getattr(item, "name", "upload")
+            data = item.getvalue() if hasattr(item, "getvalue") else item.read()
+            if name.lower().endswith(".zip"):
+                sources.extend(_zip_members(name, io.BytesIO(data)))
+            else:
+                sources.append((name, data))
+    return sources
+
+
+def _zip_members(name, archive):
+    with zipfile.ZipFile(archive) as zf:
+        return [
+            (f"{name}/{member}", zf.read(member))
+            for member in sorted(zf.namelist())
+            if member.lower().endswith(".csv") and not member.startswith("__MACOSX/")
+        ]
+
+
+def open_payload(payload):
+    return payload if isinstance(payload, str) else io.BytesIO(payload)
+
+
+def read_head(payload, size=65536):
+    if isinstance(payload, str):
+        with open(payload, "rb") as f:
+            raw = f.read(size)
+    else:
+        raw = payload[:size]
+    return raw.decode("utf-8-sig", errors="replace")
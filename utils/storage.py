@@ -0,0 +1,17 @@
+import hashlib
+import json
+import os
+
+# --- Local working directory for checkpoints and caches (never uploaded anywhere) ---
+DATA_DIR = os.environ.get("EXOAR_DATA_DIR", ".exoar")
+
+
+def data_path(*parts):
+    path = os.path.join(DATA_DIR, *parts)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    return path
+
+
+def content_hash(obj):
+    payload = json.dumps(obj, sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
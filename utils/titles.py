@@ -0,0 +1,158 @@
+import re
+from collections import defaultdict
+
+import numpy as np
+import pandas as pd
+
+# --- Rule-based canonicalization ---
+_ZERO_WIDTH = re.compile("[\u200b-\u200f\u2060\ufeff]")
+_COUNTER_PREFIX = re.compile(r"^\s*[\(\[]\d+\+?[\)\]]\s*")
+_UNSAVED_MARKER = re.compile(r"^\s*[*\u25cf\u2022]\s*|\s*[*\u25cf\u2022]\s*$")
+_MORE_PAGES = re.compile(r"\s+and \d+ more pages?\b", re.IGNORECASE)
+_APP_SUFFIX = re.compile(
+    r"\s+[-–—|]\s+("
+    r"microsoft\s*edge|google chrome|chrome|mozilla firefox|firefox|safari|brave|opera|"
+    r"visual studio code|visual studio|pycharm|intellij idea|rstudio|"
+    r"word|excel|powerpoint|outlook|onenote|microsoft teams|teams|zoom|slack|"
+    r"notepad\+\+|notepad|adobe acrobat[\w ]*|acrobat reader|file explorer|windows explorer"
+    r")\s*$",
+    re.IGNORECASE
+)
+_PROFILE_SUFFIX = re.compile(r"\s+[-–—]\s+(personal|work|school|profile \d+|inprivate)\s*$", re.IGNORECASE)
+_WHITESPACE = re.compile(r"\s+")
+_NUMBERS = re.compile(r"\d+")
+_WORDS = re.compile(r"[^\W\d_]{3,}")
+
+# --- Near-duplicate detection ---
+SIMHASH_BITS = 64
+SIMHASH_BANDS = 4
+MAX_HAMMING_DISTANCE = 3
+_BAND_BITS = SIMHASH_BITS // SIMHASH_BANDS
+
+
+def normalize_title(title):
+    """Canonical form used to group window-title variants: counters, save markers and app suffixes removed."""
+    text = _ZERO_WIDTH.sub("", str(title))
+    text = _COUNTER_PREFIX.sub("", text)
+    previous = None
+    while text != previous:
+        previous = text
+        text = _APP_SUFFIX.sub("", text)
+        text = _PROFILE_SUFFIX.sub("", text)
+        text = _UNSAVED_MARKER.sub("", text)
+    text = _MORE_PAGES.sub("", text)
+    return _WHITESPACE.sub(" ", text).strip().lower()
+
+
+def _mix64(x):
+    # splitmix64 finalizer: a stable, well-spread 64-bit hash in numpy arithmetic
+    with np.errstate(over="ignore"):
+        x = (x ^ (x >> np.uint64(30))) * np.uint64(0xBF58476D1CE4E5B9)
+        x = (x ^ (x >> np.uint64(27))) * np.uint64(0x94D049BB133111EB)
+        return x ^ (x >> np.uint64(31))
+
+
+_BIT_SHIFTS = np.arange(SIMHASH_BITS, dtype=np.uint64)
+
+
+def simhash(text, n=3):
+    codes = np.frombuffer(text.encode("utf-32-le"), dtype=np.uint32).astype(np.uint64)
+    if len(codes) < n:
+        codes = np.concatenate([codes, np.zeros(n - len(codes), dtype=np.uint64)])
+    with np.errstate(over="ignore"):
+        grams = np.zeros(len(codes) - n + 1, dtype=np.uint64)
+        for i in range(n):
+            grams = grams * np.uint64(0x100000001B3) + codes[i:len(codes) - n + 1 + i]
+    bits = (_mix64(grams)[:, None] >> _BIT_SHIFTS) & np.uint64(1)
+    votes = bits.sum(axis=0) * 2 > len(grams)
+    return int((votes.astype(np.uint64) << _BIT_SHIFTS).sum())
+
+
+def _words(key):
+    # Words of three or more letters: names, course codes and the like, which SimHash alone barely weighs
+    return frozenset(_WORDS.findall(key))
+
+
+def _same_words(words_a, words_b):
+    # Every word of one key must occur in the other, or be cut off there (truncated titles end in a partial word)
+    return all(
+        any(other.startswith(word) or word.startswith(other) for other in others)
+        for words, others in ((words_a - words_b, words_b), (words_b - words_a, words_a))
+        for word in words
+    )
+
+
+def _find(parent, i):
+    while parent[i] != i:
+        parent[i] = parent[parent[i]]
+        i = parent[i]
+    return i
+
+
+def cluster_keys(keys, max_distance=MAX_HAMMING_DISTANCE):
+    """
+    Group normalized keys whose SimHashes differ in at most max_distance bits.
+    Keys only match when they contain the same numbers, so "exam 2024" and
+    "exam 2025" stay apart, and the same words (up to truncation), so
+    "meeting with meijer" and "meeting with mulder" do too. Returns a
+    cluster id per key.
+    """
+    keys = list(keys)
+    parent = list(range(len(keys)))
+
+    # Keys with identical (numbers, words, hash) signatures are merged directly; only distinct signatures are compared
+    first_of = {}
+    for i, key in enumerate(keys):
+        signature = (tuple(_NUMBERS.findall(key)), _words(key), simhash(key))
+        if signature in first_of:
+            parent[i] = first_of[signature]
+        else:
+            first_of[signature] = i
+
+    # With at most SIMHASH_BANDS - 1 differing bits, near-duplicates share at least one band exactly
+    buckets = defaultdict(list)
+    band_mask = (1 << _BAND_BITS) - 1
+    for (numbers, words, h), i in first_of.items():
+        for band in range(SIMHASH_BANDS):
+            buckets[(numbers, band, (h >> (band * _BAND_BITS)) & band_mask)].append((i, words, h))
+
+    for members in buckets.values():
+        for a_pos, (a, words_a, hash_a) in enumerate(members):
+            for b, words_b, hash_b in members[a_pos + 1:]:
+                if bin(hash_a ^ hash_b).count("1") <= max_distance and _same_words(words_a, words_b):
+                    root_a, root_b = _find(parent, a), _find(parent, b)
+                    if root_a != root_b:
+                        parent[root_b] = root_a
+    return [_find(parent, i) for i in range(len(keys))]
+
+
+def group_titles(title_stats):
+    """
+    Map every title in title_stats (Title, Duration, ...) to a representative
+    title: the longest-used member of its normalized, near-duplicate group.
+    """
+    titles = title_stats[["Title", "Duration"]].copy()
+    titles["key"] = titles["Title"].map(normalize_title)
+    distinct_keys = titles["key"].unique()
+    cluster_of_key = dict(zip(distinct_keys, cluster_keys(distinct_keys)))
+    titles["cluster"] = titles["key"].map(cluster_of_key)
+    representative = (
+        titles.sort_values("Duration", ascending=False, kind="stable")
+        .drop_duplicates("cluster")
+        .set_index("cluster")["Title"]
+    )
+    return pd.Series(titles["cluster"].map(representative).values, index=titles["Title"].values)
+
+
+def expand_to_members(enrichments, title_groups):
+    """Copy each representative's labels to every title in its group."""
+    members = defaultdict(list)
+    for member, representative in title_groups.items():
+        if member != representative:
+            members[representative].append(member)
+    expanded = []
+    for item in enrichments:
+        expanded.append(item)
+        for member in members.get(item["title"], []):
+            expanded.append({**item, "title": member})
+    return expanded
@@ -1,5 +1,9 @@
 import streamlit as st
 
+from utils.metrics import LLMMetrics
+from utils.export import mark_changed
+from utils.snapshot import load_pending, save_snapshot, SnapshotError
+
 def api_key_input_sidebar():
     st.sidebar.header("🔑 OpenAI API Key")
 
@@ -22,3 +26,41 @@ def api_key_input_sidebar():
     else:
         if 'api_key' not in st.session_state:
             st.sidebar.info("Awaiting API key input...")
+
+
+def get_llm_metrics():
+    # One log of GPT calls per session; the object is handed to worker threads, which record into it directly
+    if "llm_metrics" not in st.session_state:
+        st.session_state["llm_metrics"] = LLMMetrics()
+    return st.session_state["llm_metrics"]
+
+
+def snapshot_session(step):
+    # Called after every confirmation, so a refresh does not lose the work; the Home page offers to restore it
+    try:
+        save_snapshot(st.session_state, step)
+    except (OSError, ValueError, TypeError) as e:
+        st.warning(f"⚠️ This session could not be saved for later: {e}")
+
+
+def restore_saved(*keys):
+    # A resumed session reads each saved key from disk only when a page that uses it is opened
+    pending = [key for key in keys if key in st.session_state.get("snapshot_pending", {})]
+    try:
+        load_pending(st.session_state, pending)
+        mark_changed(st.session_state, *pending)
+    except SnapshotError as e:
+        st.warning(f"⚠️ {e} Please start again on the Home page.")
+
+
+def show_llm_metrics(step):
+    totals = get_llm_metrics().totals(step)
+    if not totals["calls"]:
+        return
+    with st.expander("📊 GPT usage for this step", expanded=False):
+        col1, col2, col3, col4 = st.columns(4)
+        col1.metric("Calls", totals["calls"], help=f"{totals['cache_hits']} served from the local cache, {totals['errors']} failed")
+        col2.metric("Time (s)", f"{totals['seconds']:.1f}", help="Summed wall time of all calls (parallel calls overlap)")
+        col3.metric("Tokens", f"{totals['prompt_tokens'] + totals['completion_tokens']:,}",
+                    help=f"{totals['prompt_tokens']:,} prompt + {totals['completion_tokens']:,} completion")
+        col4.metric("Cost (USD)", f"{totals['cost_usd']:.4f}", help=f"Estimated from list prices; {totals['retries']} retries")